@@ -0,0 +1,99 @@
+"""Benchmark cold-start import time of the CLI commands.
+
+Each case runs in a fresh interpreter with ``python -X importtime`` so no
+module is already cached. The importtime report on stderr gives the total
+import cost and the most expensive top-level imports.
+
+Usage:
+    python -m benchmarks.bench_cli_startup --repeat 3
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+CASES: Dict[str, List[str]] = {
+    'main --help': ['main.py', '--help'],
+    'main index --help': ['main.py', 'index', '--help'],
+    'main query --help': ['main.py', 'query', '--help'],
+    'import factories': ['-c', 'import factories'],
+    'import rag.rag_pipeline': ['-c', 'import rag.rag_pipeline'],
+}
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse ``-X importtime`` output into top-level imports.
+
+    Args:
+        stderr: Standard error of the interpreter
+
+    Returns:
+        List of (module, self microseconds, cumulative microseconds) for
+        modules imported directly by the entry point
+    """
+    modules = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        # Nested imports are indented; top-level imports have a single space
+        if match and len(match.group(3)) == 1:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return modules
+
+
+def run_case(arguments: List[str], top: int) -> Dict[str, object]:
+    """Run one command in a fresh interpreter and measure its startup."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', *arguments],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    wall_seconds = time.perf_counter() - start
+
+    modules = parse_importtime(completed.stderr)
+    slowest = sorted(modules, key=lambda module: module[2], reverse=True)[:top]
+    return {
+        'returncode': completed.returncode,
+        'wall_seconds': wall_seconds,
+        'import_seconds': sum(cumulative for _, _, cumulative in modules) / 1e6,
+        'slowest_imports': {name: cumulative / 1e6 for name, _, cumulative in slowest},
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Measure every CLI case, keeping the median run."""
+    results = {}
+    for name, arguments in CASES.items():
+        runs = [run_case(arguments, args.top) for _ in range(args.repeat)]
+        runs.sort(key=lambda result: result['wall_seconds'])
+        median = runs[len(runs) // 2]
+        median['wall_seconds_all'] = [result['wall_seconds'] for result in runs]
+        median['wall_seconds_stdev'] = statistics.pstdev(median['wall_seconds_all'])
+        results[name] = median
+    return {'python': sys.version.split()[0], 'repeat': args.repeat, 'cases': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI cold-start benchmark")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per command; the median is reported')
+    parser.add_argument('--top', type=int, default=5, help='Number of slowest top-level imports to report')
+    args = parser.parse_args()
+
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == '__main__':
+    main()
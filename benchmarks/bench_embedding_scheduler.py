@@ -0,0 +1,109 @@
+"""Benchmark the embedding scheduler against a throttling stand-in embedder.
+
+Usage:
+    python -m benchmarks.bench_embedding_scheduler --texts 2000 --latency 0.2 --throttle-rate 0.1
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import List
+from langchain_core.embeddings import Embeddings
+
+from components.embedding_scheduler import RateLimitError, ScheduledEmbeddings
+
+
+class ThrottlingEmbeddings(Embeddings):
+    """Local stand-in embedder that injects request latency and 429 errors."""
+
+    def __init__(self, latency: float = 0.2, throttle_rate: float = 0.1, dimensions: int = 64, seed: int = 0):
+        """
+        Initialize the stand-in embedder.
+
+        Args:
+            latency: Seconds each request takes
+            throttle_rate: Probability that a request fails with a 429
+            dimensions: Size of the returned vectors
+            seed: Random seed for throttling decisions
+        """
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.dimensions = dimensions
+        self.requests = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            if self._random.random() < self.throttle_rate:
+                self.throttled += 1
+                raise RateLimitError("429 Too Many Requests")
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def _vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+        return [digest[i % len(digest)] / 255.0 for i in range(self.dimensions)]
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Embed synthetic texts sequentially and through the scheduler."""
+    texts = [f"Synthetic HR policy paragraph number {i}. " * 20 for i in range(args.texts)]
+
+    sequential_model = ThrottlingEmbeddings(args.latency, 0.0)
+    start = time.perf_counter()
+    for i in range(0, len(texts), args.batch_size):
+        sequential_model.embed_documents(texts[i:i + args.batch_size])
+    sequential_seconds = time.perf_counter() - start
+
+    model = ThrottlingEmbeddings(args.latency, args.throttle_rate)
+    scheduler = ScheduledEmbeddings(
+        model,
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        backoff_base=args.backoff_base,
+        backoff_max=args.backoff_base * 8
+    )
+    start = time.perf_counter()
+    vectors = scheduler.embed_documents(texts)
+    scheduled_seconds = time.perf_counter() - start
+
+    assert len(vectors) == len(texts)
+    assert vectors == [model._vector(text) for text in texts], "vectors out of order"
+
+    return {
+        'texts': len(texts),
+        'sequential_seconds': sequential_seconds,
+        'scheduled_seconds': scheduled_seconds,
+        'speedup': sequential_seconds / scheduled_seconds,
+        'injected_429s': model.throttled,
+        'scheduler': scheduler.stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding scheduler benchmark")
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds per stand-in request')
+    parser.add_argument('--throttle-rate', type=float, default=0.1, help='Probability of an injected 429')
+    parser.add_argument('--rpm', type=int, default=0, help='Requests per minute budget (0 = unlimited)')
+    parser.add_argument('--tpm', type=int, default=0, help='Tokens per minute budget (0 = unlimited)')
+    parser.add_argument('--backoff-base', type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""End-to-end benchmark of indexing and querying the RAG pipeline.
+
+Builds a corpus of synthetic policy PDFs plus the PDFs in data/, indexes it
+with RAGPipeline into a temporary directory, then asks a fixed set of
+questions. Reported: ingest throughput (pages/s, chunks/s), peak RSS,
+index size on disk, and latency percentiles for retrieval alone and for
+full RAG queries. Results are JSON, so runs can be saved with --out and
+compared with --baseline.
+
+By default the LLM and embedding model are replaced by the offline
+stand-ins (type "fake"), so the benchmark needs no API key or network.
+Pass --online to use the models in the config file instead.
+
+Usage:
+    python -m benchmarks.bench_pipeline --documents 50 --pages 10 --queries 100 --out results.json
+    python -m benchmarks.bench_pipeline --vectorstore faiss --baseline results.json
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import yaml
+
+from benchmarks.synthetic_pdfs import generate_corpus
+from utils.metrics import latency_summary
+
+DEFAULT_CONFIG = 'config/config.yaml'
+DEFAULT_DATA_DIR = 'data'
+
+QUESTIONS = [
+    "How many days of earned leave can employees carry forward?",
+    "Who must approve the travel itinerary?",
+    "When should the reimbursement claim be submitted?",
+    "How do I report a POSH complaint?",
+    "What is the process for getting a Form 16 certificate?",
+    "What must be returned during the notice period?",
+    "Are contractors entitled to compensatory off?",
+    "What are the rules on gifts and hospitality?",
+    "When is the annual performance appraisal completed?",
+    "What does the code of conduct say about conflicts of interest?",
+]
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process and its finished child processes."""
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale
+
+
+def directory_size(path: Path) -> int:
+    """Total size of the files under a directory in bytes."""
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+def git_commit() -> Optional[str]:
+    """Commit hash of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_config(args: argparse.Namespace, workdir: Path) -> Path:
+    """Write the benchmark configuration, pointing every index file into the work directory."""
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+
+    if not args.online:
+        config['llm'] = {
+            'type': 'fake',
+            'latency': args.llm_latency,
+            'tokens_per_second': args.tokens_per_second,
+        }
+        config['embedding'] = {**config.get('embedding', {}), 'type': 'fake'}
+
+    embedding_config = config.setdefault('embedding', {})
+    embedding_config['cache'] = {**embedding_config.get('cache', {}), 'path': str(workdir / 'embedding_cache.sqlite')}
+
+    vectorstore_config = config.setdefault('vectorstore', {})
+    vectorstore_config['persist_directory'] = str(workdir / 'index')
+    if args.vectorstore:
+        vectorstore_config['type'] = args.vectorstore
+
+    if args.search_type:
+        config.setdefault('retrieval', {})['search_type'] = args.search_type
+    # Cached answers would measure the cache, not the pipeline
+    config['semantic_cache'] = {'enabled': False}
+
+    config_path = workdir / 'config.yaml'
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return config_path
+
+
+def build_corpus(args: argparse.Namespace, corpus_dir: Path) -> Dict[str, int]:
+    """Write synthetic PDFs and copy the data/ PDFs into one directory."""
+    synthetic = generate_corpus(str(corpus_dir), args.documents, args.pages, args.seed) if args.documents else []
+
+    data_files = []
+    if args.data_dir:
+        for path in sorted(Path(args.data_dir).glob('*.pdf')):
+            data_files.append(shutil.copy(path, corpus_dir / path.name))
+
+    return {'synthetic_files': len(synthetic), 'data_files': len(data_files)}
+
+
+def time_queries(run_query, questions: List[str]) -> Dict[str, float]:
+    """Run each question once and summarize the latencies."""
+    latencies = []
+    start = time.perf_counter()
+    for question in questions:
+        query_start = time.perf_counter()
+        run_query(question)
+        latencies.append(time.perf_counter() - query_start)
+    return latency_summary(latencies, time.perf_counter() - start)
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Index the corpus and time the query paths."""
+    workdir = Path(tempfile.mkdtemp(prefix='bench-pipeline-'))
+    try:
+        corpus_dir = workdir / 'corpus'
+        corpus_dir.mkdir()
+        corpus = build_corpus(args, corpus_dir)
+        config_path = write_config(args, workdir)
+
+        # Imported here so the RSS baseline includes the libraries but no data
+        from rag import RAGPipeline
+
+        pipeline = RAGPipeline(str(config_path))
+        baseline_rss = peak_rss_bytes()
+
+        stats = pipeline.index_documents(str(corpus_dir))
+        ingest_rss = peak_rss_bytes()
+
+        questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.queries)]
+        # The first query builds the retriever and chain; keep it out of the percentiles
+        pipeline.query(questions[0])
+
+        retrieval = time_queries(pipeline.retriever.retrieve_with_scores, questions)
+
+        stage_totals: Dict[str, float] = {}
+
+        def full_query(question: str) -> None:
+            for stage, seconds in pipeline.query(question).timings.items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+
+        rag = time_queries(full_query, questions)
+
+        return {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'models': 'online' if args.online else 'offline',
+            'vectorstore': pipeline.config_loader.get_vectorstore_config().get('type'),
+            'search_type': pipeline.config_loader.get_retrieval_config().get('search_type', 'similarity'),
+            'corpus': {
+                **corpus, 'files': stats['files'], 'pages': stats['pages'], 'chunks': stats['chunks'],
+                'duplicates': stats['duplicates']
+            },
+            'ingest': {
+                'seconds': stats['seconds'],
+                'pages_per_second': stats['pages'] / stats['seconds'] if stats['seconds'] else 0.0,
+                'chunks_per_second': stats['chunks'] / stats['seconds'] if stats['seconds'] else 0.0,
+            },
+            'memory': {
+                'baseline_peak_rss_bytes': baseline_rss,
+                'ingest_peak_rss_bytes': ingest_rss,
+                'peak_rss_bytes': peak_rss_bytes(),
+            },
+            'index_bytes': directory_size(workdir / 'index'),
+            'retrieval_latency': retrieval,
+            'rag_latency': rag,
+            'rag_stage_means': {stage: total / len(questions) for stage, total in stage_totals.items()},
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    """
+    Relative change of every numeric metric present in both results.
+
+    Args:
+        current: Result of this run
+        baseline: Result of an earlier run
+
+    Returns:
+        Dictionary mapping dotted metric names to (current - baseline) / baseline
+    """
+    changes = {}
+    for key, value in current.items():
+        old = baseline.get(key)
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and isinstance(old, dict):
+            changes.update(compare(value, old, f"{name}."))
+        elif isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+            changes[name] = (value - old) / old
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end RAG pipeline benchmark")
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help="Base configuration file")
+    parser.add_argument('--documents', type=int, default=20, help="Synthetic PDFs to generate")
+    parser.add_argument('--pages', type=int, default=10, help="Pages per synthetic PDF")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Directory of real PDFs to add; '' for none")
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--vectorstore', default='', help="Override vectorstore.type")
+    parser.add_argument('--search-type', default='', help="Override retrieval.search_type")
+    parser.add_argument('--online', action='store_true', help="Use the models in the config file")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="Offline LLM seconds before the first token")
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help="Offline LLM output rate; 0 for instant")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='', help="Also write the JSON result to this file")
+    parser.add_argument('--baseline', default='', help="Earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    # Pipeline progress goes to stderr so stdout is only the JSON result
+    with contextlib.redirect_stdout(sys.stderr), warnings.catch_warnings():
+        # Chroma reports distant chunks with relevance below 0; only latency matters here
+        warnings.filterwarnings('ignore', message='Relevance scores must be between 0 and 1')
+        result = run(args)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            result['change_vs_baseline'] = compare(result, json.load(f))
+
+    output = json.dumps(result, indent=2)
+    if args.out:
+        Path(args.out).write_text(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
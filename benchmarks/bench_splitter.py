@@ -0,0 +1,118 @@
+"""Benchmark the token splitter against the recursive character splitter.
+
+Both splitters chunk the same pages: synthetic policy pages plus the pages
+of the PDFs in data/. The recursive splitter uses chunk_size and
+chunk_overlap in characters; the token splitter uses chunk_tokens and
+chunk_overlap_tokens. Reported per splitter: the best time over the
+repeats, pages/s, chunks/s, the chunk count and the distribution of chunk
+sizes in tokens and characters, plus the token splitter's chunk count
+relative to the recursive splitter.
+
+Usage:
+    python -m benchmarks.bench_splitter --pages 2000 --repeat 5
+    python -m benchmarks.bench_splitter --chunk-tokens 200 --chunk-overlap-tokens 40
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from langchain_core.documents import Document
+
+from benchmarks.synthetic_pdfs import TOPICS, policy_page
+from components import DocumentLoader, TextSplitter
+from utils.metrics import percentile
+from utils.token_counter import count_tokens
+
+DEFAULT_DATA_DIR = 'data'
+
+
+def build_pages(args: argparse.Namespace) -> List[Document]:
+    """Generate synthetic pages and load the data/ PDFs."""
+    rng = random.Random(args.seed)
+    pages = [
+        Document(
+            page_content=policy_page(rng, TOPICS[i % len(TOPICS)], i + 1),
+            metadata={'source': f"synthetic_{i // 10:04d}.pdf", 'page': i % 10}
+        )
+        for i in range(args.pages)
+    ]
+    if args.data_dir:
+        for path in sorted(Path(args.data_dir).glob('*.pdf')):
+            pages.extend(DocumentLoader.load_pdf(str(path)))
+    return pages
+
+
+def run_splitter(name: str, config: Dict[str, Any], pages: List[Document], repeat: int) -> Dict[str, Any]:
+    """Split every page with one splitter configuration and measure it."""
+    splitter = TextSplitter(config)
+
+    best = float('inf')
+    chunks: List[Document] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = list(splitter.iter_chunks(pages))
+        best = min(best, time.perf_counter() - start)
+
+    tokens = [count_tokens(chunk.page_content) for chunk in chunks]
+    characters = [len(chunk.page_content) for chunk in chunks]
+    return {
+        'splitter': name,
+        'seconds': best,
+        'pages_per_second': len(pages) / best if best else 0.0,
+        'chunks_per_second': len(chunks) / best if best else 0.0,
+        'chunks': len(chunks),
+        'tokens': {
+            'mean': sum(tokens) / len(tokens) if tokens else 0.0,
+            'p50': percentile(tokens, 50),
+            'p95': percentile(tokens, 95),
+            'max': max(tokens, default=0),
+        },
+        'characters': {
+            'mean': sum(characters) / len(characters) if characters else 0.0,
+            'max': max(characters, default=0),
+        },
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark both splitters on the same pages."""
+    pages = build_pages(args)
+    recursive = run_splitter('recursive', {
+        'splitter': 'recursive',
+        'chunk_size': args.chunk_size,
+        'chunk_overlap': args.chunk_overlap,
+    }, pages, args.repeat)
+    token = run_splitter('token', {
+        'splitter': 'token',
+        'chunk_tokens': args.chunk_tokens,
+        'chunk_overlap_tokens': args.chunk_overlap_tokens,
+    }, pages, args.repeat)
+
+    return {
+        'pages': len(pages),
+        'characters': sum(len(page.page_content) for page in pages),
+        'results': [recursive, token],
+        'chunk_count_ratio': token['chunks'] / recursive['chunks'] if recursive['chunks'] else 0.0,
+        'speedup': recursive['seconds'] / token['seconds'] if token['seconds'] else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text splitter benchmark")
+    parser.add_argument('--pages', type=int, default=1000, help="Synthetic pages to generate")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Directory of real PDFs to add; '' for none")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Recursive splitter characters per chunk")
+    parser.add_argument('--chunk-overlap', type=int, default=200, help="Recursive splitter overlap in characters")
+    parser.add_argument('--chunk-tokens', type=int, default=250, help="Token splitter tokens per chunk")
+    parser.add_argument('--chunk-overlap-tokens', type=int, default=50, help="Token splitter overlap in tokens")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Benchmark vector store backends on the same synthetic corpus.
+
+Every backend is built through VectorStoreFactory from the same random
+unit vectors, then reopened from disk and queried with the same query
+vectors. Reported per backend: build time, index size on disk, load time,
+query latency percentiles, recall@k against exact search, MMR retrieval
+latency relative to similarity search and, for stores that support it, the
+time to answer all queries as one batch.
+
+Usage:
+    python -m benchmarks.bench_vectorstores --vectors 20000 --dimensions 384 --queries 200
+    python -m benchmarks.bench_vectorstores --backends chroma,numpy --mmr-fetch-k 50 --lambda-mult 0.5
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from components import Retriever
+from factories import VectorStoreFactory
+from utils.metrics import latency_summary
+
+BACKENDS: Dict[str, Dict[str, Any]] = {
+    'chroma': {'type': 'chroma'},
+    'faiss-flat': {'type': 'faiss', 'faiss': {'index_type': 'flat'}},
+    'faiss-ivf': {'type': 'faiss', 'faiss': {'index_type': 'ivf', 'nlist': 128, 'nprobe': 8}},
+    'faiss-hnsw': {'type': 'faiss', 'faiss': {'index_type': 'hnsw'}},
+    'numpy': {'type': 'numpy'},
+    'numpy-float16': {'type': 'numpy', 'numpy': {'dtype': 'float16'}},
+}
+
+
+def search(vectorstore: Any, query: List[float], k: int) -> List[int]:
+    """Return the corpus rows of the k nearest documents."""
+    if hasattr(vectorstore, 'similarity_search_by_vector_with_relevance_scores'):
+        results = vectorstore.similarity_search_by_vector_with_relevance_scores(query, k=k)
+    else:
+        results = vectorstore.similarity_search_with_score_by_vector(query, k=k)
+    return [doc.metadata['row'] for doc, _ in results]
+
+
+def directory_size(path: Path) -> int:
+    """Total size of the files under a directory in bytes."""
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+def run_backend(
+        name: str,
+        config: Dict[str, Any],
+        vectors: np.ndarray,
+        queries: np.ndarray,
+        truth: List[List[int]],
+        args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Build, reload and query one backend."""
+    factory = VectorStoreFactory()
+    embedding = DeterministicFakeEmbedding(size=vectors.shape[1])
+    persist_directory = Path(tempfile.mkdtemp(prefix=f"bench-{name}-"))
+    config = {**config, 'persist_directory': str(persist_directory), 'collection_name': 'bench'}
+
+    ids = [f"doc-{i}" for i in range(len(vectors))]
+    documents = [Document(page_content=f"Synthetic chunk {i}", metadata={'row': i}) for i in range(len(vectors))]
+
+    start = time.perf_counter()
+    vectorstore = factory.create(config, embedding)
+    for i in range(0, len(vectors), args.batch_size):
+        factory.add_embeddings(
+            vectorstore,
+            documents[i:i + args.batch_size],
+            vectors[i:i + args.batch_size].tolist(),
+            ids[i:i + args.batch_size]
+        )
+    factory.persist(vectorstore)
+    build_seconds = time.perf_counter() - start
+    del vectorstore
+
+    start = time.perf_counter()
+    vectorstore = factory.create(config, embedding)
+    search(vectorstore, queries[0].tolist(), args.k)
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    hits = 0
+    start = time.perf_counter()
+    for query, expected in zip(queries, truth):
+        query_start = time.perf_counter()
+        found = search(vectorstore, query.tolist(), args.k)
+        latencies.append(time.perf_counter() - query_start)
+        hits += len(set(found) & set(expected))
+    elapsed = time.perf_counter() - start
+
+    similarity_latency = latency_summary(latencies, elapsed)
+    mmr_latency = time_mmr(vectorstore, queries, args)
+
+    result = {
+        'build_seconds': build_seconds,
+        'index_bytes': directory_size(persist_directory),
+        'load_and_first_query_seconds': load_seconds,
+        'query_latency': similarity_latency,
+        f'recall_at_{args.k}': hits / (len(queries) * args.k),
+        'mmr_latency': mmr_latency,
+        'mmr_to_similarity_p50': mmr_latency['p50'] / similarity_latency['p50'] if similarity_latency['p50'] else 0.0,
+    }
+
+    if hasattr(vectorstore, 'similarity_search_batch_by_vector'):
+        start = time.perf_counter()
+        vectorstore.similarity_search_batch_by_vector(queries.tolist(), k=args.k)
+        result['batch_query_seconds'] = time.perf_counter() - start
+
+    return result
+
+
+def time_mmr(vectorstore: Any, queries: np.ndarray, args: argparse.Namespace) -> Dict[str, float]:
+    """Time MMR retrieval through the Retriever, as queries run it."""
+    retriever = Retriever(vectorstore, {
+        'top_k': args.k,
+        'search_type': 'mmr',
+        'mmr': {'fetch_k': args.mmr_fetch_k, 'lambda_mult': args.lambda_mult},
+    })
+
+    latencies = []
+    start = time.perf_counter()
+    for query in queries:
+        query_start = time.perf_counter()
+        retriever.retrieve_with_scores('', embedding=query.tolist())
+        latencies.append(time.perf_counter() - query_start)
+    return latency_summary(latencies, time.perf_counter() - start)
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run every selected backend on the same corpus."""
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.standard_normal((args.vectors, args.dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # Queries near stored vectors, like real questions near their answers
+    queries = vectors[rng.choice(args.vectors, args.queries)] + 0.5 * rng.standard_normal(
+        (args.queries, args.dimensions)).astype(np.float32) / np.sqrt(args.dimensions)
+
+    normalized = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    exact = np.argsort(-(normalized @ vectors.T), axis=1)[:, :args.k]
+    truth = exact.tolist()
+
+    backends = args.backends.split(',') if args.backends else list(BACKENDS)
+    return {
+        'vectors': args.vectors,
+        'dimensions': args.dimensions,
+        'queries': args.queries,
+        'k': args.k,
+        'backends': {
+            name: run_backend(name, BACKENDS[name], vectors, queries, truth, args) for name in backends
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store backend benchmark")
+    parser.add_argument('--vectors', type=int, default=20000)
+    parser.add_argument('--dimensions', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--mmr-fetch-k', type=int, default=20, help="Candidates MMR selects from")
+    parser.add_argument('--lambda-mult', type=float, default=0.5, help="MMR relevance/diversity trade-off")
+    parser.add_argument('--backends', default='', help=f"Comma-separated subset of {', '.join(BACKENDS)}")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == '__main__':
+    main()
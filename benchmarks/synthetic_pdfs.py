@@ -0,0 +1,147 @@
+"""Generate synthetic HR policy PDFs for benchmarks.
+
+The PDFs are written directly in the PDF text format, so no PDF library is
+needed. The same seed always produces the same corpus.
+
+Usage:
+    python -m benchmarks.synthetic_pdfs ./benchmarks/corpus --documents 20 --pages 10
+"""
+import argparse
+import random
+import textwrap
+from pathlib import Path
+from typing import List
+
+LINES_PER_PAGE = 55
+CHARS_PER_LINE = 95
+
+TOPICS = [
+    'Leave Policy', 'Travel and Expense Policy', 'Code of Conduct', 'POSH Policy',
+    'Remote Work Policy', 'Payroll and Form 16', 'Performance Review Policy',
+    'Information Security Policy', 'Grievance Redressal Policy', 'Notice Period and Exit Policy'
+]
+SUBJECTS = [
+    'Employees', 'Managers', 'The HR team', 'Contractors', 'New joiners', 'Team leads',
+    'The Compliance Officer', 'Interns', 'The Finance team', 'Department heads'
+]
+VERBS = [
+    'must submit', 'may request', 'are required to complete', 'should review', 'must report',
+    'are entitled to', 'must obtain approval for', 'may not claim', 'will receive', 'must retain'
+]
+OBJECTS = [
+    'earned leave', 'the reimbursement claim', 'a Form 16 certificate', 'the travel itinerary',
+    'a written complaint', 'the annual performance appraisal', 'sick leave', 'the exit checklist',
+    'the laptop and access cards', 'the quarterly attendance report', 'compensatory off',
+    'the gift and hospitality register', 'the hotel invoice', 'the background verification form'
+]
+CONDITIONS = [
+    'within 30 days of the event', 'before the end of the financial year',
+    'through the HR portal', 'with prior approval from the reporting manager',
+    'as described in clause {clause}', 'subject to the limits in Annexure {annex}',
+    'no later than the 5th working day of the month', 'in line with the POSH Act, 2013',
+    'during the notice period', 'with supporting documents'
+]
+
+
+def write_pdf(path: Path, pages: List[str]) -> None:
+    """
+    Write a text-only PDF with one string per page.
+
+    Args:
+        path: Output file path
+        pages: Text of each page; lines are wrapped to fit the page
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+
+    for text in pages:
+        lines = []
+        for paragraph in text.split('\n'):
+            lines.extend(textwrap.wrap(paragraph, CHARS_PER_LINE) or [''])
+        escaped = [
+            line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            for line in lines[:LINES_PER_PAGE]
+        ]
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET"
+        stream_bytes = stream.encode('latin-1', errors='replace')
+
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream_bytes) + stream_bytes + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode('ascii')
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+
+    path.write_bytes(bytes(output))
+
+
+def policy_page(rng: random.Random, topic: str, number: int) -> str:
+    """Generate one page of policy-like text."""
+    paragraphs = [f"{topic} - Section {number}"]
+    for clause in range(1, rng.randint(4, 7)):
+        sentences = []
+        for _ in range(rng.randint(3, 6)):
+            condition = rng.choice(CONDITIONS).format(
+                clause=f"{number}.{clause}.{rng.randint(1, 9)}", annex=rng.choice('ABCD')
+            )
+            sentences.append(f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} {condition}.")
+        paragraphs.append(f"{number}.{clause} " + " ".join(sentences))
+    return "\n".join(paragraphs)
+
+
+def generate_corpus(directory: str, documents: int = 10, pages: int = 5, seed: int = 0) -> List[Path]:
+    """
+    Write a deterministic corpus of synthetic policy PDFs.
+
+    Args:
+        directory: Output directory
+        documents: Number of PDF files
+        pages: Pages per file
+        seed: Random seed
+
+    Returns:
+        Paths of the written files
+    """
+    rng = random.Random(seed)
+    output_dir = Path(directory)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for i in range(documents):
+        topic = TOPICS[i % len(TOPICS)]
+        path = output_dir / f"synthetic_{i:04d}_{topic.lower().replace(' ', '_')}.pdf"
+        write_pdf(path, [policy_page(rng, topic, page + 1) for page in range(pages)])
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic policy PDF generator")
+    parser.add_argument('directory')
+    parser.add_argument('--documents', type=int, default=10)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.directory, args.documents, args.pages, args.seed)
+    print(f"Wrote {len(paths)} PDF(s) to {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,24 @@
 """Component modules for document processing and retrieval."""
 
 from .document_loader import DocumentLoader
-from .text_splitter import TextSplitter
+from .text_splitter import TextSplitter, TokenSplitter
 from .retriever import Retriever
+from .embedding_cache import EmbeddingCache, CachedEmbeddings
+from .embedding_scheduler import ScheduledEmbeddings, RateLimiter
+from .index_manifest import IndexManifest
+from .semantic_cache import SemanticCache
+from .local_vectorstore import LocalVectorStore
+from .keyword_index import KeywordIndex
+from .context_packer import ContextPacker, PackedContext
+from .chunk_deduplicator import ChunkDeduplicator
+from .index_snapshots import SnapshotStore
+from .sharded_vectorstore import ShardedVectorStore
+from .mmr import Candidates, mmr_select
 
-__all__ = ['DocumentLoader', 'TextSplitter', 'Retriever']
+# Backend stores such as components.faiss_vectorstore are imported by
+# VectorStoreFactory only when selected, so they are not re-exported here.
+
+__all__ = ['DocumentLoader', 'TextSplitter', 'TokenSplitter', 'Retriever', 'EmbeddingCache', 'CachedEmbeddings',
+           'ScheduledEmbeddings', 'RateLimiter', 'IndexManifest', 'SemanticCache',
+           'LocalVectorStore', 'KeywordIndex', 'ContextPacker', 'PackedContext', 'ChunkDeduplicator', 'SnapshotStore',
+           'ShardedVectorStore', 'Candidates', 'mmr_select']
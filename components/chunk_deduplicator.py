@@ -0,0 +1,131 @@
+"""Near-duplicate chunk detection for ingestion."""
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+
+from .keyword_index import tokenize
+
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+DEFAULT_SEED = 0
+
+# Mersenne prime for the permutation hashes; shingle hashes are reduced below
+# it so a * x + b stays within 64 bits
+_PRIME = (1 << 31) - 1
+
+
+class ChunkDeduplicator:
+    """
+    Detects near-duplicate chunks with MinHash and locality-sensitive hashing.
+
+    Each chunk is reduced to a MinHash signature over its word shingles.
+    Signatures are split into bands, and chunks sharing a band are compared
+    by the fraction of matching signature values, which estimates the
+    Jaccard similarity of their shingle sets. The first chunk seen is kept;
+    later chunks at or above the threshold are reported as its duplicates.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            config: Deduplication configuration
+        """
+        self.threshold = config.get('threshold', DEFAULT_THRESHOLD)
+        self.num_perm = config.get('num_perm', DEFAULT_NUM_PERM)
+        self.shingle_size = config.get('shingle_size', DEFAULT_SHINGLE_SIZE)
+        self.bands, self.rows = self._band_layout(self.threshold, self.num_perm)
+
+        rng = np.random.default_rng(config.get('seed', DEFAULT_SEED))
+        self._a = rng.integers(1, _PRIME, self.num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, _PRIME, self.num_perm, dtype=np.uint64)[:, None]
+
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: List[np.ndarray] = []
+        self._kept: List[Tuple[str, Dict[str, Any]]] = []
+        self.checked = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def _band_layout(threshold: float, num_perm: int) -> Tuple[int, int]:
+        """
+        Choose the number of bands and rows per band for a similarity threshold.
+
+        Chunks with similarity s share a band with probability
+        1 - (1 - s^rows)^bands, which rises steeply around (1/bands)^(1/rows).
+        The layout whose turning point is closest below the threshold is
+        used, so few true duplicates are missed; candidates are verified
+        against the full signature afterwards.
+        """
+        best = (num_perm, 1)
+        best_distance = float('inf')
+        for rows in range(1, num_perm + 1):
+            bands = num_perm // rows
+            turning_point = (1 / bands) ** (1 / rows)
+            if turning_point <= threshold and threshold - turning_point < best_distance:
+                best, best_distance = (bands, rows), threshold - turning_point
+        return best
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Array of num_perm minimum hash values, or None if the text has no words
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+
+        size = min(self.shingle_size, len(tokens))
+        shingles = {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) & _PRIME for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        # One row per permutation; the minimum over shingles is the signature value
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def check(self, chunk_id: str, doc: Document) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Check a chunk against the chunks kept so far.
+
+        A chunk that is not a near-duplicate is kept and later chunks are
+        compared with it.
+
+        Args:
+            chunk_id: ID of the chunk
+            doc: Chunk to check
+
+        Returns:
+            (ID, metadata) of the kept chunk this chunk duplicates, or None
+            if the chunk is kept
+        """
+        self.checked += 1
+        signature = self.signature(doc.page_content)
+        if signature is None:
+            return None
+
+        keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+        candidates = set()
+        for buckets, key in zip(self._buckets, keys):
+            candidates.update(buckets.get(key, ()))
+        for row in sorted(candidates):
+            if np.mean(self._signatures[row] == signature) >= self.threshold:
+                self.duplicates += 1
+                return self._kept[row]
+
+        row = len(self._kept)
+        self._signatures.append(signature)
+        self._kept.append((chunk_id, doc.metadata))
+        for buckets, key in zip(self._buckets, keys):
+            buckets.setdefault(key, []).append(row)
+        return None
@@ -0,0 +1,245 @@
+"""Context packing component."""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+
+from utils.token_counter import count_tokens
+
+DEFAULT_MAX_TOKENS = 3000
+DEFAULT_SEPARATOR = "\n\n"
+# Shortest shared text treated as chunk overlap when chunks have no offsets
+MIN_TEXT_OVERLAP = 20
+# Characters of stripped whitespace allowed between chunks that still count as touching
+MAX_OFFSET_GAP = 2
+
+
+@dataclass
+class PackedContext:
+    """Prompt context built from retrieved chunks."""
+
+    text: str
+    passages: List[Document] = field(default_factory=list)
+    tokens: int = 0
+    tokens_before: int = 0
+    merged: int = 0
+    dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        """Tokens saved compared with joining every retrieved chunk."""
+        return max(0, self.tokens_before - self.tokens)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get packing statistics.
+
+        Returns:
+            Dictionary with token counts before and after packing, tokens
+            saved, and the number of passages, merged and dropped chunks
+        """
+        return {
+            'tokens_before': self.tokens_before,
+            'tokens': self.tokens,
+            'tokens_saved': self.tokens_saved,
+            'passages': len(self.passages),
+            'merged': self.merged,
+            'dropped': self.dropped
+        }
+
+
+class ContextPacker:
+    """
+    Packs retrieved chunks into a token-budgeted prompt context.
+
+    Chunks from the same source and page that overlap or touch are merged
+    into one passage, so text repeated by the splitter's chunk overlap is
+    sent once. Passages are ordered by their best chunk score and added
+    until the token budget is reached.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the context packer.
+
+        Args:
+            config: Context packing configuration
+        """
+        self.max_tokens = config.get('max_tokens', DEFAULT_MAX_TOKENS)
+        self.merge_overlaps = config.get('merge_overlaps', True)
+        self.separator = config.get('separator', DEFAULT_SEPARATOR)
+
+    def pack(self, scored_docs: List[Tuple[Document, Optional[float]]]) -> PackedContext:
+        """
+        Build the prompt context for retrieved chunks.
+
+        Args:
+            scored_docs: Retrieved (Document, score) tuples in retrieval order;
+                a None score keeps the retrieval order
+
+        Returns:
+            PackedContext with the context text and packing statistics
+        """
+        if not scored_docs:
+            return PackedContext(text="")
+
+        tokens_before = count_tokens(self.separator.join(doc.page_content for doc, _ in scored_docs))
+
+        passages = self._merge(scored_docs) if self.merge_overlaps else [
+            (doc, score, rank) for rank, (doc, score) in enumerate(scored_docs)
+        ]
+        merged = len(scored_docs) - len(passages)
+
+        # Best score first; ties and unscored chunks keep the retrieval order
+        passages.sort(key=lambda passage: (-(passage[1] if passage[1] is not None else 0.0), passage[2]))
+
+        packed: List[Document] = []
+        used = 0
+        separator_tokens = count_tokens(self.separator)
+        for doc, _, _ in passages:
+            tokens = count_tokens(doc.page_content) + (separator_tokens if packed else 0)
+            if self.max_tokens <= 0 or used + tokens <= self.max_tokens:
+                packed.append(doc)
+                used += tokens
+            elif not packed:
+                # The best passage alone is over budget; keep its beginning
+                doc = self._truncate(doc, self.max_tokens)
+                packed.append(doc)
+                used = count_tokens(doc.page_content)
+
+        text = self.separator.join(doc.page_content for doc in packed)
+        return PackedContext(
+            text=text,
+            passages=packed,
+            tokens=count_tokens(text),
+            tokens_before=tokens_before,
+            merged=merged,
+            dropped=len(passages) - len(packed)
+        )
+
+    def _merge(
+            self,
+            scored_docs: List[Tuple[Document, Optional[float]]]
+    ) -> List[Tuple[Document, Optional[float], int]]:
+        """Merge overlapping chunks of the same source and page into (passage, best score, first rank) tuples."""
+        groups: Dict[Tuple[Any, Any], List[Tuple[Document, Optional[float], int]]] = {}
+        for rank, (doc, score) in enumerate(scored_docs):
+            key = (doc.metadata.get('source'), doc.metadata.get('page'))
+            groups.setdefault(key, []).append((doc, score, rank))
+
+        passages = []
+        for group in groups.values():
+            if len(group) == 1:
+                passages.extend(group)
+                continue
+
+            # Chunks with offsets merge by position; the rest by shared text
+            with_offsets = sorted(
+                (item for item in group if isinstance(item[0].metadata.get('start_index'), int)),
+                key=lambda item: item[0].metadata['start_index']
+            )
+            without_offsets = [item for item in group if not isinstance(item[0].metadata.get('start_index'), int)]
+            passages.extend(self._merge_by_offset(with_offsets))
+            passages.extend(self._merge_by_text(without_offsets))
+
+        return passages
+
+    @staticmethod
+    def _merge_by_offset(
+            items: List[Tuple[Document, Optional[float], int]]
+    ) -> List[Tuple[Document, Optional[float], int]]:
+        """Merge chunks sorted by page offset whose character ranges overlap or touch."""
+        merged = []
+        for doc, score, rank in items:
+            start = doc.metadata['start_index']
+            if merged:
+                last_doc, last_score, last_rank = merged[-1]
+                last_start = last_doc.metadata['start_index']
+                last_end = last_start + len(last_doc.page_content)
+                if start <= last_end + MAX_OFFSET_GAP:
+                    text = last_doc.page_content
+                    tail = doc.page_content[max(0, last_end - start):]
+                    if tail:
+                        # The splitter strips the whitespace between touching chunks;
+                        # padding it back keeps the text aligned with the page offsets
+                        text += " " * max(0, start - last_end) + tail
+                    merged[-1] = (
+                        Document(page_content=text, metadata=last_doc.metadata),
+                        ContextPacker._best(last_score, score),
+                        min(last_rank, rank)
+                    )
+                    continue
+            merged.append((doc, score, rank))
+        return merged
+
+    @staticmethod
+    def _merge_by_text(
+            items: List[Tuple[Document, Optional[float], int]]
+    ) -> List[Tuple[Document, Optional[float], int]]:
+        """Merge chunks without offsets where one contains the other or a suffix equals a prefix."""
+        merged: List[Tuple[Document, Optional[float], int]] = []
+        for doc, score, rank in items:
+            i = 0
+            while i < len(merged):
+                other, other_score, other_rank = merged[i]
+                text = ContextPacker._join_overlapping(other.page_content, doc.page_content)
+                if text is None:
+                    text = ContextPacker._join_overlapping(doc.page_content, other.page_content)
+                if text is None:
+                    i += 1
+                    continue
+
+                # The joined passage may now overlap a passage checked earlier
+                del merged[i]
+                doc = Document(page_content=text, metadata=other.metadata)
+                score = ContextPacker._best(other_score, score)
+                rank = min(other_rank, rank)
+                i = 0
+            merged.append((doc, score, rank))
+        return merged
+
+    @staticmethod
+    def _join_overlapping(first: str, second: str) -> Optional[str]:
+        """
+        Join two texts where the end of the first repeats the start of the second.
+
+        Returns:
+            The joined text, the longer text if one contains the other, or
+            None if they share no overlap of at least MIN_TEXT_OVERLAP characters
+        """
+        if second in first:
+            return first
+        if first in second:
+            return second
+        if len(first) < MIN_TEXT_OVERLAP or len(second) < MIN_TEXT_OVERLAP:
+            return None
+
+        head = second[:MIN_TEXT_OVERLAP]
+        position = first.find(head)
+        while position != -1:
+            if second.startswith(first[position:]):
+                return first[:position] + second
+            position = first.find(head, position + 1)
+        return None
+
+    @staticmethod
+    def _best(first: Optional[float], second: Optional[float]) -> Optional[float]:
+        """Higher of two scores, treating None as missing."""
+        if first is None:
+            return second
+        if second is None:
+            return first
+        return max(first, second)
+
+    @staticmethod
+    def _truncate(doc: Document, max_tokens: int) -> Document:
+        """Cut a passage at a word boundary so it fits in max_tokens."""
+        words = doc.page_content.split(' ')
+        low, high = 0, len(words)
+        # Binary search for the longest word prefix within the budget
+        while low < high:
+            middle = (low + high + 1) // 2
+            if count_tokens(' '.join(words[:middle])) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return Document(page_content=' '.join(words[:low]), metadata=doc.metadata)
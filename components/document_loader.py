@@ -1,8 +1,16 @@
 """Document loader component."""
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Tuple
 from langchain_core.documents import Document
-from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
+
+from utils.tracing import get_tracer, span
+
+DEFAULT_WORKERS = 1
 
 
 class DocumentLoader:
@@ -31,21 +39,29 @@ class DocumentLoader:
         if path.suffix.lower() != '.pdf':
             raise ValueError(f"File must be a PDF: {file_path}")
 
+        from langchain_community.document_loaders import PyPDFLoader
+
         loader = PyPDFLoader(file_path)
         documents = loader.load()
 
         return documents
 
     @staticmethod
-    def load_directory(directory_path: str) -> List[Document]:
+    def load_directory(directory_path: str, workers: int = DEFAULT_WORKERS) -> Iterator[Document]:
         """
         Load all PDF documents from a directory.
 
+        With more than one worker, files are parsed in a process pool and
+        their pages are yielded as soon as each file finishes. Pages of a
+        file keep their order and metadata; a file that fails to parse is
+        reported and skipped without affecting the others.
+
         Args:
             directory_path: Path to the directory
+            workers: Number of worker processes; 0 uses all CPU cores
 
         Returns:
-            List of Document objects
+            Iterator of Document objects
 
         Raises:
             FileNotFoundError: If the directory doesn't exist
@@ -58,7 +74,17 @@ class DocumentLoader:
         if not path.is_dir():
             raise ValueError(f"Path must be a directory: {directory_path}")
 
-        documents = []
+        workers = DocumentLoader.resolve_workers(workers)
+        if workers > 1:
+            pdf_files = sorted(str(pdf_file) for pdf_file in path.glob('*.pdf'))
+            return (
+                doc
+                for _, docs in DocumentLoader.load_files(pdf_files, workers)
+                for doc in docs
+            )
+
+        from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
+
         loader = DirectoryLoader(
             path=path,
             glob='*.pdf',
@@ -66,13 +92,80 @@ class DocumentLoader:
         )
         documents = loader.lazy_load()
 
-        #pdf_files = list(path.glob('*.pdf'))
+        return documents
+
+    @staticmethod
+    def load_files(file_paths: Iterable[str], workers: int = DEFAULT_WORKERS) -> Iterator[Tuple[str, List[Document]]]:
+        """
+        Load PDF files, in parallel when more than one worker is configured.
 
-        # for pdf_file in pdf_files:
-        #     try:
-        #         docs = DocumentLoader.load_pdf(str(pdf_file))
-        #         documents.extend(docs)
-        #     except Exception as e:
-        #         print(f"Warning: Failed to load {pdf_file}: {e}")
+        Files are yielded in completion order together with all of their
+        pages. At most two files per worker are in flight at a time, so
+        parsed pages do not pile up ahead of the consumer.
 
-        return documents
\ No newline at end of file
+        Args:
+            file_paths: Paths to the PDF files
+            workers: Number of worker processes; 0 uses all CPU cores
+
+        Returns:
+            Iterator of (file path, documents) tuples; failed files are skipped
+        """
+        workers = DocumentLoader.resolve_workers(workers)
+
+        if workers <= 1:
+            for file_path in file_paths:
+                try:
+                    with span('loader.load_pdf', file=Path(file_path).name) as load_span:
+                        documents = DocumentLoader.load_pdf(file_path)
+                        load_span.set(pages=len(documents))
+                except Exception as e:
+                    print(f"Warning: Failed to load {file_path}: {e}", file=sys.stderr)
+                    continue
+                yield file_path, documents
+            return
+
+        remaining = iter(file_paths)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Worker processes cannot add spans here; time each file from submission instead
+            pending = {
+                executor.submit(DocumentLoader.load_pdf, file_path): (file_path, time.perf_counter())
+                for file_path in islice(remaining, workers * 2)
+            }
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    file_path, submitted = pending.pop(future)
+                    next_path = next(remaining, None)
+                    if next_path is not None:
+                        pending[executor.submit(DocumentLoader.load_pdf, next_path)] = (next_path, time.perf_counter())
+
+                    try:
+                        documents = future.result()
+                    except Exception as e:
+                        print(f"Warning: Failed to load {file_path}: {e}", file=sys.stderr)
+                        continue
+
+                    get_tracer().record(
+                        'loader.load_pdf', time.perf_counter() - submitted,
+                        file=Path(file_path).name, pages=len(documents), worker=True
+                    )
+                    yield file_path, documents
+
+    @staticmethod
+    def resolve_workers(workers: int) -> int:
+        """
+        Resolve a configured worker count.
+
+        Args:
+            workers: Configured worker count; 0 or less means all CPU cores
+
+        Returns:
+            Effective number of workers
+        """
+        if workers is None:
+            return DEFAULT_WORKERS
+        if workers <= 0:
+            return os.cpu_count() or 1
+        return workers
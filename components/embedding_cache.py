@@ -0,0 +1,318 @@
+"""Persistent, content-addressed embedding cache."""
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+
+from utils.tracing import count
+
+DEFAULT_CACHE_PATH = './indexes/embedding_cache.sqlite'
+DEFAULT_MAX_ENTRIES = 100000
+# Write pending last-access times once this many lookups have hit
+DEFAULT_TOUCH_BATCH = 1000
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding store with LRU eviction.
+
+    Lookups only read the database: the access times of hit entries are
+    kept in memory and written in one transaction by the next put_many(),
+    by close(), or once touch_batch of them are pending.
+    """
+
+    def __init__(
+            self,
+            path: str = DEFAULT_CACHE_PATH,
+            max_entries: int = DEFAULT_MAX_ENTRIES,
+            touch_batch: int = DEFAULT_TOUCH_BATCH
+    ):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            path: Path to the SQLite database file
+            max_entries: Maximum number of vectors kept before evicting the least recently used
+            touch_batch: Number of pending access times that triggers a write
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.touch_batch = touch_batch
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Access times of hit entries not yet written to the database
+        self._touched: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """
+        Build the cache key for a text embedded by a given model.
+
+        Args:
+            model_name: Embedding model name
+            text: Text being embedded
+
+        Returns:
+            Hex digest identifying the (model, text) pair
+        """
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{model_name}:{digest}"
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up vectors for the given keys and mark them as recently used.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of found keys to their vectors
+        """
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array('f', blob).tolist()
+
+            now = time.time()
+            self._touched.update((key, now) for key in found)
+            if len(self._touched) >= self.touch_batch:
+                self._flush_touched()
+                self._conn.commit()
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """
+        Store vectors and evict the least recently used entries over the limit.
+
+        Args:
+            items: Mapping of cache keys to vectors
+        """
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                [(key, array('f', vector).tobytes(), now) for key, vector in items.items()]
+            )
+            # Record recent hits first so eviction sees them as recently used
+            self._flush_touched()
+            self._evict()
+            self._conn.commit()
+
+    def flush(self) -> None:
+        """Write pending access times to the database."""
+        with self._lock:
+            if self._touched:
+                self._flush_touched()
+                self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        """Write pending access times; the caller holds the lock and commits."""
+        if not self._touched:
+            return
+
+        self._conn.executemany(
+            "UPDATE embeddings SET last_access = ? WHERE key = ?",
+            [(now, key) for key, now in self._touched.items()]
+        )
+        self._touched.clear()
+
+    def _evict(self) -> None:
+        """Delete the least recently used entries beyond max_entries."""
+        if self.max_entries <= 0:
+            return
+
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, evictions, hit rate and size
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self)
+        }
+
+    def close(self) -> None:
+        """Write pending access times and close the underlying database connection."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated texts from an EmbeddingCache."""
+
+    def __init__(self, embedding: Embeddings, cache: EmbeddingCache, model_name: str):
+        """
+        Initialize the cached embeddings wrapper.
+
+        Args:
+            embedding: Underlying embedding model
+            cache: Cache used to store vectors
+            model_name: Model name used to namespace cache keys
+        """
+        self.embedding = embedding
+        self.cache = cache
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, only calling the underlying model for cache misses.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embedding vectors in input order
+        """
+        keys, vectors, missing = self._lookup_documents(texts)
+        if missing:
+            self._store(vectors, missing, self.embedding.embed_documents(list(missing.values())))
+        return [vectors[key] for key in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Asynchronously embed documents, only calling the underlying model for cache misses.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embedding vectors in input order
+        """
+        keys, vectors, missing = self._lookup_documents(texts)
+        if missing:
+            self._store(vectors, missing, await self.embedding.aembed_documents(list(missing.values())))
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, reusing a cached vector when available.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        key, vector = self._lookup_query(text)
+        if vector is None:
+            vector = self.embedding.embed_query(text)
+            self.cache.put_many({key: vector})
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Asynchronously embed a query, reusing a cached vector when available.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        key, vector = self._lookup_query(text)
+        if vector is None:
+            vector = await self.embedding.aembed_query(text)
+            self.cache.put_many({key: vector})
+        return vector
+
+    def _lookup_documents(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]], Dict[str, str]]:
+        """
+        Look up the cached vectors of documents.
+
+        Returns:
+            Tuple of the cache key of each text, the cached vectors by key,
+            and each distinct missing text by key
+        """
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        vectors = self.cache.get_many(keys)
+        count('embedding_cache_hits', len(vectors))
+        count('embedding_cache_misses', len(keys) - len(vectors))
+
+        # Embed each distinct missing text once
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        return keys, vectors, missing
+
+    def _store(
+            self,
+            vectors: Dict[str, List[float]],
+            missing: Dict[str, str],
+            new_vectors: List[List[float]]
+    ) -> None:
+        """Cache the vectors computed for the missing texts and add them to the looked-up vectors."""
+        computed = dict(zip(missing.keys(), new_vectors))
+        self.cache.put_many(computed)
+        vectors.update(computed)
+
+    def _lookup_query(self, text: str) -> Tuple[str, Optional[List[float]]]:
+        """
+        Look up the cached vector of a query.
+
+        Returns:
+            Tuple of the cache key and the cached vector, or None on a miss
+        """
+        key = EmbeddingCache.make_key(self.model_name, text)
+        vector = self.cache.get_many([key]).get(key)
+        count('embedding_cache_hits' if vector is not None else 'embedding_cache_misses')
+        return key, vector
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return self.cache.stats()
@@ -0,0 +1,351 @@
+"""Rate-limit-aware concurrent embedding scheduler."""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+
+from utils.token_counter import count_tokens
+
+DEFAULT_BATCH_SIZE = 128
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 6
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+RATE_WINDOW_SECONDS = 60.0
+
+
+class RateLimitError(Exception):
+    """Raised when a provider throttles a request."""
+
+    status_code = 429
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Check whether an exception signals provider throttling.
+
+    Args:
+        error: Exception raised by an embedding call
+
+    Returns:
+        True for HTTP 429 / rate limit errors
+    """
+    if getattr(error, 'status_code', None) == 429:
+        return True
+    return 'ratelimit' in type(error).__name__.lower()
+
+
+class RateLimiter:
+    """Sliding-window limiter for requests and tokens per minute."""
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute: Request budget per minute; 0 disables the limit
+            tokens_per_minute: Token budget per minute; 0 disables the limit
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Block until a request of the given size fits in both budgets.
+
+        A request larger than the whole token budget is let through once the
+        window is empty rather than blocking forever.
+
+        Args:
+            tokens: Tokens the request will consume
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._reserve(tokens)
+            if delay is None:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def aacquire(self, tokens: int) -> float:
+        """
+        Wait without blocking the event loop until a request of the given size fits in both budgets.
+
+        Args:
+            tokens: Tokens the request will consume
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._reserve(tokens)
+            if delay is None:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def _reserve(self, tokens: int) -> Optional[float]:
+        """
+        Record a request in the window if it fits in both budgets.
+
+        Returns:
+            None if the request was recorded, otherwise the seconds to wait before trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0][0] >= RATE_WINDOW_SECONDS:
+                _, expired_tokens = self._window.popleft()
+                self._window_tokens -= expired_tokens
+
+            requests_ok = not self.requests_per_minute or len(self._window) < self.requests_per_minute
+            tokens_ok = (
+                not self.tokens_per_minute
+                or not self._window
+                or self._window_tokens + tokens <= self.tokens_per_minute
+            )
+            if requests_ok and tokens_ok:
+                self._window.append((now, tokens))
+                self._window_tokens += tokens
+                return None
+
+            return max(RATE_WINDOW_SECONDS - (now - self._window[0][0]), 0.001)
+
+
+class ScheduledEmbeddings(Embeddings):
+    """Embeddings wrapper that sends fixed-size batches concurrently within rate limits."""
+
+    def __init__(
+            self,
+            embedding: Embeddings,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+            requests_per_minute: int = 0,
+            tokens_per_minute: int = 0,
+            max_retries: int = DEFAULT_MAX_RETRIES,
+            backoff_base: float = DEFAULT_BACKOFF_BASE,
+            backoff_max: float = DEFAULT_BACKOFF_MAX
+    ):
+        """
+        Initialize the embedding scheduler.
+
+        Args:
+            embedding: Underlying embedding model
+            batch_size: Texts per embedding request
+            max_concurrency: Maximum requests in flight
+            requests_per_minute: Request budget per minute; 0 disables the limit
+            tokens_per_minute: Token budget per minute; 0 disables the limit
+            max_retries: Retries for a throttled batch before giving up
+            backoff_base: Initial backoff in seconds, doubled on each retry
+            backoff_max: Upper bound for a single backoff in seconds
+        """
+        self.embedding = embedding
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='embedding')
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'texts': 0,
+            'tokens': 0,
+            'retries': 0,
+            'throttle_wait_seconds': 0.0,
+            'busy_seconds': 0.0
+        }
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents in concurrent, rate-limited batches.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embedding vectors in input order
+        """
+        if not texts:
+            return []
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        start = time.perf_counter()
+
+        if len(batches) == 1:
+            results = [self._embed_batch(batches[0])]
+        else:
+            results = list(self._executor.map(self._embed_batch, batches))
+
+        with self._stats_lock:
+            self._stats['busy_seconds'] += time.perf_counter() - start
+
+        return [vector for batch in results for vector in batch]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Asynchronously embed documents in concurrent, rate-limited batches.
+
+        Batches are sent through the wrapped model's async API, at most
+        max_concurrency at a time, without occupying a thread each.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embedding vectors in input order
+        """
+        if not texts:
+            return []
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        start = time.perf_counter()
+
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self._acall_with_retry(lambda: self.embedding.aembed_documents(batch), batch)
+
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+
+        with self._stats_lock:
+            self._stats['busy_seconds'] += time.perf_counter() - start
+
+        return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query within the rate limits.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        return self._call_with_retry(lambda: self.embedding.embed_query(text), [text])
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Asynchronously embed a query within the rate limits.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        return await self._acall_with_retry(lambda: self.embedding.aembed_query(text), [text])
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch, retrying when throttled."""
+        return self._call_with_retry(lambda: self.embedding.embed_documents(texts), texts)
+
+    def _call_with_retry(self, call: Callable[[], Any], texts: List[str]) -> Any:
+        """
+        Run an embedding call within the rate limits, backing off on throttling.
+
+        Args:
+            call: Zero-argument function performing the request
+            texts: Texts sent in the request, used for token accounting
+
+        Returns:
+            The call's result
+
+        Raises:
+            Exception: The last error if retries are exhausted or the error is not throttling
+        """
+        tokens = sum(count_tokens(text) for text in texts)
+
+        for attempt in range(self.max_retries + 1):
+            self._record_wait(self.rate_limiter.acquire(tokens))
+            try:
+                result = call()
+            except Exception as e:
+                time.sleep(self._backoff(e, attempt))
+                continue
+
+            self._record_request(texts, tokens)
+            return result
+
+    async def _acall_with_retry(self, call: Callable[[], Awaitable[Any]], texts: List[str]) -> Any:
+        """
+        Await an embedding call within the rate limits, backing off on throttling.
+
+        Args:
+            call: Zero-argument function returning the request's awaitable
+            texts: Texts sent in the request, used for token accounting
+
+        Returns:
+            The call's result
+
+        Raises:
+            Exception: The last error if retries are exhausted or the error is not throttling
+        """
+        tokens = sum(count_tokens(text) for text in texts)
+
+        for attempt in range(self.max_retries + 1):
+            self._record_wait(await self.rate_limiter.aacquire(tokens))
+            try:
+                result = await call()
+            except Exception as e:
+                await asyncio.sleep(self._backoff(e, attempt))
+                continue
+
+            self._record_request(texts, tokens)
+            return result
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        """
+        Get the delay before retrying a failed request.
+
+        Raises:
+            Exception: The error itself if it is not throttling or retries are exhausted
+        """
+        if not is_rate_limit_error(error) or attempt == self.max_retries:
+            raise error
+
+        # Full jitter keeps concurrent batches from retrying in lockstep
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        with self._stats_lock:
+            self._stats['retries'] += 1
+        return backoff
+
+    def _record_wait(self, waited: float) -> None:
+        """Add time spent waiting for the rate limits to the statistics."""
+        with self._stats_lock:
+            self._stats['throttle_wait_seconds'] += waited
+
+    def _record_request(self, texts: List[str], tokens: int) -> None:
+        """Count a successful request in the statistics."""
+        with self._stats_lock:
+            self._stats['requests'] += 1
+            self._stats['texts'] += len(texts)
+            self._stats['tokens'] += tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get throughput statistics.
+
+        Returns:
+            Dictionary with request, text and token counts, retries and rates
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        busy = stats['busy_seconds']
+        stats['texts_per_second'] = stats['texts'] / busy if busy else 0.0
+        stats['tokens_per_second'] = stats['tokens'] / busy if busy else 0.0
+        return stats
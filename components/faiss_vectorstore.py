@@ -0,0 +1,175 @@
+"""FAISS vector store with flat, IVF and HNSW indexes."""
+from pathlib import Path
+from typing import List, Tuple
+import faiss
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .local_vectorstore import LocalVectorStore, DEFAULT_COMPACT_RATIO
+
+DEFAULT_INDEX_TYPE = 'flat'
+DEFAULT_NLIST = 100
+DEFAULT_NPROBE = 8
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_CONSTRUCTION = 200
+DEFAULT_EF_SEARCH = 64
+# FAISS needs about this many training vectors per IVF cell
+MIN_POINTS_PER_CENTROID = 39
+
+INDEX_TYPES = ('flat', 'ivf', 'hnsw')
+
+
+class FaissVectorStore(LocalVectorStore):
+    """
+    Vector store backed by a FAISS inner-product index.
+
+    ``flat`` is exact brute force, ``hnsw`` is a graph index that needs no
+    training, and ``ivf`` partitions vectors into ``nlist`` cells and
+    searches ``nprobe`` of them. An IVF index is trained when the store is
+    saved; until there are enough vectors to train it, the store stays flat
+    and search stays exact. Saved indexes are opened memory-mapped, so the
+    operating system pages vectors in on demand instead of reading the
+    whole file at startup. The first write after such a load reads the
+    index into memory, because a mapped index cannot grow.
+    """
+
+    index_suffix = '.faiss'
+
+    def __init__(
+            self,
+            embedding: Embeddings,
+            persist_directory: str,
+            collection_name: str,
+            index_type: str = DEFAULT_INDEX_TYPE,
+            nlist: int = DEFAULT_NLIST,
+            nprobe: int = DEFAULT_NPROBE,
+            hnsw_m: int = DEFAULT_HNSW_M,
+            ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+            ef_search: int = DEFAULT_EF_SEARCH,
+            mmap: bool = True,
+            compact_ratio: float = DEFAULT_COMPACT_RATIO
+    ):
+        """
+        Initialize the store, loading an existing index if present.
+
+        Args:
+            embedding: Embedding model used for text queries and add_texts()
+            persist_directory: Directory holding the index and document files
+            collection_name: Prefix of the files of this collection
+            index_type: One of 'flat', 'ivf' or 'hnsw'
+            nlist: Number of IVF cells
+            nprobe: IVF cells searched per query
+            hnsw_m: Neighbours per HNSW node
+            ef_construction: HNSW candidate list size while building
+            ef_search: HNSW candidate list size while searching
+            mmap: Open saved indexes memory-mapped
+            compact_ratio: Fraction of deleted rows that triggers a rebuild on save
+
+        Raises:
+            ValueError: If the index type is unknown
+        """
+        index_type = index_type.lower()
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported FAISS index type: {index_type}")
+
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.mmap = mmap
+        self._index = None
+        self._mapped = False
+
+        super().__init__(embedding, persist_directory, collection_name, compact_ratio)
+
+    def _new_index(self, dimensions: int, training_vectors: np.ndarray = None) -> faiss.Index:
+        """
+        Create an empty index of the configured type.
+
+        Args:
+            dimensions: Vector size
+            training_vectors: Vectors used to train an IVF index
+
+        Returns:
+            FAISS index; flat while an IVF index cannot be trained yet
+        """
+        if self.index_type == 'hnsw':
+            index = faiss.IndexHNSWFlat(dimensions, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.ef_construction
+        elif self.index_type == 'ivf' and training_vectors is not None and self._ivf_cells(len(training_vectors)):
+            quantizer = faiss.IndexFlatIP(dimensions)
+            index = faiss.IndexIVFFlat(
+                quantizer, dimensions, self._ivf_cells(len(training_vectors)), faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(training_vectors)
+            # Keep row -> vector lookups for MMR and compaction
+            index.set_direct_map_type(faiss.DirectMap.Array)
+        else:
+            index = faiss.IndexFlatIP(dimensions)
+
+        self._configure(index)
+        return index
+
+    def _configure(self, index: faiss.Index) -> None:
+        """Apply search-time parameters to an index."""
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.nprobe
+        elif isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efSearch = self.ef_search
+
+    def _ivf_cells(self, count: int) -> int:
+        """Number of IVF cells to train for a number of vectors, or 0 if too few."""
+        cells = min(self.nlist, count // MIN_POINTS_PER_CENTROID)
+        return cells if cells >= 2 else 0
+
+    def _needs_rebuild(self) -> bool:
+        """Also rebuild to train or retrain an IVF index as the corpus grows."""
+        if super()._needs_rebuild():
+            return True
+        if self.index_type != 'ivf' or self._index is None:
+            return False
+
+        cells = self._ivf_cells(len(self._rows))
+        current = self._index.nlist if isinstance(self._index, faiss.IndexIVF) else 0
+        # Retrain when the cell count can at least double, or reach nlist
+        return cells > current and (cells >= 2 * current or cells == self.nlist)
+
+    def _writable_index(self) -> faiss.Index:
+        """Read a memory-mapped index into memory so it can be modified."""
+        if self._mapped:
+            self._index = faiss.read_index(str(self.index_path))
+            self._configure(self._index)
+            self._mapped = False
+        return self._index
+
+    def _index_append(self, vectors: np.ndarray) -> None:
+        if self._index is None:
+            self._index = self._new_index(vectors.shape[1])
+        self._writable_index().add(vectors)
+
+    def _index_search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self._index.search(queries, k)
+
+    def _index_reconstruct(self, rows: List[int]) -> np.ndarray:
+        return self._index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+
+    def _index_rebuild(self, vectors: np.ndarray) -> None:
+        if len(vectors) == 0:
+            self._index = None
+        else:
+            self._index = self._new_index(vectors.shape[1], vectors)
+            self._index.add(vectors)
+        self._mapped = False
+
+    def _index_size(self) -> int:
+        return 0 if self._index is None else self._index.ntotal
+
+    def _index_save(self, path: Path) -> None:
+        faiss.write_index(self._index, str(path))
+
+    def _index_load(self, path: Path) -> None:
+        self._index = faiss.read_index(str(path), faiss.IO_FLAG_MMAP if self.mmap else 0)
+        self._configure(self._index)
+        self._mapped = self.mmap
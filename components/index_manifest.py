@@ -0,0 +1,345 @@
+"""Index manifest for incremental indexing."""
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from langchain_core.documents import Document
+
+MANIFEST_FILENAME = 'manifest.json'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class IndexManifest:
+    """Tracks indexed source files and the chunk IDs derived from them."""
+
+    def __init__(self, index_directory: str):
+        """
+        Initialize the manifest.
+
+        Args:
+            index_directory: Directory holding the vector store and its manifest
+        """
+        self.path = Path(index_directory) / MANIFEST_FILENAME
+        self.version: Optional[str] = None
+        self.files: Dict[str, Dict[str, Any]] = {}
+        # Set while an indexing run is in progress; survives a crash so the run can resume
+        self.checkpoint: Optional[Dict[str, Any]] = None
+
+    def load(self) -> 'IndexManifest':
+        """
+        Load the manifest from disk if it exists.
+
+        Returns:
+            The manifest itself
+        """
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.version = data.get('version')
+            self.files = data.get('files', {})
+            self.checkpoint = data.get('checkpoint')
+        return self
+
+    def save(self) -> None:
+        """Write the manifest atomically and bump its version."""
+        self.version = uuid.uuid4().hex
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = self.path.with_suffix('.json.tmp')
+        data = {'version': self.version, 'files': self.files}
+        if self.checkpoint is not None:
+            data['checkpoint'] = self.checkpoint
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def version_token(index_directory: str) -> Optional[str]:
+        """
+        Get a cheap token that changes whenever the manifest is saved.
+
+        The manifest is replaced atomically on every save, so its stat
+        identifies the index version without reading the file.
+
+        Args:
+            index_directory: Directory holding the vector store and its manifest
+
+        Returns:
+            Version token, or None if no manifest exists
+        """
+        try:
+            stat = os.stat(Path(index_directory) / MANIFEST_FILENAME)
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+    @staticmethod
+    def file_key(file_path: str) -> str:
+        """
+        Get the manifest key for a source file.
+
+        Args:
+            file_path: Path to the source file
+
+        Returns:
+            Absolute POSIX path of the file
+        """
+        return Path(file_path).resolve().as_posix()
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """
+        Compute the SHA-256 content hash of a file.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Hex digest of the file contents
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def is_unchanged(self, file_path: str) -> bool:
+        """
+        Check whether a file matches its manifest entry.
+
+        Size and mtime are compared first; the content hash is only computed
+        when they differ, and a matching hash refreshes the stored stat.
+
+        Args:
+            file_path: Path to the source file
+
+        Returns:
+            True if the file content is already indexed
+        """
+        entry = self.files.get(self.file_key(file_path))
+        if entry is None:
+            return False
+
+        stat = os.stat(file_path)
+        if entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            return True
+
+        if entry['sha256'] == self.hash_file(file_path):
+            entry['size'] = stat.st_size
+            entry['mtime'] = stat.st_mtime
+            return True
+
+        return False
+
+    def chunk_ids_for(self, file_path: str) -> List[str]:
+        """
+        Get the chunk IDs recorded for a file.
+
+        Args:
+            file_path: Path to the source file
+
+        Returns:
+            List of chunk IDs, empty if the file is not indexed
+        """
+        entry = self.files.get(self.file_key(file_path))
+        return list(entry['chunk_ids']) if entry else []
+
+    def record(
+            self,
+            file_path: str,
+            chunk_ids: List[str],
+            duplicates: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Record a file and the chunk IDs indexed from it.
+
+        Args:
+            file_path: Path to the source file
+            chunk_ids: IDs of the chunks now stored for the file
+            duplicates: Near-duplicate chunks of the file that were not stored,
+                mapping each chunk ID to the kept chunk's ID, source and page
+        """
+        stat = os.stat(file_path)
+        entry = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha256': self.hash_file(file_path),
+            'chunk_ids': chunk_ids
+        }
+        if duplicates:
+            entry['duplicates'] = duplicates
+        self.files[self.file_key(file_path)] = entry
+        if self.checkpoint is not None:
+            self.checkpoint['pending'].pop(self.file_key(file_path), None)
+            done = self.checkpoint.setdefault('done', [])
+            if self.file_key(file_path) not in done:
+                done.append(self.file_key(file_path))
+
+    def begin_run(self, path: str, incremental: bool, resume: bool = False) -> None:
+        """
+        Mark an indexing run as in progress.
+
+        Chunks an interrupted run stored for unfinished files stay pending,
+        so they are skipped or deleted when those files are indexed again.
+        A resumed run also keeps the files the interrupted run finished.
+
+        Args:
+            path: File or directory being indexed
+            incremental: Whether the run is incremental
+            resume: Whether the run continues the interrupted one
+        """
+        pending = self.checkpoint['pending'] if self.checkpoint else {}
+        done = self.checkpoint.get('done', []) if self.checkpoint and resume else []
+        self.checkpoint = {
+            'path': str(path),
+            'incremental': incremental,
+            'started_at': time.time(),
+            'pending': pending,
+            'done': done
+        }
+
+    def finish_run(self) -> None:
+        """Mark the indexing run as complete."""
+        self.checkpoint = None
+
+    def add_pending(self, file_path: str, chunk_ids: List[str]) -> None:
+        """
+        Record chunks written for a file that is not completely indexed yet.
+
+        Args:
+            file_path: Path to the source file
+            chunk_ids: IDs of the chunks now stored
+        """
+        if self.checkpoint is not None:
+            self.checkpoint['pending'].setdefault(self.file_key(file_path), []).extend(chunk_ids)
+
+    def is_done(self, file_path: str) -> bool:
+        """
+        Check whether the run in progress, or the interrupted run it resumes, finished a file.
+
+        Args:
+            file_path: Path to the source file
+
+        Returns:
+            True if the file was recorded since the run began
+        """
+        if self.checkpoint is None:
+            return False
+        return self.file_key(file_path) in self.checkpoint.get('done', [])
+
+    def pending_ids(self, file_path: str) -> List[str]:
+        """
+        Get the chunk IDs an interrupted run stored for a file it did not finish.
+
+        Args:
+            file_path: Path to the source file
+
+        Returns:
+            List of chunk IDs, empty if the file has none pending
+        """
+        if self.checkpoint is None:
+            return []
+        return list(self.checkpoint['pending'].get(self.file_key(file_path), []))
+
+    def duplicates_for(self, file_path: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the near-duplicate chunks recorded for a file.
+
+        Args:
+            file_path: Path to the source file
+
+        Returns:
+            Dictionary mapping dropped chunk IDs to the kept chunk's ID,
+            source and page
+        """
+        entry = self.files.get(self.file_key(file_path))
+        return dict(entry.get('duplicates', {})) if entry else {}
+
+    def files_duplicating(self, chunk_ids: Iterable[str]) -> List[str]:
+        """
+        Find files whose dropped near-duplicates were kept as one of the given chunks.
+
+        When those chunks are deleted, the files must be indexed again so the
+        text they share is not lost.
+
+        Args:
+            chunk_ids: IDs of kept chunks
+
+        Returns:
+            Manifest keys of the dependent files
+        """
+        chunk_ids = set(chunk_ids)
+        return [
+            key for key, entry in self.files.items()
+            if any(duplicate['kept_id'] in chunk_ids for duplicate in entry.get('duplicates', {}).values())
+        ]
+
+    def remove(self, file_key: str) -> List[str]:
+        """
+        Drop a file from the manifest.
+
+        Args:
+            file_key: Manifest key of the file
+
+        Returns:
+            Chunk IDs that were recorded for the file, including chunks an
+            interrupted run stored for it
+        """
+        entry = self.files.pop(file_key, None)
+        chunk_ids = list(entry['chunk_ids']) if entry else []
+        if self.checkpoint is not None:
+            chunk_ids += self.checkpoint['pending'].pop(file_key, [])
+        return chunk_ids
+
+    def missing_files(self, directory_path: str) -> List[str]:
+        """
+        Find manifest entries under a directory whose files no longer exist.
+
+        Args:
+            directory_path: Directory that was indexed
+
+        Returns:
+            Manifest keys of removed files
+        """
+        directory = Path(directory_path).resolve()
+        keys = set(self.files)
+        if self.checkpoint is not None:
+            keys.update(self.checkpoint['pending'])
+        return sorted(
+            key for key in keys
+            if Path(key).parent == directory and not Path(key).exists()
+        )
+
+    @staticmethod
+    def chunk_ids(file_path: str, documents: List[Document]) -> List[str]:
+        """
+        Derive deterministic IDs for the chunks of a file.
+
+        The ID depends on the file, the page and the chunk text, so unchanged
+        chunks keep their ID across re-indexing. Repeated identical chunks on
+        the same page get an occurrence suffix to stay unique.
+
+        Args:
+            file_path: Path to the source file
+            documents: Chunks split from the file
+
+        Returns:
+            List of chunk IDs in document order
+        """
+        key = IndexManifest.file_key(file_path)
+        seen: Dict[str, int] = {}
+        ids = []
+
+        for doc in documents:
+            page = doc.metadata.get('page', '')
+            digest = hashlib.sha256(f"{key}\0{page}\0{doc.page_content}".encode('utf-8')).hexdigest()[:32]
+            count = seen.get(digest, 0)
+            seen[digest] = count + 1
+            ids.append(digest if count == 0 else f"{digest}-{count}")
+
+        return ids
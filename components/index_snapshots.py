@@ -0,0 +1,216 @@
+"""Versioned index snapshots with an atomically switched serving pointer."""
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+DEFAULT_KEEP = 3
+SNAPSHOTS_DIRNAME = 'snapshots'
+CURRENT_FILENAME = 'CURRENT'
+BUILDING_FILENAME = 'BUILDING'
+
+_VERSION_PATTERN = re.compile(r'^v(\d+)$')
+
+
+class SnapshotStore:
+    """
+    Keeps each index build in its own versioned directory.
+
+    A build starts as a copy of the serving snapshot in a shadow directory
+    and is published by replacing the CURRENT pointer file with os.replace,
+    so readers see either the old or the new snapshot, never a partial one.
+    The newest snapshots are kept for rollback. An index written before
+    snapshots were enabled, directly in the root directory, is served until
+    the first build and then copied into it.
+
+    Layout::
+
+        <root>/CURRENT            name of the serving snapshot, e.g. "v000012"
+        <root>/BUILDING           name of the snapshot being built, if any
+        <root>/snapshots/v000012/ vector store, keyword index and manifest
+    """
+
+    def __init__(self, root: str, keep: int = DEFAULT_KEEP):
+        """
+        Initialize the snapshot store.
+
+        Args:
+            root: Directory holding the snapshots and pointer files
+            keep: Published snapshots to keep, including the serving one
+        """
+        self.root = Path(root)
+        self.keep = max(1, keep)
+        self.snapshots_dir = self.root / SNAPSHOTS_DIRNAME
+
+    def path(self, version: str) -> Path:
+        """Get the directory of a snapshot."""
+        return self.snapshots_dir / version
+
+    def current(self) -> Optional[str]:
+        """
+        Get the serving snapshot.
+
+        Returns:
+            Snapshot name, or None if none has been published
+        """
+        return self._read_pointer(CURRENT_FILENAME)
+
+    def serving_directory(self) -> Path:
+        """Get the directory queries should read: the serving snapshot or, before the first build, the root."""
+        version = self.current()
+        return self.path(version) if version is not None else self.root
+
+    def pointer_token(self) -> Optional[Tuple[int, int]]:
+        """
+        Get a cheap token that changes whenever the serving pointer is replaced.
+
+        Returns:
+            (inode, mtime in nanoseconds) of the CURRENT file, or None if it does not exist
+        """
+        try:
+            stat = os.stat(self.root / CURRENT_FILENAME)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def versions(self) -> List[str]:
+        """
+        List the snapshots on disk, oldest first.
+
+        Returns:
+            Snapshot names, including one still being built
+        """
+        if not self.snapshots_dir.is_dir():
+            return []
+        names = [p.name for p in self.snapshots_dir.iterdir() if p.is_dir() and _VERSION_PATTERN.match(p.name)]
+        return sorted(names, key=lambda name: int(_VERSION_PATTERN.match(name).group(1)))
+
+    def building(self) -> Optional[str]:
+        """
+        Get the snapshot an unfinished build was writing.
+
+        Returns:
+            Snapshot name, or None if no build is in progress or interrupted
+        """
+        version = self._read_pointer(BUILDING_FILENAME)
+        return version if version is not None and self.path(version).is_dir() else None
+
+    def begin(self, resume: bool = False) -> Tuple[str, Path]:
+        """
+        Start a build in a new shadow snapshot.
+
+        The shadow starts as a copy of the serving snapshot, so a build
+        changes the index the same way it would have changed it in place.
+        An earlier unfinished build is discarded unless it is resumed.
+
+        Args:
+            resume: Continue the unfinished build instead of starting a new one
+
+        Returns:
+            Tuple of (snapshot name, snapshot directory)
+        """
+        unfinished = self.building()
+        if unfinished is not None:
+            if resume:
+                return unfinished, self.path(unfinished)
+            shutil.rmtree(self.path(unfinished), ignore_errors=True)
+
+        existing = self.versions()
+        number = int(_VERSION_PATTERN.match(existing[-1]).group(1)) + 1 if existing else 1
+        version = f"v{number:06d}"
+        shadow = self.path(version)
+        shadow.parent.mkdir(parents=True, exist_ok=True)
+
+        current = self.current()
+        if current is not None:
+            shutil.copytree(self.path(current), shadow)
+        else:
+            self._copy_legacy_index(shadow)
+
+        self._write_pointer(BUILDING_FILENAME, version)
+        return version, shadow
+
+    def publish(self, version: str) -> None:
+        """
+        Make a finished build the serving snapshot and prune old snapshots.
+
+        Args:
+            version: Snapshot name returned by begin()
+        """
+        self._write_pointer(CURRENT_FILENAME, version)
+        if self._read_pointer(BUILDING_FILENAME) == version:
+            os.remove(self.root / BUILDING_FILENAME)
+        self.prune()
+
+    def rollback(self, version: Optional[str] = None) -> str:
+        """
+        Serve an earlier snapshot.
+
+        Args:
+            version: Snapshot to serve; defaults to the one before the serving snapshot
+
+        Returns:
+            Name of the snapshot now serving
+
+        Raises:
+            ValueError: If the snapshot does not exist or there is none to roll back to
+        """
+        building = self._read_pointer(BUILDING_FILENAME)
+        published = [name for name in self.versions() if name != building]
+        if version is None:
+            current = self.current()
+            earlier = published[:published.index(current)] if current in published else []
+            if not earlier:
+                raise ValueError("No earlier snapshot to roll back to")
+            version = earlier[-1]
+        elif version not in published:
+            raise ValueError(f"Unknown snapshot: {version}")
+
+        self._write_pointer(CURRENT_FILENAME, version)
+        return version
+
+    def prune(self) -> List[str]:
+        """
+        Delete all but the newest `keep` published snapshots; the serving snapshot is always kept.
+
+        Returns:
+            Names of the deleted snapshots
+        """
+        current = self.current()
+        building = self._read_pointer(BUILDING_FILENAME)
+        published = [name for name in self.versions() if name != building]
+        removed = [name for name in published[:-self.keep] if name != current]
+        for name in removed:
+            shutil.rmtree(self.path(name), ignore_errors=True)
+        return removed
+
+    def _copy_legacy_index(self, shadow: Path) -> None:
+        """Copy an index written directly into the root directory into a new snapshot."""
+        shadow.mkdir()
+        if not self.root.is_dir():
+            return
+        for entry in self.root.iterdir():
+            if entry.name in (SNAPSHOTS_DIRNAME, CURRENT_FILENAME, BUILDING_FILENAME) or entry.name.endswith('.tmp'):
+                continue
+            if entry.is_dir():
+                shutil.copytree(entry, shadow / entry.name)
+            else:
+                shutil.copy2(entry, shadow / entry.name)
+
+    def _read_pointer(self, name: str) -> Optional[str]:
+        """Read a pointer file, or None if it does not exist."""
+        try:
+            return (self.root / name).read_text(encoding='utf-8').strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_pointer(self, name: str, version: str) -> None:
+        """Replace a pointer file atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f"{name}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.root / name)
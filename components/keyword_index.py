@@ -0,0 +1,262 @@
+"""BM25 keyword index persisted next to the vector store."""
+import json
+import math
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+
+# Words, numbers and dotted or hyphenated codes such as "4.2.1" or "e-mail"
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-/][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase keyword tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens in order of appearance
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class KeywordIndex:
+    """
+    Inverted index with BM25 scoring over chunk text.
+
+    Each term maps to a flat ``[row, term frequency, ...]`` posting list.
+    The file is read on first use, not when the index is created.
+    Deleted or replaced chunks are marked as tombstones and dropped from
+    the posting lists on save.
+    """
+
+    def __init__(self, path: str, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        """
+        Initialize the index without reading it.
+
+        Args:
+            path: Path of the JSON index file
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+
+        self._loaded = False
+        self._lock = threading.RLock()
+        # Row-aligned; a None ID marks a deleted row
+        self._ids: List[Optional[str]] = []
+        self._lengths: List[int] = []
+        self._rows: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._total_length = 0
+        # Posting lists and lengths as arrays, rebuilt after changes
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._length_array: Optional[np.ndarray] = None
+        self._deleted_array: Optional[np.ndarray] = None
+
+    def exists(self) -> bool:
+        """Check whether the index file exists."""
+        return self.path.exists()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._rows)
+
+    def add(self, ids: List[str], texts: List[str]) -> None:
+        """
+        Index chunk texts, replacing chunks with the same IDs.
+
+        Args:
+            ids: Chunk IDs
+            texts: Chunk texts
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._delete(ids)
+
+            for chunk_id, text in zip(ids, texts):
+                row = len(self._ids)
+                tokens = tokenize(text)
+                counts: Dict[str, int] = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for term, count in counts.items():
+                    self._postings.setdefault(term, []).extend((row, count))
+
+                self._ids.append(chunk_id)
+                self._lengths.append(len(tokens))
+                self._rows[chunk_id] = row
+                self._total_length += len(tokens)
+
+            self._invalidate()
+
+    def delete(self, ids: List[str]) -> None:
+        """
+        Remove chunks from the index.
+
+        Args:
+            ids: Chunk IDs to remove
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._delete(ids)
+            self._invalidate()
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """
+        Find the chunks with the highest BM25 score for a query.
+
+        Args:
+            query: Query text
+            k: Number of chunks to return
+
+        Returns:
+            List of (chunk ID, score) tuples, best first; chunks sharing no
+            term with the query are not returned
+        """
+        self._ensure_loaded()
+        live = len(self._rows)
+        terms = set(tokenize(query))
+        if live == 0 or not terms or k <= 0:
+            return []
+
+        lengths = self._lengths_as_array()
+        average_length = self._total_length / live
+        scores = np.zeros(len(self._ids), dtype=np.float64)
+
+        # Postings of deleted chunks stay until compaction; leave them out of df and scores
+        alive = None
+        if live < len(self._ids):
+            alive = np.ones(len(self._ids), dtype=bool)
+            alive[self._deleted_rows()] = False
+
+        for term in terms:
+            postings = self._posting_array(term)
+            if postings is None:
+                continue
+            if alive is not None:
+                postings = postings[alive[postings[:, 0]]]
+                if len(postings) == 0:
+                    continue
+            rows, frequencies = postings[:, 0], postings[:, 1].astype(np.float64)
+            idf = math.log(1 + (live - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[rows] / average_length)
+            scores[rows] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        return [(self._ids[row], float(scores[row])) for row in candidates]
+
+    def save(self) -> None:
+        """Write the index atomically, dropping deleted chunks first."""
+        with self._lock:
+            self._ensure_loaded()
+            if len(self._rows) < len(self._ids):
+                self._compact()
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'ids': self._ids,
+                    'lengths': self._lengths,
+                    'postings': self._postings
+                }, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def _ensure_loaded(self) -> None:
+        """Read the index file on first use."""
+        if self._loaded:
+            return
+
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._ids = data['ids']
+                self._lengths = data['lengths']
+                self._postings = data['postings']
+                self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids) if chunk_id is not None}
+                self._total_length = sum(
+                    length for chunk_id, length in zip(self._ids, self._lengths) if chunk_id is not None
+                )
+            self._loaded = True
+
+    def _delete(self, ids: List[str]) -> None:
+        """Mark chunks as deleted."""
+        for chunk_id in ids:
+            row = self._rows.pop(chunk_id, None)
+            if row is not None:
+                self._ids[row] = None
+                self._total_length -= self._lengths[row]
+
+    def _compact(self) -> None:
+        """Drop deleted rows and renumber the rest."""
+        new_rows = {}
+        for row, chunk_id in enumerate(self._ids):
+            if chunk_id is not None:
+                new_rows[row] = len(new_rows)
+
+        postings = {}
+        for term, flat in self._postings.items():
+            kept = []
+            for i in range(0, len(flat), 2):
+                new_row = new_rows.get(flat[i])
+                if new_row is not None:
+                    kept.extend((new_row, flat[i + 1]))
+            if kept:
+                postings[term] = kept
+
+        self._lengths = [self._lengths[row] for row in new_rows]
+        self._ids = [self._ids[row] for row in new_rows]
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._postings = postings
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        """Drop cached arrays after a change."""
+        self._arrays = {}
+        self._length_array = None
+        self._deleted_array = None
+
+    def _posting_array(self, term: str) -> Optional[np.ndarray]:
+        """Get the posting list of a term as an (n, 2) array of rows and frequencies."""
+        postings = self._arrays.get(term)
+        if postings is None:
+            flat = self._postings.get(term)
+            if not flat:
+                return None
+            postings = np.asarray(flat, dtype=np.int64).reshape(-1, 2)
+            self._arrays[term] = postings
+        return postings
+
+    def _lengths_as_array(self) -> np.ndarray:
+        """Get chunk lengths as an array."""
+        if self._length_array is None:
+            self._length_array = np.asarray(self._lengths, dtype=np.float64)
+        return self._length_array
+
+    def _deleted_rows(self) -> np.ndarray:
+        """Get the rows of deleted chunks as an array."""
+        if self._deleted_array is None:
+            self._deleted_array = np.asarray(
+                [row for row, chunk_id in enumerate(self._ids) if chunk_id is None], dtype=np.int64
+            )
+        return self._deleted_array
@@ -0,0 +1,235 @@
+"""Offline, deterministic embedding and chat models for benchmarks and tests."""
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from .embedding_scheduler import RateLimitError
+from .keyword_index import tokenize
+
+DEFAULT_DIMENSIONS = 384
+DEFAULT_TEMPLATE = "Based on {passages} passage(s): {context_preview}"
+DEFAULT_MAX_TOKENS = 500
+
+# Words followed by their trailing whitespace, streamed as one token each
+_OUTPUT_TOKEN_PATTERN = re.compile(r"\S+\s*")
+_QUESTION_PATTERN = re.compile(r"Question:\s*(.*?)\s*(?:\n\s*Answer:|$)", re.S)
+_CONTEXT_PATTERN = re.compile(r"context:\s*\n(.*?)\n\s*Question:", re.S)
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Embeds text by feature hashing its words and word pairs.
+
+    Each unigram and bigram is hashed to a signed bucket, weighted by
+    ``1 + log(tf)``, and the vector is L2-normalized. Vectors depend only
+    on the text and the dimension count, so they are identical across runs
+    and machines. Texts that share words are close, which is enough to
+    exercise retrieval without a model or network access.
+    """
+
+    def __init__(
+            self,
+            dimensions: int = DEFAULT_DIMENSIONS,
+            latency: float = 0.0,
+            error_rate: float = 0.0,
+            seed: int = 0
+    ):
+        """
+        Initialize the embedder.
+
+        Args:
+            dimensions: Vector size
+            latency: Seconds each call sleeps, to mimic a remote API
+            error_rate: Probability that a call raises a RateLimitError
+            seed: Random seed for error injection
+        """
+        self.dimensions = dimensions
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of texts."""
+        self._simulate_call()
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query."""
+        self._simulate_call()
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of texts without blocking the event loop."""
+        await asyncio.sleep(self.latency)
+        self._maybe_fail()
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Embed a query without blocking the event loop."""
+        return (await self.aembed_documents([text]))[0]
+
+    def _simulate_call(self) -> None:
+        """Apply the configured latency and error injection."""
+        if self.latency > 0:
+            time.sleep(self.latency)
+        self._maybe_fail()
+
+    def _maybe_fail(self) -> None:
+        """Raise an injected rate limit error with the configured probability."""
+        with self._lock:
+            self.calls += 1
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+        if failed:
+            raise RateLimitError("Injected rate limit error")
+
+    def _vector(self, text: str) -> List[float]:
+        """Feature-hash a text into a normalized vector."""
+        words = tokenize(text)
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+        counts = {}
+        for feature in features:
+            counts[feature] = counts.get(feature, 0) + 1
+
+        vector = np.zeros(self.dimensions, dtype=np.float64)
+        for feature, count in counts.items():
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'little')
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dimensions] += sign * (1 + math.log(count))
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+
+class TemplateChatModel(BaseChatModel):
+    """
+    Chat model that answers offline by echoing or filling a template.
+
+    ``echo`` mode returns the question from the prompt. ``template`` mode
+    formats ``template`` with ``{question}``, ``{context_preview}``,
+    ``{passages}`` and ``{prompt_words}``. The output is streamed word by word
+    after ``latency`` seconds at ``tokens_per_second``. With probability
+    ``error_rate`` a call raises before producing output.
+    """
+
+    mode: str = 'template'
+    template: str = DEFAULT_TEMPLATE
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    error_rate: float = 0.0
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    seed: int = 0
+
+    _random: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Seed the error injection."""
+        super().model_post_init(__context)
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return 'template-chat'
+
+    def _generate(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any
+    ) -> ChatResult:
+        text = ''.join(chunk.text for chunk in self._stream(messages, stop, run_manager, **kwargs))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        self._maybe_fail()
+
+        for i, token in enumerate(self._output_tokens(messages)):
+            if i and self.tokens_per_second > 0:
+                time.sleep(1.0 / self.tokens_per_second)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _agenerate(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+            **kwargs: Any
+    ) -> ChatResult:
+        chunks = [chunk.text async for chunk in self._astream(messages, stop, run_manager, **kwargs)]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=''.join(chunks)))])
+
+    async def _astream(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+            **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        self._maybe_fail()
+
+        for i, token in enumerate(self._output_tokens(messages)):
+            if i and self.tokens_per_second > 0:
+                await asyncio.sleep(1.0 / self.tokens_per_second)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def _maybe_fail(self) -> None:
+        """Raise an injected error with the configured probability."""
+        with self._lock:
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+        if failed:
+            raise RuntimeError("Injected LLM error")
+
+    def _output_tokens(self, messages: List[BaseMessage]) -> List[str]:
+        """Build the answer for a prompt and split it into streamed tokens."""
+        prompt = str(messages[-1].content) if messages else ''
+        question_match = _QUESTION_PATTERN.search(prompt)
+        question = question_match.group(1) if question_match else prompt.strip()
+
+        if self.mode == 'echo':
+            answer = question
+        else:
+            context_match = _CONTEXT_PATTERN.search(prompt)
+            context = context_match.group(1).strip() if context_match else ''
+            passages = [passage for passage in context.split('\n\n') if passage.strip()]
+            answer = self.template.format(
+                question=question,
+                context_preview=' '.join(context.split()[:40]),
+                passages=len(passages),
+                prompt_words=len(prompt.split())
+            )
+
+        return _OUTPUT_TOKEN_PATTERN.findall(answer)[:self.max_tokens]
@@ -0,0 +1,473 @@
+"""Base class for vector stores kept as files in a local directory."""
+import json
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from .mmr import DEFAULT_FETCH_K, DEFAULT_LAMBDA_MULT, Candidates, mmr_select
+
+# Rebuild the index on save once this fraction of its rows are deleted
+DEFAULT_COMPACT_RATIO = 0.25
+
+
+# VectorStore is already an ABC, so ABC adds no conflicting metaclass
+class LocalVectorStore(VectorStore, ABC):
+    """
+    Vector store whose documents and vectors live in files under one directory.
+
+    Vectors are L2-normalized, so scores are cosine similarities (higher is
+    better). Documents are kept in ``{collection_name}.docs.json`` next to
+    the index file written by the subclass. Deleted or replaced rows are
+    marked as tombstones and skipped at search time until the next
+    compaction, so deletes work for index types that cannot remove vectors.
+    Changes are written to disk by save().
+
+    Subclasses implement the vector index through the ``_index_*`` hooks.
+    """
+
+    index_suffix = ''
+
+    def __init__(
+            self,
+            embedding: Embeddings,
+            persist_directory: str,
+            collection_name: str,
+            compact_ratio: float = DEFAULT_COMPACT_RATIO
+    ):
+        """
+        Initialize the store, loading existing files if present.
+
+        Args:
+            embedding: Embedding model used for text queries and add_texts()
+            persist_directory: Directory holding the index and document files
+            collection_name: Prefix of the files of this collection
+            compact_ratio: Fraction of deleted rows that triggers a rebuild on save
+        """
+        self._embedding = embedding
+        self.persist_directory = Path(persist_directory)
+        self.collection_name = collection_name
+        self.compact_ratio = compact_ratio
+
+        # Row-aligned with the index; a None ID marks a deleted row
+        self._ids: List[Optional[str]] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """Embedding model of the store."""
+        return self._embedding
+
+    @property
+    def index_path(self) -> Path:
+        """Path of the vector index file."""
+        return self.persist_directory / f"{self.collection_name}{self.index_suffix}"
+
+    @property
+    def docstore_path(self) -> Path:
+        """Path of the document file."""
+        return self.persist_directory / f"{self.collection_name}.docs.json"
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add_texts(
+            self,
+            texts: Iterable[str],
+            metadatas: Optional[List[Dict[str, Any]]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+            **kwargs: Any
+    ) -> List[str]:
+        """
+        Embed and add texts, replacing entries with the same IDs.
+
+        Args:
+            texts: Texts to add
+            metadatas: Metadata for each text
+            ids: ID for each text; random IDs are generated if omitted
+
+        Returns:
+            IDs of the added texts
+        """
+        texts = list(texts)
+        embeddings = self._embedding.embed_documents(texts)
+        return self.add_embeddings(list(zip(texts, embeddings)), metadatas=metadatas, ids=ids)
+
+    def add_embeddings(
+            self,
+            text_embeddings: Iterable[Tuple[str, List[float]]],
+            metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+            ids: Optional[List[str]] = None,
+            **kwargs: Any
+    ) -> List[str]:
+        """
+        Add texts with precomputed embeddings, replacing entries with the same IDs.
+
+        Args:
+            text_embeddings: (text, embedding) pairs
+            metadatas: Metadata for each text
+            ids: ID for each text; random IDs are generated if omitted
+
+        Returns:
+            IDs of the added texts
+        """
+        text_embeddings = list(text_embeddings)
+        if not text_embeddings:
+            return []
+
+        texts = [text for text, _ in text_embeddings]
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in texts]
+        metadatas = metadatas or [None] * len(texts)
+        vectors = self._normalize(np.asarray([vector for _, vector in text_embeddings], dtype=np.float32))
+
+        with self._lock:
+            self._index_append(vectors)
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                old_row = self._rows.get(doc_id)
+                if old_row is not None:
+                    self._ids[old_row] = None
+                self._rows[doc_id] = len(self._ids)
+                self._ids.append(doc_id)
+                self._texts.append(text)
+                self._metadatas.append(dict(metadata or {}))
+
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """
+        Delete entries by ID.
+
+        Args:
+            ids: IDs to delete
+
+        Returns:
+            True once the entries are deleted
+
+        Raises:
+            ValueError: If no IDs are given
+        """
+        if ids is None:
+            raise ValueError("No ids provided to delete.")
+
+        with self._lock:
+            for doc_id in ids:
+                row = self._rows.pop(doc_id, None)
+                if row is not None:
+                    self._ids[row] = None
+        return True
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        """
+        Get documents by ID.
+
+        Args:
+            ids: IDs to look up; unknown IDs are skipped
+
+        Returns:
+            List of Document objects
+        """
+        return [self._document(self._rows[doc_id]) for doc_id in ids if doc_id in self._rows]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        """Return the documents most similar to a query."""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Return the documents most similar to a query with their cosine similarity."""
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        """Return the documents most similar to an embedding."""
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score_by_vector(
+            self,
+            embedding: List[float],
+            k: int = 4,
+            **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """
+        Return the documents most similar to an embedding with their cosine similarity.
+
+        Args:
+            embedding: Query embedding
+            k: Number of documents to return
+
+        Returns:
+            List of (Document, score) tuples, best first
+        """
+        return [
+            (self._document(row), score)
+            for row, score in self._search(np.asarray([embedding], dtype=np.float32), k)[0]
+        ]
+
+    def similarity_search_batch_by_vector(
+            self,
+            embeddings: List[List[float]],
+            k: int = 4
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search for several query embeddings in one index call.
+
+        Args:
+            embeddings: Query embeddings
+            k: Number of documents to return per query
+
+        Returns:
+            List of (Document, score) tuples for each query, best first
+        """
+        if len(embeddings) == 0:
+            return []
+        return [
+            [(self._document(row), score) for row, score in hits]
+            for hits in self._search(np.asarray(embeddings, dtype=np.float32), k)
+        ]
+
+    def similarity_search_with_vectors_by_vector(
+            self,
+            embedding: List[float],
+            k: int = 4,
+            **kwargs: Any
+    ) -> Candidates:
+        """
+        Return the documents most similar to an embedding with their scores and stored vectors.
+
+        Args:
+            embedding: Query embedding
+            k: Number of documents to return
+
+        Returns:
+            Candidates holding the documents best first, their cosine
+            similarities and their normalized vectors
+        """
+        hits = self._search(np.asarray([embedding], dtype=np.float32), k)[0]
+        rows = [row for row, _ in hits]
+        return Candidates(
+            documents=[self._document(row) for row in rows],
+            scores=[score for _, score in hits],
+            vectors=self._index_reconstruct(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+        )
+
+    def max_marginal_relevance_search(
+            self,
+            query: str,
+            k: int = 4,
+            fetch_k: int = DEFAULT_FETCH_K,
+            lambda_mult: float = DEFAULT_LAMBDA_MULT,
+            **kwargs: Any
+    ) -> List[Document]:
+        """Return documents selected by maximal marginal relevance for a query."""
+        return self.max_marginal_relevance_search_by_vector(
+            self._embedding.embed_query(query), k, fetch_k, lambda_mult, **kwargs
+        )
+
+    def max_marginal_relevance_search_by_vector(
+            self,
+            embedding: List[float],
+            k: int = 4,
+            fetch_k: int = DEFAULT_FETCH_K,
+            lambda_mult: float = DEFAULT_LAMBDA_MULT,
+            **kwargs: Any
+    ) -> List[Document]:
+        """
+        Return documents selected by maximal marginal relevance.
+
+        Args:
+            embedding: Query embedding
+            k: Number of documents to return
+            fetch_k: Number of nearest candidates to choose from
+            lambda_mult: 1 favours relevance, 0 favours diversity
+
+        Returns:
+            List of Document objects
+        """
+        candidates = self.similarity_search_with_vectors_by_vector(embedding, max(fetch_k, k))
+        return [candidates.documents[i] for i in mmr_select(embedding, candidates.vectors, k, lambda_mult)]
+
+    @classmethod
+    def from_texts(
+            cls,
+            texts: List[str],
+            embedding: Embeddings,
+            metadatas: Optional[List[Dict[str, Any]]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+            persist_directory: str = '.',
+            collection_name: str = 'rag_documents',
+            **kwargs: Any
+    ) -> "LocalVectorStore":
+        """
+        Create a store from texts and save it.
+
+        Args:
+            texts: Texts to add
+            embedding: Embedding model
+            metadatas: Metadata for each text
+            ids: ID for each text
+            persist_directory: Directory holding the store files
+            collection_name: Prefix of the store files
+
+        Returns:
+            The saved store
+        """
+        store = cls(embedding, persist_directory, collection_name, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        store.save()
+        return store
+
+    def save(self) -> None:
+        """
+        Write the index and documents to disk, compacting deleted rows first if needed.
+
+        Both files are written to temporary paths and moved into place, so a
+        crash never leaves a partially written file behind.
+        """
+        with self._lock:
+            if self._needs_rebuild():
+                self._compact()
+
+            self.persist_directory.mkdir(parents=True, exist_ok=True)
+            if self._ids:
+                tmp_index_path = self.index_path.with_name(self.index_path.name + '.tmp')
+                self._index_save(tmp_index_path)
+                os.replace(tmp_index_path, self.index_path)
+
+            docstore = {
+                'rows': len(self._ids),
+                'ids': self._ids,
+                'texts': self._texts,
+                'metadatas': self._metadatas
+            }
+            tmp_path = self.docstore_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(docstore, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.docstore_path)
+
+    def _load(self) -> None:
+        """Load the documents and index of the collection if they exist."""
+        if not self.docstore_path.exists():
+            return
+
+        with open(self.docstore_path, 'r', encoding='utf-8') as f:
+            docstore = json.load(f)
+
+        self._ids = docstore['ids']
+        self._texts = docstore['texts']
+        self._metadatas = docstore['metadatas']
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids) if doc_id is not None}
+
+        if self._ids:
+            self._index_load(self.index_path)
+            if self._index_size() != docstore['rows']:
+                raise ValueError(
+                    f"Vector index {self.index_path} does not match {self.docstore_path}; re-index the documents"
+                )
+
+    def _search(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """
+        Find the nearest live rows for each query vector.
+
+        Args:
+            queries: Query vectors, one per row
+            k: Number of rows to return per query
+
+        Returns:
+            (row, cosine similarity) pairs for each query, best first
+        """
+        total = len(self._ids)
+        if total == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        # Over-fetch by the number of tombstones so k live rows remain
+        fetch = min(total, k + total - len(self._rows))
+        scores, rows = self._index_search(self._normalize(queries), fetch)
+
+        results = []
+        for query_scores, query_rows in zip(scores, rows):
+            hits = [
+                (int(row), float(score))
+                for row, score in zip(query_rows, query_scores)
+                if row >= 0 and self._ids[row] is not None
+            ]
+            results.append(hits[:k])
+        return results
+
+    def _document(self, row: int) -> Document:
+        """Build the Document stored at a row."""
+        return Document(id=self._ids[row], page_content=self._texts[row], metadata=dict(self._metadatas[row]))
+
+    def _needs_rebuild(self) -> bool:
+        """Check whether enough rows are deleted to rebuild the index."""
+        deleted = len(self._ids) - len(self._rows)
+        return deleted > 0 and deleted >= self.compact_ratio * len(self._ids)
+
+    def _compact(self) -> None:
+        """Rebuild the index from live rows, dropping tombstones."""
+        live_rows = [row for row, doc_id in enumerate(self._ids) if doc_id is not None]
+        vectors = self._index_reconstruct(live_rows) if live_rows else np.zeros((0, 0), dtype=np.float32)
+
+        self._ids = [self._ids[row] for row in live_rows]
+        self._texts = [self._texts[row] for row in live_rows]
+        self._metadatas = [self._metadatas[row] for row in live_rows]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._index_rebuild(vectors)
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        """Use cosine similarity as relevance, treating opposite directions as unrelated."""
+        return lambda score: max(0.0, min(1.0, score))
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize vectors row by row."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(vectors / norms, dtype=np.float32)
+
+    @abstractmethod
+    def _index_append(self, vectors: np.ndarray) -> None:
+        """Append normalized vectors as new rows of the index."""
+        pass
+
+    @abstractmethod
+    def _index_search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (scores, rows) arrays of the k best rows per query; missing rows are -1."""
+        pass
+
+    @abstractmethod
+    def _index_reconstruct(self, rows: List[int]) -> np.ndarray:
+        """Return the stored vectors of the given rows."""
+        pass
+
+    @abstractmethod
+    def _index_rebuild(self, vectors: np.ndarray) -> None:
+        """Replace the index content with the given vectors."""
+        pass
+
+    @abstractmethod
+    def _index_size(self) -> int:
+        """Return the number of rows in the index."""
+        pass
+
+    @abstractmethod
+    def _index_save(self, path: Path) -> None:
+        """Write the index to a file."""
+        pass
+
+    @abstractmethod
+    def _index_load(self, path: Path) -> None:
+        """Read the index from a file."""
+        pass
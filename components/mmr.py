@@ -0,0 +1,112 @@
+"""Maximal marginal relevance over candidates fetched with their stored vectors."""
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+DEFAULT_FETCH_K = 20
+DEFAULT_LAMBDA_MULT = 0.5
+
+
+@dataclass
+class Candidates:
+    """Nearest documents of a query together with their stored vectors."""
+
+    documents: List[Document] = field(default_factory=list)
+    # Scores as returned by the store, such as Chroma distances; best first
+    scores: List[float] = field(default_factory=list)
+    # One row per document
+    vectors: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+
+def mmr_select(query: Any, vectors: Any, k: int, lambda_mult: float = DEFAULT_LAMBDA_MULT) -> List[int]:
+    """
+    Select candidates by maximal marginal relevance.
+
+    Each step picks the candidate maximizing
+    ``lambda_mult * sim(query, c) - (1 - lambda_mult) * max sim(c, selected)``.
+    Similarities to the query are computed once as one matrix-vector
+    product; after each pick, one more product updates every candidate's
+    highest similarity to the selection, so selecting k of n candidates
+    costs k products of n vectors instead of recomputing the similarities
+    to all selected candidates at every step.
+
+    Args:
+        query: Query embedding
+        vectors: Candidate embeddings, one row each
+        k: Number of candidates to select
+        lambda_mult: 1 favours relevance, 0 favours diversity
+
+    Returns:
+        Row indexes of the selected candidates in selection order
+    """
+    vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+    count = min(k, len(vectors))
+    if count <= 0:
+        return []
+
+    query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+    relevance = vectors @ query
+    redundancy = np.full(len(vectors), -np.inf, dtype=np.float32)
+
+    selected = [int(np.argmax(relevance))]
+    for _ in range(count - 1):
+        redundancy = np.maximum(redundancy, vectors @ vectors[selected[-1]])
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        selected.append(int(np.argmax(scores)))
+    return selected
+
+
+def search_with_vectors(
+        vectorstore: VectorStore,
+        embedding: List[float],
+        k: int,
+        **kwargs: Any
+) -> Optional[Candidates]:
+    """
+    Fetch the nearest documents of a query embedding with their stored vectors in one call.
+
+    Args:
+        vectorstore: Store to search; local and sharded stores and Chroma are supported
+        embedding: Query embedding
+        k: Number of candidates to fetch
+        **kwargs: Extra search arguments, such as the shards of a sharded store
+
+    Returns:
+        Candidates, or None if the store cannot return its stored vectors
+    """
+    if hasattr(vectorstore, 'similarity_search_with_vectors_by_vector'):
+        return vectorstore.similarity_search_with_vectors_by_vector(embedding, k, **kwargs)
+
+    collection = getattr(vectorstore, '_collection', None)
+    if collection is None:
+        return None
+
+    # Chroma: query the collection directly, as its MMR search does, but keep the vectors
+    results = collection.query(
+        query_embeddings=[embedding],
+        n_results=k,
+        include=['documents', 'metadatas', 'distances', 'embeddings']
+    )
+    documents = [
+        Document(id=chunk_id, page_content=text, metadata=metadata or {})
+        for chunk_id, text, metadata in zip(results['ids'][0], results['documents'][0], results['metadatas'][0])
+    ]
+    vectors = results['embeddings'][0] if len(documents) else []
+    return Candidates(
+        documents=documents,
+        scores=list(results['distances'][0]),
+        vectors=np.asarray(vectors, dtype=np.float32).reshape(len(documents), -1)
+    )
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize vectors row by row, so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
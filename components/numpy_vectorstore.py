@@ -0,0 +1,123 @@
+"""Exact vector store backed by a NumPy matrix."""
+from pathlib import Path
+from typing import List, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .local_vectorstore import LocalVectorStore, DEFAULT_COMPACT_RATIO
+
+DEFAULT_DTYPE = 'float32'
+# Rows scored per matmul when float16 vectors are converted for BLAS
+SCORE_BLOCK_ROWS = 16384
+
+DTYPES = ('float32', 'float16')
+
+
+class NumpyVectorStore(LocalVectorStore):
+    """
+    Exact vector store that scores every row with one matrix product.
+
+    Normalized vectors are kept in ``{collection_name}.npy`` and opened
+    memory-mapped, so startup costs only the document file. A query
+    batch is scored with a single matmul and the top k rows are found with
+    ``argpartition``. This suits corpora up to a few hundred thousand
+    chunks. ``float16`` halves memory and disk use. It is scored in float32
+    blocks because NumPy has no fast half-precision matmul.
+    """
+
+    index_suffix = '.npy'
+
+    def __init__(
+            self,
+            embedding: Embeddings,
+            persist_directory: str,
+            collection_name: str,
+            dtype: str = DEFAULT_DTYPE,
+            mmap: bool = True,
+            compact_ratio: float = DEFAULT_COMPACT_RATIO
+    ):
+        """
+        Initialize the store, loading an existing matrix if present.
+
+        Args:
+            embedding: Embedding model used for text queries and add_texts()
+            persist_directory: Directory holding the matrix and document files
+            collection_name: Prefix of the files of this collection
+            dtype: Storage precision, 'float32' or 'float16'
+            mmap: Open the saved matrix memory-mapped
+            compact_ratio: Fraction of deleted rows that triggers a rebuild on save
+
+        Raises:
+            ValueError: If the dtype is not supported
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported NumPy vector dtype: {dtype}")
+
+        self.dtype = np.dtype(dtype)
+        self.mmap = mmap
+        # Preallocated rows; only the first _size are in use
+        self._matrix = np.zeros((0, 0), dtype=self.dtype)
+        self._size = 0
+
+        super().__init__(embedding, persist_directory, collection_name, compact_ratio)
+
+    def _index_append(self, vectors: np.ndarray) -> None:
+        count, dimensions = vectors.shape
+        if self._size == 0 and self._matrix.shape[1] != dimensions:
+            self._matrix = np.zeros((0, dimensions), dtype=self.dtype)
+
+        required = self._size + count
+        if required > self._matrix.shape[0] or not self._matrix.flags.writeable:
+            # Grow geometrically; this also copies a read-only mapped matrix into memory
+            capacity = max(required, 2 * self._matrix.shape[0], 64)
+            matrix = np.empty((capacity, dimensions), dtype=self.dtype)
+            matrix[:self._size] = self._matrix[:self._size]
+            self._matrix = matrix
+
+        self._matrix[self._size:required] = vectors
+        self._size = required
+
+    def _index_search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self._scores(queries)
+
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(scores.shape[1]), (len(queries), 1))
+
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every query to every stored row."""
+        matrix = self._matrix[:self._size]
+        if matrix.dtype == np.float32:
+            return queries @ matrix.T
+
+        scores = np.empty((len(queries), self._size), dtype=np.float32)
+        for start in range(0, self._size, SCORE_BLOCK_ROWS):
+            block = matrix[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        return scores
+
+    def _index_reconstruct(self, rows: List[int]) -> np.ndarray:
+        return self._matrix[rows].astype(np.float32)
+
+    def _index_rebuild(self, vectors: np.ndarray) -> None:
+        self._matrix = np.asarray(vectors, dtype=self.dtype)
+        self._size = len(vectors)
+
+    def _index_size(self) -> int:
+        return self._size
+
+    def _index_save(self, path: Path) -> None:
+        # Write through a file object so NumPy does not append another .npy suffix
+        with open(path, 'wb') as f:
+            np.save(f, self._matrix[:self._size])
+
+    def _index_load(self, path: Path) -> None:
+        self._matrix = np.load(path, mmap_mode='r' if self.mmap else None)
+        if self._matrix.dtype != self.dtype:
+            self._matrix = self._matrix.astype(self.dtype)
+        self._size = len(self._matrix)
@@ -1,27 +1,61 @@
 """Retriever component."""
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_core.vectorstores import VectorStore
 
+from utils.tracing import span
+from .keyword_index import KeywordIndex
+from .mmr import DEFAULT_FETCH_K as DEFAULT_MMR_FETCH_K, DEFAULT_LAMBDA_MULT, mmr_select, search_with_vectors
+from .sharded_vectorstore import SHARD_METADATA_KEY
+
+DEFAULT_FETCH_K = 20
+DEFAULT_RRF_K = 60
+DEFAULT_VECTOR_WEIGHT = 1.0
+DEFAULT_KEYWORD_WEIGHT = 1.0
+
+# Search types that can run on a query embedding computed by the retriever
+_VECTOR_SEARCH_TYPES = ('similarity', 'mmr', 'hybrid')
+
 
 class Retriever:
     """Handles document retrieval from vector store."""
 
-    def __init__(self, vectorstore: VectorStore, config: Dict[str, Any]):
+    def __init__(
+            self,
+            vectorstore: VectorStore,
+            config: Dict[str, Any],
+            keyword_index: Optional[KeywordIndex] = None
+    ):
         """
         Initialize the retriever.
 
         Args:
             vectorstore: Vector store instance
             config: Retrieval configuration
+            keyword_index: BM25 index over the same chunks, used by hybrid search
         """
         self.vectorstore = vectorstore
         self.top_k = config.get('top_k', 4)
         self.search_type = config.get('search_type', 'similarity')
+        self.keyword_index = keyword_index
+
+        hybrid_config = config.get('hybrid', {})
+        self.fetch_k = hybrid_config.get('fetch_k', DEFAULT_FETCH_K)
+        self.rrf_k = hybrid_config.get('rrf_k', DEFAULT_RRF_K)
+        self.vector_weight = hybrid_config.get('vector_weight', DEFAULT_VECTOR_WEIGHT)
+        self.keyword_weight = hybrid_config.get('keyword_weight', DEFAULT_KEYWORD_WEIGHT)
 
+        mmr_config = config.get('mmr', {})
+        self.mmr_fetch_k = max(mmr_config.get('fetch_k', DEFAULT_MMR_FETCH_K), self.top_k)
+        self.lambda_mult = mmr_config.get('lambda_mult', DEFAULT_LAMBDA_MULT)
+
+        search_kwargs = {'k': self.top_k}
+        if self.search_type == 'mmr':
+            search_kwargs.update(fetch_k=self.mmr_fetch_k, lambda_mult=self.lambda_mult)
         self.retriever = self.vectorstore.as_retriever(
-            search_type=self.search_type,
-            search_kwargs={'k': self.top_k}
+            search_type='similarity' if self.search_type == 'hybrid' else self.search_type,
+            search_kwargs=search_kwargs
         )
 
     def retrieve(self, query: str) -> List[Document]:
@@ -34,5 +68,251 @@ class Retriever:
         Returns:
             List of relevant Document objects
         """
-        documents = self.retriever.invoke(query)
-        return documents
\ No newline at end of file
+        if self.search_type == 'hybrid':
+            return [doc for doc, _ in self.retrieve_with_scores(query)]
+
+        with span('retriever.search', search_type=self.search_type, k=self.top_k) as search_span:
+            documents = self.retriever.invoke(query)
+            search_span.set(results=len(documents))
+        return documents
+
+    def retrieve_with_scores(
+            self,
+            query: str,
+            embedding: Optional[List[float]] = None,
+            shards: Optional[List[str]] = None
+    ) -> List[Tuple[Document, Optional[float]]]:
+        """
+        Retrieve relevant documents together with their relevance scores.
+
+        Similarity and MMR search return relevance scores in [0, 1] (higher
+        is better); MMR returns its documents in selection order. Hybrid
+        search returns fused scores in (0, 1], where 1 means ranked first by
+        both searches. Searches that do not produce scores, such as MMR on a
+        store that cannot return its stored vectors, return None for each
+        document.
+
+        The query is embedded here rather than inside the vector store, so
+        embedding and search show up as separate trace spans.
+
+        Args:
+            query: Query string
+            embedding: Precomputed query embedding, to avoid embedding the query again
+            shards: Shards of a sharded vector store to search; all shards if None
+
+        Returns:
+            List of (Document, score) tuples
+        """
+        if embedding is None and self.search_type in _VECTOR_SEARCH_TYPES:
+            embedding = self._embed_query(query)
+
+        if self.search_type == 'hybrid':
+            return self._retrieve_hybrid(query, embedding, shards)
+
+        if embedding is not None:
+            results = self._retrieve_by_vector(embedding, shards)
+            if results is not None:
+                return results
+
+        if self.search_type == 'similarity':
+            with span('retriever.vector_search', k=self.top_k) as search_span:
+                results = self.vectorstore.similarity_search_with_relevance_scores(
+                    query, k=self.top_k, **self._shard_kwargs(shards)
+                )
+                search_span.set(results=len(results))
+            return results
+
+        return [(doc, None) for doc in self.retrieve(query)]
+
+    @staticmethod
+    def _shard_kwargs(shards: Optional[List[str]]) -> Dict[str, Any]:
+        """Keyword arguments scoping a search to shards; only sharded stores receive them."""
+        return {'shards': shards} if shards is not None else {}
+
+    def _embed_query(self, query: str) -> Optional[List[float]]:
+        """Embed a query with the vector store's embedding model, or None if the store has none."""
+        embeddings = self.vectorstore.embeddings
+        if embeddings is None:
+            return None
+
+        with span('retriever.embed_query'):
+            return embeddings.embed_query(query)
+
+    def _retrieve_by_vector(
+            self,
+            embedding: List[float],
+            shards: Optional[List[str]] = None
+    ) -> Optional[List[Tuple[Document, Optional[float]]]]:
+        """Retrieve with a query embedding, or return None if the search type or store cannot."""
+        if self.search_type == 'similarity':
+            return self._similarity_by_vector(embedding, self.top_k, shards)
+
+        if self.search_type == 'mmr':
+            return self._mmr_by_vector(embedding, shards)
+
+        return None
+
+    def _mmr_by_vector(
+            self,
+            embedding: List[float],
+            shards: Optional[List[str]] = None
+    ) -> List[Tuple[Document, Optional[float]]]:
+        """
+        Select documents by maximal marginal relevance for a query embedding.
+
+        The mmr_fetch_k nearest chunks are fetched with their stored vectors
+        in one search, so no vector is recomputed or fetched again, and the
+        greedy selection runs as NumPy matrix operations. Stores that cannot
+        return their vectors run their own MMR search.
+        """
+        with span('retriever.mmr_search', k=self.top_k, fetch_k=self.mmr_fetch_k) as search_span:
+            candidates = search_with_vectors(
+                self.vectorstore, embedding, self.mmr_fetch_k, **self._shard_kwargs(shards)
+            )
+            if candidates is None:
+                documents = self.vectorstore.max_marginal_relevance_search_by_vector(
+                    embedding, k=self.top_k, fetch_k=self.mmr_fetch_k, lambda_mult=self.lambda_mult,
+                    **self._shard_kwargs(shards)
+                )
+                search_span.set(results=len(documents))
+                return [(doc, None) for doc in documents]
+
+            with span('retriever.mmr_select', candidates=len(candidates)):
+                selected = mmr_select(embedding, candidates.vectors, self.top_k, self.lambda_mult)
+            search_span.set(results=len(selected))
+
+        relevance_score_fn = self.vectorstore._select_relevance_score_fn()
+        return [(candidates.documents[i], relevance_score_fn(candidates.scores[i])) for i in selected]
+
+    def _similarity_by_vector(
+            self,
+            embedding: List[float],
+            k: int,
+            shards: Optional[List[str]] = None
+    ) -> Optional[List[Tuple[Document, float]]]:
+        """
+        Run a similarity search with relevance scores for a query embedding.
+
+        Returns:
+            List of (Document, score) tuples, or None if the vector store
+            cannot search by vector with scores
+        """
+        if hasattr(self.vectorstore, 'similarity_search_by_vector_with_relevance_scores'):
+            # Chroma returns raw distances here; convert them like the text-based search does
+            search = self.vectorstore.similarity_search_by_vector_with_relevance_scores
+        elif hasattr(self.vectorstore, 'similarity_search_with_score_by_vector'):
+            search = self.vectorstore.similarity_search_with_score_by_vector
+        else:
+            return None
+
+        relevance_score_fn = self.vectorstore._select_relevance_score_fn()
+        with span('retriever.vector_search', k=k) as search_span:
+            results = search(embedding, k=k, **self._shard_kwargs(shards))
+            search_span.set(results=len(results))
+        return [(doc, relevance_score_fn(score)) for doc, score in results]
+
+    def _retrieve_hybrid(
+            self,
+            query: str,
+            embedding: Optional[List[float]] = None,
+            shards: Optional[List[str]] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Fuse vector and BM25 keyword results with reciprocal rank fusion.
+
+        A document scores ``weight / (rrf_k + rank)`` in each result list it
+        appears in. Without a keyword index this ranks by vector search alone.
+        The keyword index covers all shards, so keyword hits outside the
+        requested shards are dropped.
+        """
+        fetch_k = max(self.fetch_k, self.top_k)
+
+        vector_hits = self._similarity_by_vector(embedding, fetch_k, shards) if embedding is not None else None
+        if vector_hits is None:
+            with span('retriever.vector_search', k=fetch_k) as search_span:
+                vector_hits = self.vectorstore.similarity_search_with_relevance_scores(
+                    query, k=fetch_k, **self._shard_kwargs(shards)
+                )
+                search_span.set(results=len(vector_hits))
+
+        keyword_hits = []
+        keyword_docs = {}
+        if self.keyword_index is not None:
+            with span('retriever.keyword_search', k=fetch_k) as search_span:
+                keyword_hits = self.keyword_index.search(query, fetch_k)
+                keyword_docs = self._documents_by_id([chunk_id for chunk_id, _ in keyword_hits])
+                if shards is not None:
+                    keyword_docs = {
+                        chunk_id: doc for chunk_id, doc in keyword_docs.items()
+                        if doc.metadata.get(SHARD_METADATA_KEY) in shards
+                    }
+                search_span.set(results=len(keyword_docs))
+
+        ranked_lists = [
+            (self.vector_weight, [doc for doc, _ in vector_hits]),
+            (self.keyword_weight, [keyword_docs[chunk_id] for chunk_id, _ in keyword_hits if chunk_id in keyword_docs])
+        ]
+
+        fused: Dict[Tuple, float] = {}
+        documents: Dict[Tuple, Document] = {}
+        for weight, ranked in ranked_lists:
+            for rank, doc in enumerate(ranked, start=1):
+                key = self._document_key(doc)
+                documents.setdefault(key, doc)
+                fused[key] = fused.get(key, 0.0) + weight / (self.rrf_k + rank)
+
+        best = sorted(fused, key=fused.get, reverse=True)[:self.top_k]
+        max_score = (self.vector_weight + self.keyword_weight) / (self.rrf_k + 1)
+        return [(documents[key], fused[key] / max_score) for key in best]
+
+    def _documents_by_id(self, ids: List[str]) -> Dict[str, Document]:
+        """Fetch documents from the vector store by chunk ID."""
+        if not ids:
+            return {}
+
+        try:
+            return {doc.id: doc for doc in self.vectorstore.get_by_ids(ids)}
+        except NotImplementedError:
+            # langchain_community's Chroma has no get_by_ids, only get()
+            results = self.vectorstore.get(ids=ids, include=['documents', 'metadatas'])
+            return {
+                chunk_id: Document(page_content=text, metadata=metadata or {})
+                for chunk_id, text, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+            }
+
+    @staticmethod
+    def _document_key(doc: Document) -> Tuple:
+        """Identify a chunk across result lists, whether or not the store returned its ID."""
+        return doc.page_content, doc.metadata.get('source'), doc.metadata.get('page')
+
+    async def aretrieve_with_scores(
+            self,
+            query: str,
+            embedding: Optional[List[float]] = None,
+            shards: Optional[List[str]] = None
+    ) -> List[Tuple[Document, Optional[float]]]:
+        """
+        Asynchronously retrieve relevant documents together with their relevance scores.
+
+        Args:
+            query: Query string
+            embedding: Precomputed query embedding, to avoid embedding the query again
+            shards: Shards of a sharded vector store to search; all shards if None
+
+        Returns:
+            List of (Document, score) tuples
+        """
+        if embedding is None and self.search_type in _VECTOR_SEARCH_TYPES:
+            embeddings = self.vectorstore.embeddings
+            if embeddings is not None:
+                with span('retriever.embed_query'):
+                    embedding = await embeddings.aembed_query(query)
+
+        if embedding is not None or self.search_type == 'hybrid' or shards is not None:
+            return await asyncio.to_thread(self.retrieve_with_scores, query, embedding, shards)
+
+        if self.search_type == 'similarity':
+            return await self.vectorstore.asimilarity_search_with_relevance_scores(query, k=self.top_k)
+
+        documents = await self.retriever.ainvoke(query)
+        return [(doc, None) for doc in documents]
@@ -0,0 +1,161 @@
+"""Semantic answer cache for near-duplicate questions."""
+import threading
+import time
+from typing import Any, List, Optional
+import numpy as np
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+DEFAULT_TTL_SECONDS = 86400
+DEFAULT_MAX_ENTRIES = 1000
+
+
+class SemanticCache:
+    """
+    In-memory cache of answers keyed by question embedding similarity.
+
+    Each entry records the scope it was computed for, such as the shards a
+    query searched, and only answers lookups of the same scope.
+    """
+
+    def __init__(
+            self,
+            similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+            ttl_seconds: float = DEFAULT_TTL_SECONDS,
+            max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a cached answer to be reused
+            ttl_seconds: Seconds an entry stays valid; 0 disables expiry
+            max_entries: Maximum number of cached answers
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._index_version: Optional[str] = None
+        self._clear()
+
+    def _clear(self) -> None:
+        """Drop all entries."""
+        self._vectors: Optional[np.ndarray] = None
+        self._created = np.zeros(self.max_entries, dtype=np.float64)
+        self._last_used = np.zeros(self.max_entries, dtype=np.float64)
+        self._values: List[Any] = [None] * self.max_entries
+        self._scopes = np.full(self.max_entries, None, dtype=object)
+        self._size = 0
+
+    def clear(self) -> None:
+        """Remove every cached answer."""
+        with self._lock:
+            self._clear()
+
+    def lookup(
+            self,
+            embedding: List[float],
+            index_version: Optional[str] = None,
+            scope: Optional[str] = None
+    ) -> Optional[Any]:
+        """
+        Find a cached answer for a question embedding.
+
+        All cached vectors are scored with one matrix-vector product. Entries
+        are invalidated when the index version differs from the one they were
+        stored under.
+
+        Args:
+            embedding: Embedding of the question
+            index_version: Version of the index the answer must come from
+            scope: Scope the answer must have been computed for; None for unscoped answers
+
+        Returns:
+            The cached value of the most similar live entry above the threshold, or None
+        """
+        query = self._normalize(embedding)
+
+        with self._lock:
+            self._check_version(index_version)
+
+            if self._size == 0:
+                self.misses += 1
+                return None
+
+            similarities = self._vectors[:self._size] @ query
+            if self.ttl_seconds:
+                expired = time.time() - self._created[:self._size] > self.ttl_seconds
+                similarities[expired] = -np.inf
+            similarities[self._scopes[:self._size] != scope] = -np.inf
+
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            self._last_used[best] = time.time()
+            self.hits += 1
+            return self._values[best]
+
+    def store(
+            self,
+            embedding: List[float],
+            value: Any,
+            index_version: Optional[str] = None,
+            scope: Optional[str] = None
+    ) -> None:
+        """
+        Cache a value under a question embedding.
+
+        When the cache is full, an expired entry is replaced if there is
+        one, otherwise the least recently used entry.
+
+        Args:
+            embedding: Embedding of the question
+            value: Value to cache, typically a QueryResult
+            index_version: Version of the index the value was computed from
+            scope: Scope the value was computed for; None for unscoped values
+        """
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            self._check_version(index_version)
+
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            now = time.time()
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                expired = now - self._created > self.ttl_seconds if self.ttl_seconds else None
+                if expired is not None and expired.any():
+                    slot = int(np.argmax(expired))
+                else:
+                    slot = int(np.argmin(self._last_used))
+
+            self._vectors[slot] = vector
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._values[slot] = value
+            self._scopes[slot] = scope
+
+    def _check_version(self, index_version: Optional[str]) -> None:
+        """Clear the cache if the index version changed."""
+        if index_version != self._index_version:
+            self._clear()
+            self._index_version = index_version
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,549 @@
+"""Vector store split into one collection per shard."""
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from utils.metrics import percentile
+from utils.tracing import span
+from .mmr import DEFAULT_FETCH_K, DEFAULT_LAMBDA_MULT, Candidates, mmr_select, search_with_vectors
+
+DEFAULT_ROUTE_BY = 'folder'
+DEFAULT_METADATA_KEY = 'department'
+DEFAULT_SHARD = 'general'
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_LATENCY_WINDOW = 1000
+SHARDS_FILENAME = 'shards.json'
+# Metadata field recording the shard of each stored chunk
+SHARD_METADATA_KEY = 'shard'
+
+_ROUTE_TYPES = ('folder', 'metadata')
+_INVALID_NAME_CHARACTERS = re.compile(r'[^a-z0-9]+')
+_MAX_NAME_LENGTH = 40
+
+
+def shard_name(value: Any) -> str:
+    """
+    Turn a folder name or metadata value into a shard name.
+
+    Shard names are lowercase letters, digits and single hyphens, so they
+    are valid in collection and file names of every backend.
+
+    Args:
+        value: Raw folder name or metadata value
+
+    Returns:
+        Shard name, or an empty string if nothing valid remains
+    """
+    return _INVALID_NAME_CHARACTERS.sub('-', str(value).lower()).strip('-')[:_MAX_NAME_LENGTH].strip('-')
+
+
+class ShardedVectorStore(VectorStore):
+    """
+    Vector store that keeps each shard in its own collection.
+
+    Chunks are routed to a shard by the folder of their source file or by a
+    metadata field, and their metadata records the shard. A search runs on
+    the requested shards, or on all of them, concurrently on a thread pool;
+    the per-shard results are merged into a global top-k by relevance. Each
+    shard search is traced as a "vectorstore.shard_search" span, and recent
+    latencies per shard are kept for latency_stats().
+
+    The shard names are kept in ``shards.json`` in the persist directory;
+    the shard stores themselves are created by a callback, so any backend
+    of VectorStoreFactory can be sharded.
+    """
+
+    def __init__(
+            self,
+            create_shard: Callable[[str], VectorStore],
+            embedding: Embeddings,
+            persist_directory: str,
+            route_by: str = DEFAULT_ROUTE_BY,
+            metadata_key: str = DEFAULT_METADATA_KEY,
+            default_shard: str = DEFAULT_SHARD,
+            max_workers: int = DEFAULT_MAX_WORKERS
+    ):
+        """
+        Initialize the store, loading the names of existing shards.
+
+        Args:
+            create_shard: Callable opening or creating the store of a shard by name
+            embedding: Embedding model used for text queries
+            persist_directory: Directory holding the shard list and shard files
+            route_by: "folder" to shard by the parent folder of the source file,
+                or "metadata" to shard by a metadata field
+            metadata_key: Metadata field used when route_by is "metadata"
+            default_shard: Shard for chunks without a folder or metadata value
+            max_workers: Threads searching shards concurrently
+
+        Raises:
+            ValueError: If the route type is not supported
+        """
+        if route_by not in _ROUTE_TYPES:
+            raise ValueError(f"Unsupported shard route: {route_by}")
+
+        self._create_shard = create_shard
+        self._embedding = embedding
+        self.persist_directory = Path(persist_directory)
+        self.route_by = route_by
+        self.metadata_key = metadata_key
+        self.default_shard = shard_name(default_shard) or DEFAULT_SHARD
+        self.max_workers = max(1, max_workers)
+
+        self._shards: Dict[str, Optional[VectorStore]] = {name: None for name in self._load_names()}
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """Embedding model of the store."""
+        return self._embedding
+
+    @property
+    def shard_names(self) -> List[str]:
+        """Names of the shards, sorted."""
+        return sorted(self._shards)
+
+    @property
+    def shards_path(self) -> Path:
+        """Path of the shard list file."""
+        return self.persist_directory / SHARDS_FILENAME
+
+    def shard_for(self, metadata: Dict[str, Any]) -> str:
+        """
+        Get the shard a chunk is routed to.
+
+        Args:
+            metadata: Chunk metadata; "source" is used when routing by folder
+
+        Returns:
+            Shard name
+        """
+        if self.route_by == 'folder':
+            source = metadata.get('source')
+            value = Path(source).parent.name if source else ''
+        else:
+            value = metadata.get(self.metadata_key, '')
+        return shard_name(value) or self.default_shard
+
+    def shard(self, name: str) -> VectorStore:
+        """
+        Get the store of a shard, opening it on first use.
+
+        Args:
+            name: Shard name
+
+        Returns:
+            Vector store of the shard
+
+        Raises:
+            ValueError: If the shard does not exist
+        """
+        store = self._shards.get(name)
+        if store is not None:
+            return store
+
+        with self._lock:
+            if name not in self._shards:
+                raise ValueError(f"Unknown shard: {name}")
+            if self._shards[name] is None:
+                self._shards[name] = self._create_shard(name)
+            return self._shards[name]
+
+    def route(self, documents: List[Document]) -> Dict[str, List[int]]:
+        """
+        Group documents by shard, creating shards that do not exist yet.
+
+        Args:
+            documents: Documents to route
+
+        Returns:
+            Shard name mapped to the positions of its documents
+        """
+        routes: Dict[str, List[int]] = {}
+        for position, doc in enumerate(documents):
+            routes.setdefault(self.shard_for(doc.metadata or {}), []).append(position)
+
+        new_names = [name for name in routes if name not in self._shards]
+        if new_names:
+            with self._lock:
+                for name in new_names:
+                    self._shards.setdefault(name, None)
+                # Recorded right away, so a crash before save() still finds the shard
+                self._save_names()
+        return routes
+
+    @staticmethod
+    def tag(documents: List[Document], name: str) -> List[Document]:
+        """Copy documents with their shard recorded in the metadata."""
+        return [
+            Document(
+                id=doc.id,
+                page_content=doc.page_content,
+                metadata={**(doc.metadata or {}), SHARD_METADATA_KEY: name}
+            )
+            for doc in documents
+        ]
+
+    def add_texts(
+            self,
+            texts: Iterable[str],
+            metadatas: Optional[List[Dict[str, Any]]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+            **kwargs: Any
+    ) -> List[str]:
+        """
+        Embed and add texts to their shards, replacing entries with the same IDs.
+
+        Args:
+            texts: Texts to add
+            metadatas: Metadata for each text
+            ids: ID for each text
+
+        Returns:
+            IDs of the added texts
+        """
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        documents = [Document(page_content=text, metadata=metadata or {}) for text, metadata in zip(texts, metadatas)]
+
+        added: List[str] = []
+        for name, positions in self.route(documents).items():
+            tagged = self.tag([documents[i] for i in positions], name)
+            added += self.shard(name).add_texts(
+                [doc.page_content for doc in tagged],
+                [doc.metadata for doc in tagged],
+                ids=[ids[i] for i in positions] if ids else None
+            )
+        return added
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """
+        Delete entries by ID from every shard.
+
+        Args:
+            ids: IDs to delete
+
+        Returns:
+            True once the entries are deleted
+
+        Raises:
+            ValueError: If no IDs are given
+        """
+        if ids is None:
+            raise ValueError("No ids provided to delete.")
+
+        # Chunk IDs do not name their shard; deletes are rare enough to try each one
+        for name in self.shard_names:
+            self.shard(name).delete(ids=ids)
+        return True
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        """
+        Get documents by ID from every shard.
+
+        Args:
+            ids: IDs to look up; unknown IDs are skipped
+
+        Returns:
+            List of Document objects in the order of the IDs
+        """
+        found: Dict[str, Document] = {}
+        for name in self.shard_names:
+            found.update(self._get_from_shard(self.shard(name), list(ids)))
+        return [found[doc_id] for doc_id in ids if doc_id in found]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        """Return the documents most similar to a query."""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Return the documents most similar to a query with their shard's score."""
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        """Return the documents most similar to an embedding."""
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score_by_vector(
+            self,
+            embedding: List[float],
+            k: int = 4,
+            shards: Optional[List[str]] = None,
+            **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """
+        Search shards concurrently and merge their results into a global top-k.
+
+        Scores are those of the shard backend, such as Chroma distances;
+        _select_relevance_score_fn() converts them to relevance.
+
+        Args:
+            embedding: Query embedding
+            k: Number of documents to return
+            shards: Shards to search; all shards if None
+
+        Returns:
+            List of (Document, score) tuples, best first
+
+        Raises:
+            ValueError: If a shard does not exist
+        """
+        results = self._fan_out(self._select(shards), lambda store: self._search_shard(store, embedding, k))
+        relevance_score_fn = self._select_relevance_score_fn()
+        merged = [hit for hits in results.values() for hit in hits]
+        merged.sort(key=lambda hit: relevance_score_fn(hit[1]), reverse=True)
+        return merged[:k]
+
+    def similarity_search_with_vectors_by_vector(
+            self,
+            embedding: List[float],
+            k: int = 4,
+            shards: Optional[List[str]] = None,
+            **kwargs: Any
+    ) -> Candidates:
+        """
+        Search shards concurrently and return the global top-k with their stored vectors.
+
+        Args:
+            embedding: Query embedding
+            k: Number of documents to return
+            shards: Shards to search; all shards if None
+
+        Returns:
+            Candidates holding the documents best first, their shard's scores and their vectors
+
+        Raises:
+            ValueError: If a shard does not exist
+            NotImplementedError: If the shard backend cannot return its stored vectors
+        """
+        results = self._fan_out(
+            self._select(shards),
+            lambda store: self._search_shard_with_vectors(store, embedding, k)
+        )
+        hits = [
+            (candidates.documents[i], candidates.scores[i], candidates.vectors[i])
+            for candidates in results.values() for i in range(len(candidates))
+        ]
+        relevance_score_fn = self._select_relevance_score_fn()
+        hits.sort(key=lambda hit: relevance_score_fn(hit[1]), reverse=True)
+        hits = hits[:k]
+        return Candidates(
+            documents=[doc for doc, _, _ in hits],
+            scores=[score for _, score, _ in hits],
+            vectors=np.asarray([vector for _, _, vector in hits], dtype=np.float32).reshape(len(hits), -1)
+        )
+
+    def max_marginal_relevance_search(
+            self,
+            query: str,
+            k: int = 4,
+            fetch_k: int = DEFAULT_FETCH_K,
+            lambda_mult: float = DEFAULT_LAMBDA_MULT,
+            **kwargs: Any
+    ) -> List[Document]:
+        """Return documents selected by maximal marginal relevance for a query."""
+        return self.max_marginal_relevance_search_by_vector(
+            self._embedding.embed_query(query), k, fetch_k, lambda_mult, **kwargs
+        )
+
+    def max_marginal_relevance_search_by_vector(
+            self,
+            embedding: List[float],
+            k: int = 4,
+            fetch_k: int = DEFAULT_FETCH_K,
+            lambda_mult: float = DEFAULT_LAMBDA_MULT,
+            shards: Optional[List[str]] = None,
+            **kwargs: Any
+    ) -> List[Document]:
+        """
+        Select documents by maximal marginal relevance across shards.
+
+        The global top fetch_k candidates are gathered from the shards with
+        their stored vectors, and the selection runs over all of them.
+
+        Args:
+            embedding: Query embedding
+            k: Number of documents to return
+            fetch_k: Number of nearest candidates to choose from
+            lambda_mult: 1 favours relevance, 0 favours diversity
+            shards: Shards to search; all shards if None
+
+        Returns:
+            List of Document objects
+        """
+        candidates = self.similarity_search_with_vectors_by_vector(embedding, max(fetch_k, k), shards)
+        return [candidates.documents[i] for i in mmr_select(embedding, candidates.vectors, k, lambda_mult)]
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize recent search latencies per shard.
+
+        Returns:
+            Shard name mapped to its "searches" count and "mean", "p50" and
+            "p95" latency in seconds over the recent searches
+        """
+        with self._lock:
+            samples = {name: list(latencies) for name, latencies in self._latencies.items()}
+        return {
+            name: {
+                'searches': len(latencies),
+                'mean': sum(latencies) / len(latencies),
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+            }
+            for name, latencies in sorted(samples.items()) if latencies
+        }
+
+    def shard_sizes(self) -> Dict[str, int]:
+        """
+        Count the chunks stored in each shard.
+
+        Returns:
+            Shard name mapped to its chunk count
+        """
+        sizes = {}
+        for name in self.shard_names:
+            store = self.shard(name)
+            collection = getattr(store, '_collection', None)
+            sizes[name] = collection.count() if collection is not None else len(store)
+        return sizes
+
+    @classmethod
+    def from_texts(
+            cls,
+            texts: List[str],
+            embedding: Embeddings,
+            metadatas: Optional[List[Dict[str, Any]]] = None,
+            **kwargs: Any
+    ) -> "ShardedVectorStore":
+        """Not supported; sharded stores are created by VectorStoreFactory."""
+        raise NotImplementedError("Create sharded vector stores with VectorStoreFactory")
+
+    def save(self) -> None:
+        """Write the shard list and every opened shard that keeps its files itself."""
+        with self._lock:
+            self._save_names()
+            stores = [store for store in self._shards.values() if store is not None]
+        for store in stores:
+            if hasattr(store, 'save'):
+                store.save()
+
+    def _select(self, shards: Optional[List[str]]) -> List[str]:
+        """Resolve requested shard names to existing shards; None selects all of them."""
+        if shards is None:
+            return self.shard_names
+
+        selected = []
+        for requested in shards:
+            name = shard_name(requested)
+            if name not in self._shards:
+                raise ValueError(f"Unknown shard: {requested} (available: {', '.join(self.shard_names) or 'none'})")
+            if name not in selected:
+                selected.append(name)
+        return selected
+
+    def _fan_out(self, names: List[str], search: Callable[[VectorStore], List[Any]]) -> Dict[str, List[Any]]:
+        """
+        Run a search on several shards concurrently.
+
+        Each shard search runs in a copy of the caller's context, so its
+        span nests under the caller's span.
+
+        Returns:
+            Shard name mapped to the search result
+        """
+        if len(names) <= 1:
+            return {name: self._timed_search(name, search) for name in names}
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='shard-search'
+                    )
+
+        futures = {
+            name: self._executor.submit(contextvars.copy_context().run, self._timed_search, name, search)
+            for name in names
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+    def _timed_search(self, name: str, search: Callable[[VectorStore], List[Any]]) -> List[Any]:
+        """Run a search on one shard, tracing it and recording its latency."""
+        start = time.perf_counter()
+        with span('vectorstore.shard_search', shard=name) as search_span:
+            results = search(self.shard(name))
+            search_span.set(results=len(results))
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=DEFAULT_LATENCY_WINDOW)).append(latency)
+        return results
+
+    @staticmethod
+    def _search_shard(store: VectorStore, embedding: List[float], k: int) -> List[Tuple[Document, float]]:
+        """Search one shard by vector, returning the backend's raw scores."""
+        if hasattr(store, 'similarity_search_by_vector_with_relevance_scores'):
+            # Chroma's by-vector search with "relevance" scores returns raw distances
+            return store.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
+        return store.similarity_search_with_score_by_vector(embedding, k=k)
+
+    @staticmethod
+    def _search_shard_with_vectors(store: VectorStore, embedding: List[float], k: int) -> Candidates:
+        """Search one shard by vector, returning the backend's raw scores and stored vectors."""
+        candidates = search_with_vectors(store, embedding, k)
+        if candidates is None:
+            raise NotImplementedError(f"{type(store).__name__} cannot return stored vectors")
+        return candidates
+
+    @staticmethod
+    def _get_from_shard(store: VectorStore, ids: List[str]) -> Dict[str, Document]:
+        """Fetch documents of one shard by ID."""
+        try:
+            return {doc.id: doc for doc in store.get_by_ids(ids)}
+        except NotImplementedError:
+            # langchain_community's Chroma has no get_by_ids, only get()
+            results = store.get(ids=ids, include=['documents', 'metadatas'])
+            return {
+                chunk_id: Document(id=chunk_id, page_content=text, metadata=metadata or {})
+                for chunk_id, text, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+            }
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        """Use the relevance function of the shard backend; all shards share one backend."""
+        names = self.shard_names
+        if not names:
+            return lambda score: score
+        return self.shard(names[0])._select_relevance_score_fn()
+
+    def _load_names(self) -> List[str]:
+        """Read the shard list, or an empty list if there is none."""
+        try:
+            with open(self.shards_path, 'r', encoding='utf-8') as f:
+                return json.load(f)['shards']
+        except FileNotFoundError:
+            return []
+
+    def _save_names(self) -> None:
+        """Replace the shard list file atomically."""
+        self.persist_directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.shards_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'route_by': self.route_by, 'shards': self.shard_names}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.shards_path)
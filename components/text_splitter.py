@@ -1,7 +1,134 @@
 """Text splitting component."""
-from typing import List, Dict, Any
+import re
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from utils.token_counter import token_offsets
+from utils.tracing import span
+
+DEFAULT_SPLITTER = 'recursive'
+DEFAULT_CHUNK_TOKENS = 250
+DEFAULT_CHUNK_OVERLAP_TOKENS = 50
+
+# Chunk boundaries from strongest to weakest: paragraph, line, sentence, word
+_BREAKS = (('\n\n',), ('\n',), ('. ', '? ', '! ', '; ', ': '), (' ', '\t'))
+_WHITESPACE = re.compile(r'\s')
+
+
+class TokenSplitter:
+    """
+    Splits text into token-sized chunks in one pass.
+
+    Each text is tokenized once. A chunk takes up to chunk_tokens tokens
+    and ends at the strongest boundary (paragraph, line, sentence, word) in
+    its second half; the next chunk starts chunk_overlap_tokens tokens
+    earlier at a word boundary. Chunks are produced as character offsets
+    into the text, so no intermediate strings are built.
+    """
+
+    def __init__(
+            self,
+            chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+            chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS
+    ):
+        """
+        Initialize the splitter.
+
+        Args:
+            chunk_tokens: Maximum tokens per chunk
+            chunk_overlap_tokens: Tokens shared by consecutive chunks
+
+        Raises:
+            ValueError: If the overlap is not smaller than the chunk size
+        """
+        if chunk_tokens <= 0 or not 0 <= chunk_overlap_tokens < chunk_tokens:
+            raise ValueError(
+                f"Chunk overlap ({chunk_overlap_tokens}) must be smaller than the chunk size ({chunk_tokens})"
+            )
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+
+    def spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Split a text into chunks.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            Iterator over (start, end) character offsets of each chunk,
+            with surrounding whitespace excluded
+        """
+        bounds = token_offsets(text)
+        count = len(bounds)
+        bounds.append(len(text))
+
+        # Token indexes track the budget; character offsets can fall inside a token
+        start, first = 0, 0
+        while start < count:
+            end = min(start + self.chunk_tokens, count)
+            last = bounds[end]
+            if end < count:
+                end, last = self._best_break(text, bounds, start + max(1, self.chunk_tokens // 2), end)
+
+            chunk_end = last
+            while first < last and text[first].isspace():
+                first += 1
+            while last > first and text[last - 1].isspace():
+                last -= 1
+            if first < last:
+                yield first, last
+
+            if end >= count:
+                return
+            # Step back by the overlap, then forward to the next word if there is one
+            start = max(end - self.chunk_overlap_tokens, start + 1)
+            first = bounds[start] if start < end else chunk_end
+            space = None if text[first - 1].isspace() else _WHITESPACE.search(text, first, chunk_end)
+            if space is not None:
+                first = space.start()
+                start = bisect_right(bounds, first) - 1
+
+    def split_documents(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        Split pages into chunk documents.
+
+        Each chunk keeps the page metadata and adds the character offsets of
+        the chunk in the page as start_index and end_index.
+
+        Args:
+            documents: Pages to split
+
+        Returns:
+            Iterator over chunk documents in page order
+        """
+        for doc in documents:
+            text = doc.page_content
+            for start, end in self.spans(text):
+                yield Document(
+                    page_content=text[start:end],
+                    metadata={**doc.metadata, 'start_index': start, 'end_index': end}
+                )
+
+    @staticmethod
+    def _best_break(text: str, bounds: List[int], lowest: int, end: int) -> Tuple[int, int]:
+        """
+        Find where to end a chunk that could run up to token index end.
+
+        Returns:
+            (token index, character offset) of the last strongest boundary
+            from token lowest to end, or of end if that range has none
+        """
+        first, last = bounds[lowest], bounds[end]
+        for separators in _BREAKS:
+            # Keep the separator's punctuation in the chunk; whitespace is stripped
+            position = max(
+                text.rfind(separator, first, last) + len(separator.rstrip()) for separator in separators
+            )
+            if position >= first:
+                return bisect_right(bounds, position) - 1, position
+        return end, last
 
 
 class TextSplitter:
@@ -13,16 +140,48 @@ class TextSplitter:
 
         Args:
             config: Document processing configuration
+
+        Raises:
+            ValueError: If the splitter type is not supported
         """
+        self.splitter_type = config.get('splitter', DEFAULT_SPLITTER)
         self.chunk_size = config.get('chunk_size', 1000)
         self.chunk_overlap = config.get('chunk_overlap', 200)
 
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            is_separator_regex=False
-        )
+        if self.splitter_type == 'token':
+            self.splitter = TokenSplitter(
+                config.get('chunk_tokens', DEFAULT_CHUNK_TOKENS),
+                config.get('chunk_overlap_tokens', DEFAULT_CHUNK_OVERLAP_TOKENS)
+            )
+        elif self.splitter_type == 'recursive':
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+            self.splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                length_function=len,
+                is_separator_regex=False,
+                # Page offsets let the context packer merge overlapping chunks
+                add_start_index=True
+            )
+        else:
+            raise ValueError(f"Unsupported splitter type: {self.splitter_type}")
+
+    def iter_chunks(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        Split documents into chunks lazily, one page at a time.
+
+        Args:
+            documents: Pages to split
+
+        Returns:
+            Iterator over chunk documents
+        """
+        if isinstance(self.splitter, TokenSplitter):
+            yield from self.splitter.split_documents(documents)
+            return
+        for doc in documents:
+            yield from self.splitter.split_documents([doc])
 
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
@@ -37,5 +196,7 @@ class TextSplitter:
         if not documents:
             return []
 
-        split_docs = self.splitter.split_documents(documents)
-        return split_docs
\ No newline at end of file
+        with span('splitter.split', pages=len(documents), splitter=self.splitter_type) as split_span:
+            split_docs = list(self.iter_chunks(documents))
+            split_span.set(chunks=len(split_docs))
+        return split_docs
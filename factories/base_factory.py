@@ -1,10 +1,65 @@
 """Abstract base classes for factories."""
+import importlib
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Union
+
+Builder = Union[str, Callable[..., Any]]
 
 
 class BaseFactory(ABC):
-    """Abstract base factory class."""
+    """
+    Abstract base factory class.
+
+    Each factory keeps a registry mapping a configuration ``type`` to the
+    builder that creates it. Builders are either callables or
+    ``"module:attribute"`` strings; backend libraries are imported only
+    when a builder for their type is first resolved, so selecting one
+    backend never pays the import cost of the others.
+    """
+
+    _registry: Dict[str, Builder] = {}
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._registry = {}
+
+    @classmethod
+    def register(cls, type_name: str, builder: Builder) -> None:
+        """
+        Register a builder for a configuration type.
+
+        The builder is called with the factory instance followed by the
+        arguments passed to create().
+
+        Args:
+            type_name: Value of the ``type`` configuration key
+            builder: Callable or ``"module:attribute"`` import path
+        """
+        # Enum members (e.g. LLMType.OPENAI) register under their value
+        cls._registry[str(getattr(type_name, 'value', type_name)).lower()] = builder
+
+    @classmethod
+    def registered_types(cls) -> List[str]:
+        """Get the configuration types this factory can create."""
+        return sorted(cls._registry)
+
+    @classmethod
+    def _get_builder(cls, type_name: str) -> Optional[Callable[..., Any]]:
+        """
+        Resolve the builder for a configuration type, importing it if needed.
+
+        Args:
+            type_name: Value of the ``type`` configuration key
+
+        Returns:
+            Builder callable, or None if the type is not registered
+        """
+        builder = cls._registry.get(type_name)
+        if isinstance(builder, str):
+            module_name, _, attribute = builder.partition(':')
+            builder = getattr(importlib.import_module(module_name), attribute)
+            cls._registry[type_name] = builder
+        return builder
 
     @abstractmethod
     def create(self, config: Dict[str, Any]) -> Any:
@@ -17,4 +72,4 @@ class BaseFactory(ABC):
         Returns:
             Created instance
         """
-        pass
\ No newline at end of file
+        pass
@@ -1,9 +1,19 @@
 """Embedding Factory implementation."""
-from typing import Any, Dict
-from langchain_openai import OpenAIEmbeddings
+from typing import TYPE_CHECKING, Any, Dict
+from langchain_core.embeddings import Embeddings
 from .base_factory import BaseFactory
+from components.embedding_cache import (
+    CachedEmbeddings, EmbeddingCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES
+)
+from components.embedding_scheduler import (
+    ScheduledEmbeddings, DEFAULT_BATCH_SIZE, DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES
+)
 from utils.config_types import EmbeddingModelType
 
+if TYPE_CHECKING:
+    from langchain_openai import OpenAIEmbeddings
+    from components.local_models import HashingEmbeddings
+
 DEFAULT_MODEL_NAME = 'text-embedding-3-small'
 
 class EmbeddingFactory(BaseFactory):
@@ -17,19 +27,23 @@ class EmbeddingFactory(BaseFactory):
             config: Embedding configuration dictionary
 
         Returns:
-            Embedding model instance
+            Embedding model instance, wrapped in a batch scheduler and a
+            persistent cache if enabled
 
         Raises:
             ValueError: If unsupported embedding type is specified
         """
         embedding_type = config.get('type', '').lower()
 
-        if embedding_type == EmbeddingModelType.OPENAI:
-            return self._create_openai_embedding(config)
-        else:
+        builder = self._get_builder(embedding_type)
+        if builder is None:
             raise ValueError(f"Unsupported embedding type: {embedding_type}")
 
-    def _create_openai_embedding(self, config: Dict[str, Any]) -> OpenAIEmbeddings:
+        embedding = builder(self, config)
+        embedding = self._wrap_with_scheduler(embedding, config)
+        return self._wrap_with_cache(embedding, config)
+
+    def _create_openai_embedding(self, config: Dict[str, Any]) -> "OpenAIEmbeddings":
         """
         Create an OpenAI embedding instance.
 
@@ -39,6 +53,77 @@ class EmbeddingFactory(BaseFactory):
         Returns:
             OpenAIEmbeddings instance
         """
+        from langchain_openai import OpenAIEmbeddings
+
         return OpenAIEmbeddings(
             model=config.get('model_name', DEFAULT_MODEL_NAME)
-        )
\ No newline at end of file
+        )
+
+    def _create_local_embedding(self, config: Dict[str, Any]) -> "HashingEmbeddings":
+        """
+        Create an offline feature-hashing embedding instance.
+
+        Args:
+            config: Local embedding configuration
+
+        Returns:
+            HashingEmbeddings instance
+        """
+        from components.local_models import HashingEmbeddings
+
+        options = ('dimensions', 'latency', 'error_rate', 'seed')
+        return HashingEmbeddings(**{key: config[key] for key in options if key in config})
+
+    def _wrap_with_scheduler(self, embedding: Embeddings, config: Dict[str, Any]) -> Embeddings:
+        """
+        Wrap an embedding model in a concurrent, rate-limited batch scheduler if enabled.
+
+        Args:
+            embedding: Embedding model instance
+            config: Embedding configuration
+
+        Returns:
+            The scheduled embedding wrapper, or the original instance if scheduling is disabled
+        """
+        scheduler_config = config.get('scheduler', {})
+        if not scheduler_config.get('enabled', False):
+            return embedding
+
+        return ScheduledEmbeddings(
+            embedding,
+            batch_size=scheduler_config.get('batch_size', DEFAULT_BATCH_SIZE),
+            max_concurrency=scheduler_config.get('max_concurrency', DEFAULT_MAX_CONCURRENCY),
+            requests_per_minute=scheduler_config.get('requests_per_minute', 0),
+            tokens_per_minute=scheduler_config.get('tokens_per_minute', 0),
+            max_retries=scheduler_config.get('max_retries', DEFAULT_MAX_RETRIES)
+        )
+
+    def _wrap_with_cache(self, embedding: Embeddings, config: Dict[str, Any]) -> Embeddings:
+        """
+        Wrap an embedding model in an on-disk cache if enabled in configuration.
+
+        Args:
+            embedding: Embedding model instance
+            config: Embedding configuration
+
+        Returns:
+            The cached embedding wrapper, or the original instance if caching is disabled
+        """
+        cache_config = config.get('cache', {})
+        if not cache_config.get('enabled', False):
+            return embedding
+
+        cache = EmbeddingCache(
+            path=cache_config.get('path', DEFAULT_CACHE_PATH),
+            max_entries=cache_config.get('max_entries', DEFAULT_MAX_ENTRIES)
+        )
+        model_name = f"{config.get('type', '').lower()}/{config.get('model_name', DEFAULT_MODEL_NAME)}"
+        if 'dimensions' in config:
+            # Vectors of different sizes from the same model must not share cache entries
+            model_name += f"/{config['dimensions']}"
+        return CachedEmbeddings(embedding, cache, model_name)
+
+
+EmbeddingFactory.register(EmbeddingModelType.OPENAI, EmbeddingFactory._create_openai_embedding)
+EmbeddingFactory.register(EmbeddingModelType.FAKE, EmbeddingFactory._create_local_embedding)
+EmbeddingFactory.register(EmbeddingModelType.LOCAL, EmbeddingFactory._create_local_embedding)
@@ -1,9 +1,12 @@
 """LLM Factory implementation."""
-from typing import Any, Dict
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING, Any, Dict
 from .base_factory import BaseFactory
 from utils.config_types import LLMType
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from components.local_models import TemplateChatModel
+
 DEFAULT_MODEL_NAME = 'gpt-4o-mini'
 DEFAULT_MODEL_TEMPERATURE = 0.7
 DEFAULT_MODEL_TOKEN_SIZE = 500
@@ -26,12 +29,12 @@ class LLMFactory(BaseFactory):
         """
         llm_type = config.get('type', '').lower()
 
-        if llm_type == LLMType.OPENAI:
-            return self._create_openai_llm(config)
-        else:
+        builder = self._get_builder(llm_type)
+        if builder is None:
             raise ValueError(f"Unsupported LLM type: {llm_type}")
+        return builder(self, config)
 
-    def _create_openai_llm(self, config: Dict[str, Any]) -> ChatOpenAI:
+    def _create_openai_llm(self, config: Dict[str, Any]) -> "ChatOpenAI":
         """
         Create an OpenAI LLM instance.
 
@@ -41,8 +44,33 @@ class LLMFactory(BaseFactory):
         Returns:
             ChatOpenAI instance
         """
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model = config.get('model_name', DEFAULT_MODEL_NAME),
             temperature = config.get('temperature', DEFAULT_MODEL_TEMPERATURE),
             max_tokens = config.get('max_tokens', DEFAULT_MODEL_TOKEN_SIZE)
-        )
\ No newline at end of file
+        )
+
+    def _create_local_llm(self, config: Dict[str, Any]) -> "TemplateChatModel":
+        """
+        Create an offline template LLM instance.
+
+        Args:
+            config: Local LLM configuration
+
+        Returns:
+            TemplateChatModel instance
+        """
+        from components.local_models import TemplateChatModel
+
+        options = ('mode', 'template', 'latency', 'tokens_per_second', 'error_rate', 'seed')
+        return TemplateChatModel(
+            max_tokens=config.get('max_tokens', DEFAULT_MODEL_TOKEN_SIZE),
+            **{key: config[key] for key in options if key in config}
+        )
+
+
+LLMFactory.register(LLMType.OPENAI, LLMFactory._create_openai_llm)
+LLMFactory.register(LLMType.FAKE, LLMFactory._create_local_llm)
+LLMFactory.register(LLMType.LOCAL, LLMFactory._create_local_llm)
@@ -1,11 +1,21 @@
 """Vector Store Factory implementation."""
-from typing import Any, Dict, List, Optional
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
 from pathlib import Path
-from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from .base_factory import BaseFactory
+from components.sharded_vectorstore import (
+    ShardedVectorStore, DEFAULT_ROUTE_BY, DEFAULT_METADATA_KEY, DEFAULT_SHARD, DEFAULT_MAX_WORKERS
+)
 from utils.config_types import VectorDBType
+from utils.tracing import span
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import Chroma
+    from components.faiss_vectorstore import FaissVectorStore
+    from components.local_vectorstore import LocalVectorStore
+    from components.numpy_vectorstore import NumpyVectorStore
 
 DEFAULT_PERSISTENT_DIR = './indexes/chroma_db'
 DEFAULT_COLLECTION_NAME = 'rag_documents'
@@ -13,19 +23,18 @@ DEFAULT_COLLECTION_NAME = 'rag_documents'
 class VectorStoreFactory(BaseFactory):
     """Factory for creating vector store instances."""
 
-    def create(
-            self,
-            config: Dict[str, Any],
-            embedding: Embeddings,
-            documents: Optional[List[Document]] = None
-    ) -> Any:
+    def create(self, config: Dict[str, Any], embedding: Embeddings) -> Any:
         """
         Create a vector store instance based on configuration.
 
+        The store is opened empty or with its saved contents; documents are
+        written with add_embeddings() by the ingestion pipeline. With
+        config["sharding"]["enabled"], a ShardedVectorStore is created whose
+        shards are collections of the configured type.
+
         Args:
             config: Vector store configuration dictionary
             embedding: Embedding model instance
-            documents: Optional list of documents to add to the vector store
 
         Returns:
             Vector store instance
@@ -35,48 +44,247 @@ class VectorStoreFactory(BaseFactory):
         """
         vectorstore_type = config.get('type', '').lower()
 
-        if vectorstore_type == VectorDBType.CHROMA:
-            return self._create_chroma_vectorstore(config, embedding, documents)
-        else:
+        builder = self._get_builder(vectorstore_type)
+        if builder is None:
             raise ValueError(f"Unsupported vector store type: {vectorstore_type}")
 
+        with span('vectorstore.create', type=vectorstore_type):
+            if config.get('sharding', {}).get('enabled', False):
+                return self._create_sharded_vectorstore(builder, config, embedding)
+            return builder(self, config, embedding)
+
+    def _create_sharded_vectorstore(
+            self,
+            builder: Callable[..., Any],
+            config: Dict[str, Any],
+            embedding: Embeddings
+    ) -> ShardedVectorStore:
+        """
+        Create a sharded vector store whose shards are built by a registered builder.
+
+        Each shard is a collection named "{collection_name}-{shard}" in the
+        persist directory.
+
+        Args:
+            builder: Registered builder of the shard store type
+            config: Vector store configuration
+            embedding: Embedding model instance
+
+        Returns:
+            ShardedVectorStore instance
+        """
+        sharding_config = config.get('sharding', {})
+        persist_directory = config.get('persist_directory', DEFAULT_PERSISTENT_DIR)
+        collection_name = config.get('collection_name', DEFAULT_COLLECTION_NAME)
+
+        def create_shard(name: str) -> Any:
+            return builder(self, {**config, 'collection_name': f"{collection_name}-{name}"}, embedding)
+
+        return ShardedVectorStore(
+            create_shard,
+            embedding,
+            persist_directory,
+            route_by=sharding_config.get('route_by', DEFAULT_ROUTE_BY),
+            metadata_key=sharding_config.get('metadata_key', DEFAULT_METADATA_KEY),
+            default_shard=sharding_config.get('default_shard', DEFAULT_SHARD),
+            max_workers=sharding_config.get('max_workers', DEFAULT_MAX_WORKERS)
+        )
+
     def _create_chroma_vectorstore(
             self,
             config: Dict[str, Any],
-            embedding: Embeddings,
-            documents: Optional[List[Document]] = None
-    ) -> Chroma:
+            embedding: Embeddings
+    ) -> "Chroma":
         """
         Create a Chroma vector store instance.
 
         Args:
             config: Chroma configuration
             embedding: Embedding model instance
-            documents: Optional list of documents to add
 
         Returns:
             Chroma instance
         """
+        from langchain_community.vectorstores import Chroma
+
         persist_directory = config.get('persist_directory', DEFAULT_PERSISTENT_DIR)
         collection_name = config.get('collection_name', DEFAULT_COLLECTION_NAME)
 
         # Create persist directory if it doesn't exist
         Path(persist_directory).mkdir(parents=True, exist_ok=True)
 
-        if documents:
-            # Create new vector store with documents
-            vectorstore = Chroma.from_documents(
-                documents=documents,
-                embedding=embedding,
-                persist_directory=persist_directory,
-                collection_name=collection_name
-            )
-        else:
-            # Load existing vector store
-            vectorstore = Chroma(
-                persist_directory=persist_directory,
-                embedding_function=embedding,
-                collection_name=collection_name
-            )
-
-        return vectorstore
\ No newline at end of file
+        # New collections use cosine distance; collections created earlier keep their space
+        vectorstore = Chroma(
+            persist_directory=persist_directory,
+            embedding_function=embedding,
+            collection_name=collection_name,
+            collection_metadata={'hnsw:space': 'cosine'}
+        )
+        vectorstore.override_relevance_score_fn = self._chroma_relevance_score_fn(
+            self._chroma_distance_space(vectorstore._collection)
+        )
+        return vectorstore
+
+    def _create_faiss_vectorstore(
+            self,
+            config: Dict[str, Any],
+            embedding: Embeddings
+    ) -> "FaissVectorStore":
+        """
+        Create a FAISS vector store instance.
+
+        Args:
+            config: FAISS configuration
+            embedding: Embedding model instance
+
+        Returns:
+            FaissVectorStore instance
+        """
+        from components.faiss_vectorstore import FaissVectorStore
+
+        return self._create_local_vectorstore(
+            FaissVectorStore, config.get('faiss', {}), config, embedding
+        )
+
+    def _create_numpy_vectorstore(
+            self,
+            config: Dict[str, Any],
+            embedding: Embeddings
+    ) -> "NumpyVectorStore":
+        """
+        Create a NumPy vector store instance.
+
+        Args:
+            config: NumPy vector store configuration
+            embedding: Embedding model instance
+
+        Returns:
+            NumpyVectorStore instance
+        """
+        from components.numpy_vectorstore import NumpyVectorStore
+
+        return self._create_local_vectorstore(
+            NumpyVectorStore, config.get('numpy', {}), config, embedding
+        )
+
+    def _create_local_vectorstore(
+            self,
+            store_class: type,
+            options: Dict[str, Any],
+            config: Dict[str, Any],
+            embedding: Embeddings
+    ) -> "LocalVectorStore":
+        """
+        Create a file-based vector store, loading its saved files if present.
+
+        Args:
+            store_class: LocalVectorStore subclass to create
+            options: Backend-specific constructor arguments
+            config: Vector store configuration
+            embedding: Embedding model instance
+
+        Returns:
+            Vector store instance
+        """
+        persist_directory = config.get('persist_directory', DEFAULT_PERSISTENT_DIR)
+        collection_name = config.get('collection_name', DEFAULT_COLLECTION_NAME)
+        Path(persist_directory).mkdir(parents=True, exist_ok=True)
+
+        return store_class(embedding, persist_directory, collection_name, **options)
+
+    def add_embeddings(
+            self,
+            vectorstore: Any,
+            documents: List[Document],
+            embeddings: List[List[float]],
+            ids: List[str]
+    ) -> None:
+        """
+        Upsert documents with precomputed embeddings into a vector store.
+
+        Args:
+            vectorstore: Vector store instance created by this factory
+            documents: Documents to store
+            embeddings: Embedding vector for each document
+            ids: ID for each document; existing entries with the same ID are replaced
+        """
+        if isinstance(vectorstore, ShardedVectorStore):
+            for name, positions in vectorstore.route(documents).items():
+                self.add_embeddings(
+                    vectorstore.shard(name),
+                    vectorstore.tag([documents[i] for i in positions], name),
+                    [embeddings[i] for i in positions],
+                    [ids[i] for i in positions]
+                )
+            return
+
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata or None for doc in documents]
+
+        with span('vectorstore.add', documents=len(documents)):
+            if self._is_chroma(vectorstore):
+                vectorstore._collection.upsert(
+                    ids=ids,
+                    embeddings=embeddings,
+                    metadatas=metadatas,
+                    documents=texts
+                )
+            elif hasattr(vectorstore, 'add_embeddings'):
+                vectorstore.add_embeddings(list(zip(texts, embeddings)), metadatas=metadatas, ids=ids)
+            else:
+                # Backend cannot take precomputed vectors; let it embed again
+                vectorstore.add_documents(documents, ids=ids)
+
+    def persist(self, vectorstore: Any) -> None:
+        """
+        Write pending changes of a vector store to disk.
+
+        Chroma persists every write itself; file-based stores are saved
+        here once a batch of changes is complete.
+
+        Args:
+            vectorstore: Vector store instance created by this factory
+        """
+        if hasattr(vectorstore, 'save'):
+            with span('vectorstore.persist'):
+                vectorstore.save()
+
+    @staticmethod
+    def _chroma_distance_space(collection: Any) -> str:
+        """Get the distance function of a Chroma collection: "l2", "cosine" or "ip"."""
+        configuration = getattr(collection, 'configuration_json', None) or {}
+        space = (configuration.get('hnsw') or {}).get('space')
+        if space is None:
+            space = (collection.metadata or {}).get('hnsw:space', 'l2')
+        return space
+
+    @staticmethod
+    def _chroma_relevance_score_fn(space: str) -> Callable[[float], float]:
+        """
+        Get the function turning Chroma distances into relevance scores in [0, 1].
+
+        Scores are the cosine similarity of the query and the chunk, with
+        opposite directions treated as unrelated, as in the local stores.
+        Chroma's l2 distance is squared, 2 - 2 * cosine for the normalized
+        vectors of the embedding models, and its ip distance is 1 - dot product.
+
+        Args:
+            space: Distance function of the collection
+
+        Returns:
+            Function mapping a distance to a relevance score
+        """
+        if space == 'l2':
+            return lambda distance: max(0.0, min(1.0, 1.0 - distance / 2))
+        return lambda distance: max(0.0, min(1.0, 1.0 - distance))
+
+    @staticmethod
+    def _is_chroma(vectorstore: Any) -> bool:
+        """Check for a Chroma store without importing Chroma when it was never loaded."""
+        chroma_module = sys.modules.get('langchain_community.vectorstores.chroma')
+        return chroma_module is not None and isinstance(vectorstore, chroma_module.Chroma)
+
+
+VectorStoreFactory.register(VectorDBType.CHROMA, VectorStoreFactory._create_chroma_vectorstore)
+VectorStoreFactory.register(VectorDBType.FAISS, VectorStoreFactory._create_faiss_vectorstore)
+VectorStoreFactory.register(VectorDBType.NUMPY, VectorStoreFactory._create_numpy_vectorstore)
@@ -1,31 +1,89 @@
 """Main CLI entry point for RAG application."""
 import argparse
+import asyncio
+import json
+import os
 import sys
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
-from rag.rag_pipeline import RAGPipeline
+from utils.metrics import latency_summary
+from utils.tracing import JsonlExporter, TextExporter, get_tracer
+
+# The RAG pipeline pulls in LangChain and the model backends, so it is
+# imported inside the commands that use it; --help and argument errors
+# return without paying that cost.
 
 def index_command(args):
     """Handle index command."""
     try:
+        from rag.rag_pipeline import RAGPipeline
+
         pipeline = RAGPipeline(args.config)
-        pipeline.index_documents(args.path)
+        pipeline.index_documents(args.path, incremental=args.incremental, resume=args.resume)
         print("\n✓ Documents indexed successfully!")
     except Exception as e:
         print(f"\n✗ Error indexing documents: {e}", file=sys.stderr)
         sys.exit(1)
 
 
+def snapshots_command(args):
+    """Handle snapshots command."""
+    try:
+        from rag.rag_pipeline import RAGPipeline
+
+        pipeline = RAGPipeline(args.config)
+        if args.rollback:
+            version = pipeline.rollback(None if args.rollback == 'previous' else args.rollback)
+            print(f"✓ Now serving index snapshot {version}")
+            return
+
+        snapshots = pipeline.list_snapshots()
+        if not snapshots:
+            print("No index snapshots yet.")
+        for snapshot in snapshots:
+            status = " (current)" if snapshot['current'] else " (building)" if snapshot['building'] else ""
+            print(f"{snapshot['version']}  {snapshot['files']} file(s){status}")
+    except Exception as e:
+        print(f"\n✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def shards_command(args):
+    """Handle shards command."""
+    try:
+        from rag.rag_pipeline import RAGPipeline
+
+        pipeline = RAGPipeline(args.config)
+        shards = pipeline.list_shards()
+        if not shards:
+            print("No shards yet.")
+        for shard in shards:
+            print(f"{shard['shard']}  {shard['chunks']} chunk(s)")
+    except Exception as e:
+        print(f"\n✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
 def query_command(args):
     """Handle query command."""
     try:
+        from rag.rag_pipeline import RAGPipeline
+
         pipeline = RAGPipeline(args.config)
 
         # Load existing vector store
         pipeline.load_vectorstore()
 
-        if args.interactive:
+        if args.batch:
+            # Bulk mode
+            if not args.out:
+                print("Error: --out is required with --batch", file=sys.stderr)
+                sys.exit(1)
+
+            batch_query(pipeline, args.batch, args.out, args.concurrency, args.shards)
+        elif args.interactive:
             # Interactive mode
             print("\n=== RAG Interactive Query Mode ===")
             print("Type 'exit' or 'quit' to exit\n")
@@ -42,13 +100,21 @@ def query_command(args):
                         continue
 
                     print("\nSearching and generating answer...\n")
-                    result = pipeline.query(question)
+                    print("Answer: ", end="", flush=True)
+
+                    result = None
+                    for event in pipeline.stream_query(question, args.shards):
+                        if event['type'] == 'token':
+                            print(event['text'], end="", flush=True)
+                        elif event['type'] == 'done':
+                            result = event['result']
 
-                    print(f"Answer: {result['answer']}\n")
+                    timings = result.timings
+                    print(f"\n\n(first token {timings['time_to_first_token']:.2f}s, total {timings['total']:.2f}s)\n")
 
                     if args.show_sources:
                         print("Sources:")
-                        for i, doc in enumerate(result['source_documents'], 1):
+                        for i, doc in enumerate(result.source_documents, 1):
                             source = doc.metadata.get('source', 'Unknown')
                             page = doc.metadata.get('page', 'N/A')
                             print(f"  [{i}] {source} (Page {page})")
@@ -65,14 +131,14 @@ def query_command(args):
                 print("Error: --question is required in non-interactive mode", file=sys.stderr)
                 sys.exit(1)
 
-            result = pipeline.query(args.question)
+            result = pipeline.query(args.question, args.shards)
 
-            print(f"\nQuestion: {result['question']}")
-            print(f"\nAnswer: {result['answer']}\n")
+            print(f"\nQuestion: {result.question}")
+            print(f"\nAnswer: {result.answer}\n")
 
             if args.show_sources:
                 print("Sources:")
-                for i, doc in enumerate(result['source_documents'], 1):
+                for i, doc in enumerate(result.source_documents, 1):
                     source = doc.metadata.get('source', 'Unknown')
                     page = doc.metadata.get('page', 'N/A')
                     print(f"  [{i}] {source} (Page {page})")
@@ -81,6 +147,134 @@ def query_command(args):
         print(f"\n✗ Error during query: {e}", file=sys.stderr)
         sys.exit(1)
 
+
+def load_batch_questions(batch_path):
+    """
+    Load questions for bulk mode from a JSONL file.
+
+    Each line is either a JSON string or an object with a "question" and an
+    optional "id". Questions without an id are identified by line number.
+    """
+    questions = []
+    with open(batch_path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {'question': record}
+            questions.append((str(record.get('id', line_number)), record['question']))
+
+    return questions
+
+
+def load_answered_ids(out_path):
+    """
+    Collect ids already answered in a previous run's output file.
+
+    Error records are dropped from the file, as their questions are asked
+    again, so the file keeps one record per id. A partial last line left
+    by an interrupted run is dropped too.
+    """
+    answered = set()
+    if not Path(out_path).exists():
+        return answered
+
+    kept = []
+    rewrite = False
+    with open(out_path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                rewrite = True
+                continue
+            if 'error' in record or record['id'] in answered:
+                rewrite = True
+                continue
+
+            answered.add(record['id'])
+            if not line.endswith("\n"):
+                rewrite = True
+            kept.append(line.rstrip("\n") + "\n")
+
+    if rewrite:
+        tmp_path = Path(out_path).with_name(Path(out_path).name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            f.writelines(kept)
+        os.replace(tmp_path, out_path)
+
+    return answered
+
+
+async def answer_batch(pipeline, questions, out_file, concurrency, shards=None):
+    """Answer questions concurrently, appending each result as it completes."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def answer(question_id, question):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await pipeline.aquery(question, shards)
+            except Exception as e:
+                return {'id': question_id, 'question': question, 'error': str(e)}, None
+            return {'id': question_id, **result.to_dict()}, time.perf_counter() - start
+
+    tasks = [answer(question_id, question) for question_id, question in questions]
+    for completed, task in enumerate(asyncio.as_completed(tasks), 1):
+        record, latency = await task
+        out_file.write(json.dumps(record) + "\n")
+        out_file.flush()
+
+        if latency is None:
+            failures += 1
+            print(f"  ✗ {record['id']}: {record['error']}", file=sys.stderr)
+        else:
+            latencies.append(latency)
+
+        if completed % 10 == 0 or completed == len(tasks):
+            print(f"  {completed}/{len(tasks)} answered", end="\r", flush=True)
+
+    print()
+    return latencies, failures
+
+
+def batch_query(pipeline, batch_path, out_path, concurrency, shards=None):
+    """Answer a JSONL file of questions, resuming from existing output."""
+    questions = load_batch_questions(batch_path)
+    answered = load_answered_ids(out_path)
+    pending = [(question_id, question) for question_id, question in questions if question_id not in answered]
+
+    print(f"\n{len(pending)} of {len(questions)} question(s) to answer "
+          f"({len(questions) - len(pending)} already in {out_path})")
+    if not pending:
+        return
+
+    if concurrency is None:
+        from rag.rag_pipeline import DEFAULT_MAX_CONCURRENCY
+
+        concurrency = pipeline.config_loader.get_query_config().get('max_concurrency', DEFAULT_MAX_CONCURRENCY)
+
+    start = time.perf_counter()
+    with open(out_path, 'a') as out_file:
+        latencies, failures = asyncio.run(answer_batch(pipeline, pending, out_file, concurrency, shards))
+    summary = latency_summary(latencies, time.perf_counter() - start)
+
+    print(f"\nAnswered {summary['count']} question(s), {failures} failed")
+    print(f"Throughput: {summary['per_second']:.2f} q/s")
+    print(f"Latency: p50 {summary['p50']:.2f}s, p95 {summary['p95']:.2f}s, "
+          f"p99 {summary['p99']:.2f}s, max {summary['max']:.2f}s")
+
+    if hasattr(pipeline.vectorstore, 'latency_stats'):
+        for shard, stats in pipeline.vectorstore.latency_stats().items():
+            print(f"Shard {shard}: {stats['searches']} search(es), p50 {stats['p50'] * 1000:.1f}ms, "
+                  f"p95 {stats['p95'] * 1000:.1f}ms")
+
+
 def main_noargs():
     # Load environment variables
     load_dotenv()
@@ -100,6 +294,16 @@ def main():
         default='config/config.yaml',
         help='Path to configuration file (default: config/config.yaml)'
     )
+    parser.add_argument(
+        '--trace',
+        action='store_true',
+        help='Print a per-stage timing breakdown of each index run and query to stderr'
+    )
+    parser.add_argument(
+        '--trace-file',
+        type=str,
+        help='Append the trace of each index run and query to this JSONL file'
+    )
 
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
 
@@ -108,9 +312,33 @@ def main():
     index_parser.add_argument(
         'path',
         type=str,
-        help='Path to PDF file or directory containing PDFs'
+        nargs='?',
+        help='Path to PDF file or directory containing PDFs (optional with --resume)'
+    )
+    index_parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only index files added or changed since the last run and drop removed files'
+    )
+    index_parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted index run from its last checkpoint'
     )
 
+    # Snapshots command
+    snapshots_parser = subparsers.add_parser('snapshots', help='List index snapshots or roll back to one')
+    snapshots_parser.add_argument(
+        '--rollback',
+        nargs='?',
+        const='previous',
+        metavar='VERSION',
+        help='Serve an earlier snapshot (default: the one before the current snapshot)'
+    )
+
+    # Shards command
+    subparsers.add_parser('shards', help='List the shards of a sharded index')
+
     # Query command
     query_parser = subparsers.add_parser('query', help='Query indexed documents')
     query_parser.add_argument(
@@ -128,6 +356,28 @@ def main():
         action='store_true',
         help='Show source documents'
     )
+    query_parser.add_argument(
+        '--batch',
+        type=str,
+        help='JSONL file of questions to answer in bulk'
+    )
+    query_parser.add_argument(
+        '--out',
+        type=str,
+        help='JSONL file receiving bulk answers; answered questions are skipped on re-run'
+    )
+    query_parser.add_argument(
+        '--concurrency',
+        type=int,
+        help='Questions in flight in bulk mode (default: query.max_concurrency)'
+    )
+    query_parser.add_argument(
+        '--shard',
+        dest='shards',
+        action='append',
+        metavar='NAME',
+        help='Only search this shard of a sharded index; repeat for several (default: all shards)'
+    )
 
     args = parser.parse_args()
 
@@ -135,8 +385,19 @@ def main():
         parser.print_help()
         sys.exit(1)
 
+    if args.trace:
+        get_tracer().add_hook(TextExporter())
+    if args.trace_file:
+        get_tracer().add_hook(JsonlExporter(args.trace_file))
+
     if args.command == 'index':
+        if not args.path and not args.resume:
+            index_parser.error("the following arguments are required: path")
         index_command(args)
+    elif args.command == 'snapshots':
+        snapshots_command(args)
+    elif args.command == 'shards':
+        shards_command(args)
     elif args.command == 'query':
         query_command(args)
 
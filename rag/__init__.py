@@ -1,5 +1,7 @@
 """RAG pipeline implementation."""
 
+from .query_result import QueryResult
 from .rag_pipeline import RAGPipeline
+from .pipeline_registry import PipelineRegistry, get_shared_pipeline, get_registry
 
-__all__ = ['RAGPipeline']
\ No newline at end of file
+__all__ = ['RAGPipeline', 'QueryResult', 'PipelineRegistry', 'get_shared_pipeline', 'get_registry']
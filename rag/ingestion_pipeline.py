@@ -0,0 +1,386 @@
+"""Streaming ingestion pipeline."""
+import contextvars
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from factories import VectorStoreFactory
+from components import DocumentLoader, TextSplitter, IndexManifest, KeywordIndex, ChunkDeduplicator, ShardedVectorStore
+from components.document_loader import DEFAULT_WORKERS
+from utils.tracing import span
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_QUEUE_SIZE = 4
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+DEFAULT_PROGRESS_INTERVAL = 5.0
+QUEUE_POLL_INTERVAL = 0.1
+
+_END = object()
+
+
+@dataclass
+class ChunkBatch:
+    """A batch of chunks moving through the ingestion stages."""
+
+    documents: List[Document] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+    # Source file path of each chunk
+    files: List[str] = field(default_factory=list)
+    embeddings: List[List[float]] = field(default_factory=list)
+    # (file path, stored chunk IDs of the file, IDs to delete, dropped
+    # near-duplicates) for files whose last chunk is in this batch or an earlier one
+    completed_files: List[Tuple[str, List[str], List[str], Dict[str, Dict[str, Any]]]] = field(
+        default_factory=list
+    )
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+
+class IngestionPipeline:
+    """Chains load, split, embed and upsert as concurrent streaming stages."""
+
+    def __init__(
+            self,
+            text_splitter: TextSplitter,
+            embedding: Embeddings,
+            vectorstore: VectorStore,
+            vectorstore_factory: VectorStoreFactory,
+            config: Dict[str, Any],
+            keyword_index: Optional[KeywordIndex] = None
+    ):
+        """
+        Initialize the ingestion pipeline.
+
+        Args:
+            text_splitter: Splitter used to chunk pages
+            embedding: Embedding model used for chunk vectors
+            vectorstore: Vector store receiving the chunks
+            vectorstore_factory: Factory used to write precomputed vectors
+            config: Document processing configuration
+            keyword_index: BM25 index kept in step with the vector store
+        """
+        self.text_splitter = text_splitter
+        self.embedding = embedding
+        self.vectorstore = vectorstore
+        self.vectorstore_factory = vectorstore_factory
+        self.keyword_index = keyword_index
+        self.batch_size = config.get('batch_size', DEFAULT_BATCH_SIZE)
+        self.queue_size = config.get('queue_size', DEFAULT_QUEUE_SIZE)
+        self.workers = config.get('workers', DEFAULT_WORKERS)
+        self.dedup_config = config.get('dedup', {})
+        self.checkpoint_interval = config.get('checkpoint_interval', DEFAULT_CHECKPOINT_INTERVAL)
+        self.progress_interval = config.get('progress_interval', DEFAULT_PROGRESS_INTERVAL)
+
+        self._stop = threading.Event()
+        self.stats: Dict[str, Any] = {}
+        self._start = 0.0
+        self._last_checkpoint = 0.0
+        self._last_progress = 0.0
+        self._total_files = 0
+        self._completed_files = 0
+        self._stored = 0
+        self._total_bytes = 0
+        self._split_bytes = 0
+
+    def run(
+            self,
+            file_paths: List[str],
+            manifest: IndexManifest,
+            skip_existing: bool = False,
+            skip_pending: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Ingest files into the vector store.
+
+        Each stage runs in its own thread and hands work to the next through
+        a bounded queue, so memory stays proportional to the batch and queue
+        sizes and embedding requests overlap with PDF parsing. A file is
+        recorded in the manifest only after all of its chunks are written.
+        With deduplication enabled, chunks that nearly repeat an earlier chunk
+        of the run, such as page headers and disclaimers, are dropped before
+        embedding and recorded in the manifest against the chunk that was kept.
+        In a sharded store chunks are only compared within their shard, so a
+        search scoped to one shard still finds every text of that shard.
+
+        After a committed batch, and at most every checkpoint_interval
+        seconds, the vector store, keyword index and manifest are saved. The
+        manifest then lists the chunks already written for unfinished files,
+        so a resumed run with skip_existing or skip_pending does not embed
+        them again.
+
+        Args:
+            file_paths: PDF files to ingest
+            manifest: Manifest updated with the chunk IDs of each file
+            skip_existing: Skip chunks whose IDs the manifest already records
+                or that an interrupted run already stored
+            skip_pending: Skip only the chunks an interrupted run already stored
+
+        Returns:
+            Dictionary of ingestion statistics
+        """
+        self._stop.clear()
+        self.stats = {
+            'files': 0, 'pages': 0, 'chunks': 0, 'embedded': 0, 'skipped': 0, 'deleted': 0,
+            'duplicates': 0, 'embeddings_saved': 0, 'checkpoints': 0
+        }
+        start = time.perf_counter()
+        self._start = self._last_checkpoint = self._last_progress = start
+        self._total_files = len(file_paths)
+        self._completed_files = 0
+        self._stored = 0
+        self._total_bytes = sum(os.path.getsize(path) for path in file_paths)
+        self._split_bytes = 0
+        # One deduplicator per shard, created on first use
+        deduplicators: Optional[Dict[str, ChunkDeduplicator]] = {} if self.dedup_config.get('enabled', False) else None
+
+        try:
+            loaded = self._threaded(DocumentLoader.load_files(file_paths, self.workers))
+            batches = self._threaded(self._split_stage(loaded, manifest, skip_existing, skip_pending, deduplicators))
+            embedded = self._threaded(self._embed_stage(batches))
+
+            for batch in embedded:
+                self._upsert_stage(batch, manifest)
+        except BaseException:
+            # Keep the batches committed since the last checkpoint for --resume
+            self._stop.set()
+            try:
+                self._checkpoint(manifest)
+                print(f"Indexing interrupted; progress saved after {self._stored} chunk(s). "
+                      f"Run 'index --resume' to continue.")
+            except Exception as e:
+                print(f"Warning: Could not save indexing progress: {e}")
+            raise
+        finally:
+            self._stop.set()
+
+        self.stats['seconds'] = time.perf_counter() - start
+        return self.stats
+
+    def _split_stage(
+            self,
+            loaded: Iterable[Tuple[str, List[Document]]],
+            manifest: IndexManifest,
+            skip_existing: bool,
+            skip_pending: bool,
+            deduplicators: Optional[Dict[str, ChunkDeduplicator]] = None
+    ) -> Iterator[ChunkBatch]:
+        """Split loaded files into fixed-size batches of chunks with deterministic IDs."""
+        batch = ChunkBatch()
+
+        for file_path, documents in loaded:
+            split_docs = self.text_splitter.split_documents(documents)
+            chunk_ids = IndexManifest.chunk_ids(file_path, split_docs)
+            # Chunks an interrupted run stored are skipped or deleted like recorded ones
+            pending_ids = set(manifest.pending_ids(file_path))
+            old_ids = set(manifest.chunk_ids_for(file_path)) | pending_ids
+            if skip_existing:
+                skip_ids = old_ids
+            else:
+                skip_ids = pending_ids if skip_pending else set()
+
+            self.stats['files'] += 1
+            self.stats['pages'] += len(documents)
+            self.stats['chunks'] += len(split_docs)
+
+            duplicates: Dict[str, Dict[str, Any]] = {}
+            if deduplicators is not None:
+                split_docs, chunk_ids, duplicates = self._deduplicate(
+                    deduplicators, split_docs, chunk_ids, skip_ids
+                )
+
+            for doc, chunk_id in zip(split_docs, chunk_ids):
+                if chunk_id in skip_ids:
+                    self.stats['skipped'] += 1
+                    continue
+
+                batch.documents.append(doc)
+                batch.ids.append(chunk_id)
+                batch.files.append(file_path)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = ChunkBatch()
+
+            batch.completed_files.append((file_path, chunk_ids, list(old_ids - set(chunk_ids)), duplicates))
+            self._split_bytes += os.path.getsize(file_path)
+
+        if batch.documents or batch.completed_files:
+            yield batch
+
+    def _deduplicate(
+            self,
+            deduplicators: Dict[str, ChunkDeduplicator],
+            split_docs: List[Document],
+            chunk_ids: List[str],
+            existing_ids: Set[str]
+    ) -> Tuple[List[Document], List[str], Dict[str, Dict[str, Any]]]:
+        """
+        Drop the chunks of a file that nearly repeat a chunk kept earlier in the run.
+
+        Args:
+            deduplicators: Deduplicators holding the chunks kept so far, by shard
+            split_docs: Chunks of the file
+            chunk_ids: IDs of the chunks
+            existing_ids: IDs already stored, whose drop saves no embedding
+
+        Returns:
+            Tuple of the kept chunks, their IDs, and the dropped chunk IDs mapped
+            to the kept chunk's ID, source and page
+        """
+        kept_docs, kept_ids = [], []
+        duplicates: Dict[str, Dict[str, Any]] = {}
+
+        with span('deduplicator.check', chunks=len(split_docs)) as dedup_span:
+            for doc, chunk_id in zip(split_docs, chunk_ids):
+                match = self._deduplicator_for(deduplicators, doc).check(chunk_id, doc)
+                if match is None:
+                    kept_docs.append(doc)
+                    kept_ids.append(chunk_id)
+                    continue
+
+                kept_id, kept_metadata = match
+                duplicates[chunk_id] = {
+                    'page': doc.metadata.get('page'),
+                    'kept_id': kept_id,
+                    'source': kept_metadata.get('source'),
+                    'kept_page': kept_metadata.get('page')
+                }
+                if chunk_id not in existing_ids:
+                    self.stats['embeddings_saved'] += 1
+            dedup_span.set(duplicates=len(duplicates))
+
+        self.stats['duplicates'] += len(duplicates)
+        return kept_docs, kept_ids, duplicates
+
+    def _deduplicator_for(self, deduplicators: Dict[str, ChunkDeduplicator], doc: Document) -> ChunkDeduplicator:
+        """Get the deduplicator of the shard a chunk is routed to; unsharded stores use one."""
+        key = self.vectorstore.shard_for(doc.metadata) if isinstance(self.vectorstore, ShardedVectorStore) else ''
+        deduplicator = deduplicators.get(key)
+        if deduplicator is None:
+            deduplicator = deduplicators[key] = ChunkDeduplicator(self.dedup_config)
+        return deduplicator
+
+    def _embed_stage(self, batches: Iterable[ChunkBatch]) -> Iterator[ChunkBatch]:
+        """Embed the text of each batch."""
+        for batch in batches:
+            if batch.documents:
+                with span('embedding.embed_documents', texts=len(batch)):
+                    batch.embeddings = self.embedding.embed_documents(
+                        [doc.page_content for doc in batch.documents]
+                    )
+                self.stats['embedded'] += len(batch)
+            yield batch
+
+    def _upsert_stage(self, batch: ChunkBatch, manifest: IndexManifest) -> None:
+        """Write a batch to the vector store, record completed files and checkpoint when due."""
+        if batch.documents:
+            self.vectorstore_factory.add_embeddings(
+                self.vectorstore, batch.documents, batch.embeddings, batch.ids
+            )
+            if self.keyword_index is not None:
+                self.keyword_index.add(batch.ids, [doc.page_content for doc in batch.documents])
+            for file_path, group in groupby(zip(batch.files, batch.ids), key=lambda item: item[0]):
+                manifest.add_pending(file_path, [chunk_id for _, chunk_id in group])
+            self._stored += len(batch)
+
+        for file_path, chunk_ids, stale_ids, duplicates in batch.completed_files:
+            if stale_ids:
+                self.vectorstore.delete(ids=stale_ids)
+                if self.keyword_index is not None:
+                    self.keyword_index.delete(stale_ids)
+                self.stats['deleted'] += len(stale_ids)
+            manifest.record(file_path, chunk_ids, duplicates)
+            self._completed_files += 1
+
+        now = time.perf_counter()
+        if now - self._last_checkpoint >= self.checkpoint_interval:
+            self._checkpoint(manifest)
+            self._last_checkpoint = now
+        if self.progress_interval and now - self._last_progress >= self.progress_interval:
+            self._report_progress(now)
+            self._last_progress = now
+
+    def _checkpoint(self, manifest: IndexManifest) -> None:
+        """Make everything written so far durable; the manifest is saved last as the commit point."""
+        with span('ingestion.checkpoint'):
+            self.vectorstore_factory.persist(self.vectorstore)
+            if self.keyword_index is not None:
+                self.keyword_index.save()
+            manifest.save()
+        self.stats['checkpoints'] += 1
+
+    def _report_progress(self, now: float) -> None:
+        """Print chunks written, throughput and the estimated time remaining."""
+        elapsed = now - self._start
+        rate = self._stored / elapsed if elapsed else 0.0
+        message = (f"Indexed {self._stored} chunk(s), {self._completed_files}/{self._total_files} file(s) "
+                   f"complete, {rate:.1f} chunks/s")
+
+        if self._split_bytes and rate:
+            # Chunks still to write, extrapolated from the files split so far
+            to_write = self.stats['chunks'] - self.stats['skipped'] - self.stats['duplicates']
+            expected = to_write * self._total_bytes / self._split_bytes
+            message += f", ETA {_format_duration(max(0.0, expected - self._stored) / rate)}"
+        print(message)
+
+    def _threaded(self, iterable: Iterable[Any]) -> Iterator[Any]:
+        """
+        Run an iterable in a background thread behind a bounded queue.
+
+        Exceptions raised by the producer are re-raised in the consumer.
+        The thread runs in a copy of the caller's context, so its spans nest
+        under the caller's current span.
+
+        Args:
+            iterable: Producer stage
+
+        Returns:
+            Iterator over the produced items
+        """
+        items: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        def put(item: Any) -> bool:
+            while not self._stop.is_set():
+                try:
+                    items.put(item, timeout=QUEUE_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce() -> None:
+            try:
+                for item in iterable:
+                    if not put((item, None)):
+                        return
+                put((_END, None))
+            except BaseException as e:
+                put((_END, e))
+
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(produce,), daemon=True).start()
+
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is _END:
+                return
+            yield item
+
+
+def _format_duration(seconds: float) -> str:
+    """Format seconds as a short duration such as "1h 05m", "2m 10s" or "45s"."""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
@@ -0,0 +1,106 @@
+"""Process-wide registry of warm RAG pipelines."""
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from .rag_pipeline import RAGPipeline
+
+DEFAULT_CONFIG_PATH = "config/config.yaml"
+
+
+@dataclass
+class _RegistryEntry:
+    """A warm pipeline and the configuration it was built from."""
+
+    pipeline: RAGPipeline
+    config_hash: str
+
+
+class PipelineRegistry:
+    """Shares one warm, ready-to-query pipeline per configuration across threads and sessions."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _RegistryEntry] = {}
+
+    def get(self, config_path: str = DEFAULT_CONFIG_PATH) -> RAGPipeline:
+        """
+        Get the shared pipeline for a configuration file.
+
+        The pipeline is built and its vector store opened on first use. It
+        is rebuilt when the configuration file content changes, and its
+        index is reopened when the index on disk changes; sessions querying
+        it meanwhile keep using the old index until the new one is swapped in.
+
+        Args:
+            config_path: Path to configuration file
+
+        Returns:
+            Warm RAGPipeline instance
+        """
+        key = str(Path(config_path).resolve())
+        config_hash = self._hash_config(config_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry.config_hash != config_hash:
+                entry = _RegistryEntry(RAGPipeline(config_path), config_hash)
+                self._entries[key] = entry
+            entry.pipeline.reload_if_stale()
+
+            return entry.pipeline
+
+    def warm(self, config_path: str = DEFAULT_CONFIG_PATH) -> None:
+        """
+        Build the pipeline for a configuration ahead of the first query.
+
+        Args:
+            config_path: Path to configuration file
+        """
+        self.get(config_path)
+
+    def invalidate(self, config_path: Optional[str] = None) -> None:
+        """
+        Drop a shared pipeline so the next get() rebuilds it.
+
+        Args:
+            config_path: Configuration to drop; all configurations if None
+        """
+        with self._lock:
+            if config_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(Path(config_path).resolve()), None)
+
+    @staticmethod
+    def _hash_config(config_path: str) -> str:
+        """Hash the configuration file content."""
+        path = Path(config_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Configuration file not found: {config_path}")
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+_registry = PipelineRegistry()
+
+
+def get_shared_pipeline(config_path: str = DEFAULT_CONFIG_PATH) -> RAGPipeline:
+    """
+    Get the process-wide pipeline for a configuration file.
+
+    Args:
+        config_path: Path to configuration file
+
+    Returns:
+        Warm RAGPipeline instance shared by all callers
+    """
+    return _registry.get(config_path)
+
+
+def get_registry() -> PipelineRegistry:
+    """Get the process-wide pipeline registry."""
+    return _registry
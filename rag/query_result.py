@@ -0,0 +1,48 @@
+"""Structured query result."""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+
+from utils.tracing import Span
+
+
+@dataclass
+class QueryResult:
+    """Result of a single RAG query."""
+
+    question: str
+    answer: str
+    source_documents: List[Document] = field(default_factory=list)
+    scores: List[Optional[float]] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    cache_hit: bool = False
+    trace: Optional[Span] = None
+
+    @property
+    def chunks(self) -> List[Tuple[Document, Optional[float]]]:
+        """Retrieved chunks paired with their relevance scores."""
+        return list(zip(self.source_documents, self.scores))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the result into a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary with question, answer, sources, timings and the trace
+        """
+        return {
+            "question": self.question,
+            "answer": self.answer,
+            "sources": [
+                {
+                    "source": doc.metadata.get('source', 'Unknown'),
+                    "page": doc.metadata.get('page', 'N/A'),
+                    "score": score,
+                    "content": doc.page_content
+                }
+                for doc, score in self.chunks
+            ],
+            "timings": dict(self.timings),
+            "cache_hit": self.cache_hit,
+            "trace": self.trace.to_dict() if self.trace is not None else None
+        }
@@ -1,12 +1,39 @@
 """RAG Pipeline implementation."""
-from typing import List, Dict, Any
+import asyncio
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage
+from langchain_core.prompt_values import PromptValue
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 
 from factories import LLMFactory, EmbeddingFactory, VectorStoreFactory
-from components import DocumentLoader, TextSplitter, Retriever
-from utils import ConfigLoader
+from factories.vectorstore_factory import DEFAULT_PERSISTENT_DIR, DEFAULT_COLLECTION_NAME
+from components import (
+    TextSplitter, Retriever, IndexManifest, CachedEmbeddings, ScheduledEmbeddings, SemanticCache, KeywordIndex,
+    ContextPacker, SnapshotStore, ShardedVectorStore
+)
+from components.index_snapshots import DEFAULT_KEEP as DEFAULT_SNAPSHOT_KEEP
+from components.semantic_cache import (
+    DEFAULT_SIMILARITY_THRESHOLD, DEFAULT_TTL_SECONDS, DEFAULT_MAX_ENTRIES as DEFAULT_CACHE_ENTRIES
+)
+from utils import ConfigLoader, count_tokens
+from utils.tracing import Span, get_tracer, span
+from .ingestion_pipeline import IngestionPipeline
+from .query_result import QueryResult
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+PROMPT_TEMPLATE = """Answer the question based only on the following context:
+
+{context}
+
+Question: {question}
+
+Answer:"""
 
 
 class RAGPipeline:
@@ -34,119 +61,856 @@ class RAGPipeline:
         # Text splitter
         self.text_splitter = TextSplitter(self.config_loader.get_document_processing_config())
 
+        # Packs retrieved chunks into the prompt context
+        self.context_packer = ContextPacker(self.config_loader.get_retrieval_config().get('context', {}))
+
         # Vector store and retriever (initialized when needed)
         self.vectorstore = None
         self.retriever = None
 
-        # RAG chain
-        self.rag_chain = None
-
-    def index_documents(self, file_path: str) -> None:
+        # Versioned index snapshots; the loaded one is swapped when another is published
+        snapshot_config = self.config_loader.get_vectorstore_config().get('snapshots', {})
+        self.snapshots = SnapshotStore(
+            str(self._root_directory()),
+            snapshot_config.get('keep', DEFAULT_SNAPSHOT_KEEP)
+        ) if snapshot_config.get('enabled', False) else None
+        self._index_directory: Optional[Path] = None
+        # Manifest version of the loaded index, to detect an in-place rebuild
+        self._loaded_version: Optional[str] = None
+        self._pointer_token: Optional[Tuple[int, int]] = None
+        self._swap_lock = threading.Lock()
+        self._swapping = False
+
+        # Prompt template; the retriever is created for the loaded vector store on first query
+        self.prompt = ChatPromptTemplate.from_template(PROMPT_TEMPLATE)
+        self._initialized = False
+
+        # Semantic answer cache
+        self.semantic_cache = self._create_semantic_cache(self.config_loader.get_semantic_cache_config())
+
+    def _create_semantic_cache(self, config: Dict[str, Any]) -> Optional[SemanticCache]:
         """
-        Index documents from a PDF file or directory.
+        Create the semantic answer cache if enabled in configuration.
 
         Args:
-            file_path: Path to PDF file or directory containing PDFs
+            config: Semantic cache configuration
+
+        Returns:
+            SemanticCache instance, or None if disabled
         """
-        print(f"Loading documents from: {file_path}")
+        if not config.get('enabled', False):
+            return None
+
+        return SemanticCache(
+            similarity_threshold=config.get('similarity_threshold', DEFAULT_SIMILARITY_THRESHOLD),
+            ttl_seconds=config.get('ttl_seconds', DEFAULT_TTL_SECONDS),
+            max_entries=config.get('max_entries', DEFAULT_CACHE_ENTRIES)
+        )
 
-        # Load documents
-        from pathlib import Path
-        path = Path(file_path)
+    def index_documents(
+            self,
+            file_path: Optional[str] = None,
+            incremental: bool = False,
+            resume: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Index documents from a PDF file or directory.
 
-        if path.is_file():
-            documents = DocumentLoader.load_pdf(file_path)
-        elif path.is_dir():
-            print(f"Loading PDF from directory: {file_path}")
-            documents = DocumentLoader.load_directory(file_path)
-        else:
-            raise ValueError(f"Invalid path: {file_path}")
+        Documents stream through load, split, embed and upsert stages in
+        fixed-size batches, so memory stays flat regardless of corpus size.
+        Chunks get deterministic IDs, so re-indexing the same content replaces
+        existing entries instead of duplicating them. In incremental mode only
+        files that changed since the last run are processed, and chunks of
+        files removed from an indexed directory are deleted. Files whose
+        near-duplicate chunks were dropped in favour of a changed or removed
+        file's chunk are processed again, so their text stays indexed.
+
+        Progress is checkpointed to the manifest while the run goes on. With
+        resume, an interrupted run continues in its own mode: files it
+        finished are not processed again, and chunks it stored for unfinished
+        files are skipped. An interrupted full run processes every other file,
+        even if the manifest still lists it from an earlier run.
+
+        With snapshots enabled, the build writes to a copy of the serving
+        snapshot and is published when it finishes, so queries never see a
+        partly built index.
 
-        #print(f"Loaded {len(documents)} document(s)")
+        Args:
+            file_path: Path to PDF file or directory containing PDFs; with
+                resume, defaults to the path of the interrupted run
+            incremental: Only index changes recorded against the index manifest
+            resume: Continue an interrupted run
+
+        Returns:
+            Ingestion statistics: files, pages, chunks, embedded, skipped,
+            deleted, duplicates and embeddings_saved counts and the elapsed seconds
 
-        # Split documents
-        print("Splitting documents into chunks...")
-        split_docs = self.text_splitter.split_documents(documents)
-        print(f"Created {len(split_docs)} chunks")
+        Raises:
+            ValueError: If the path is neither a file nor a directory, or no
+                path is given and there is no interrupted run to resume
+        """
+        if self.snapshots is None:
+            manifest = self._load_manifest(self._root_directory())
+        else:
+            building = self.snapshots.building()
+            manifest = self._load_manifest(self.snapshots.path(building) if building else None)
+        if resume:
+            if manifest.checkpoint is not None:
+                file_path = file_path or manifest.checkpoint['path']
+                incremental = manifest.checkpoint['incremental']
+                print(f"Resuming interrupted {'incremental' if incremental else 'full'} indexing run of {file_path}")
+            else:
+                if file_path is not None:
+                    print("No interrupted indexing run found; indexing changes incrementally")
+                incremental = True
+        if file_path is None:
+            raise ValueError("No path given and no interrupted indexing run to resume")
+
+        with span('index', path=str(file_path), incremental=incremental, resume=resume) as index_span:
+            print(f"Loading documents from: {file_path}")
+
+            path = Path(file_path)
+
+            if path.is_file():
+                files = [path]
+                removed = []
+            elif path.is_dir():
+                print(f"Loading PDF from directory: {file_path}")
+                files = sorted(path.glob('*.pdf'))
+                removed = manifest.missing_files(file_path) if incremental else []
+            else:
+                raise ValueError(f"Invalid path: {file_path}")
+
+            version = None
+            build_directory = self._root_directory()
+            if self.snapshots is not None:
+                version, build_directory = self.snapshots.begin(resume=resume)
+                print(f"Building index snapshot {version}")
+                manifest = self._load_manifest(build_directory)
+                if incremental and path.is_dir():
+                    removed = manifest.missing_files(file_path)
+
+            # Saved right away so a crash before the first checkpoint can still be resumed
+            manifest.begin_run(file_path, incremental, resume)
+            manifest.save()
+
+            if incremental:
+                changed = [f for f in files if not manifest.is_unchanged(str(f))]
+                print(f"{len(changed)} changed, {len(files) - len(changed)} unchanged, {len(removed)} removed file(s)")
+
+                replaced_ids = [chunk_id for f in changed for chunk_id in manifest.chunk_ids_for(str(f))]
+                replaced_ids += [chunk_id for key in removed for chunk_id in manifest.chunk_ids_for(key)]
+                dependents = set(manifest.files_duplicating(replaced_ids))
+                dependent_files = [
+                    f for f in files if f not in changed and manifest.file_key(str(f)) in dependents
+                ]
+                if dependent_files:
+                    print(f"{len(dependent_files)} unchanged file(s) share near-duplicate chunks with them")
+                files = changed + dependent_files
+            elif resume:
+                remaining = [f for f in files if not manifest.is_done(str(f))]
+                print(f"{len(remaining)} file(s) left, {len(files) - len(remaining)} finished before the interruption")
+                files = remaining
+
+            # Queries keep using the serving store until the build is done
+            vectorstore = self.vectorstore_factory.create(
+                self._vectorstore_config(build_directory),
+                self.embedding
+            )
+            keyword_index = self._keyword_index(build_directory)
+            if incremental and manifest.files and not keyword_index.exists():
+                print("Warning: The existing index has no keyword index; run a full index to build it for hybrid search.")
+
+            deleted_count = 0
+            for file_key in removed:
+                stale_ids = manifest.remove(file_key)
+                if stale_ids:
+                    vectorstore.delete(ids=stale_ids)
+                    keyword_index.delete(stale_ids)
+                deleted_count += len(stale_ids)
+
+            # Split, embed and index documents
+            print("Splitting, embedding and indexing documents...")
+            ingestion = IngestionPipeline(
+                self.text_splitter,
+                self.embedding,
+                vectorstore,
+                self.vectorstore_factory,
+                self.config_loader.get_document_processing_config(),
+                keyword_index
+            )
+            stats = ingestion.run([str(f) for f in files], manifest, skip_existing=incremental, skip_pending=resume)
+            self.vectorstore_factory.persist(vectorstore)
+            keyword_index.save()
+            manifest.finish_run()
+            manifest.save()
+
+            if self.snapshots is not None:
+                self.snapshots.publish(version)
+                print(f"Published index snapshot {version}")
+            self._use_vectorstore(vectorstore, build_directory)
+
+            stats = {**stats, 'deleted': stats['deleted'] + deleted_count}
+            index_span.set(**{
+                key: stats[key]
+                for key in ('files', 'pages', 'chunks', 'embedded', 'skipped', 'deleted', 'duplicates', 'checkpoints')
+            })
+
+        print(f"Processed {stats['files']} file(s), {stats['pages']} page(s), {stats['chunks']} chunks "
+              f"in {stats['seconds']:.1f}s")
+        print(f"Upserted {stats['embedded']} chunk(s), deleted {stats['deleted']} chunk(s)")
+        if stats['duplicates']:
+            print(f"Dropped {stats['duplicates']} near-duplicate chunk(s), "
+                  f"saving {stats['embeddings_saved']} embedding(s)")
+        self._print_embedding_stats()
+        print("Indexing complete!")
 
-        # Create vector store
-        print("Creating vector store and indexing documents...")
-        self.vectorstore = self.vectorstore_factory.create(
-            self.config_loader.get_vectorstore_config(),
-            self.embedding,
-            split_docs
+        return stats
+
+    def _root_directory(self) -> Path:
+        """Get the configured persist directory."""
+        return Path(self.config_loader.get_vectorstore_config().get('persist_directory', DEFAULT_PERSISTENT_DIR))
+
+    def _serving_directory(self) -> Path:
+        """Get the directory of the index queries should read."""
+        if self.snapshots is not None:
+            return self.snapshots.serving_directory()
+        return self._root_directory()
+
+    def _vectorstore_config(self, directory: Path) -> Dict[str, Any]:
+        """Get the vector store configuration with its files in a given directory."""
+        return {**self.config_loader.get_vectorstore_config(), 'persist_directory': str(directory)}
+
+    def _load_manifest(self, directory: Optional[Path]) -> IndexManifest:
+        """Load the manifest stored next to a vector store; None gives an empty manifest."""
+        if directory is None:
+            return IndexManifest(str(self._root_directory()))
+        return IndexManifest(str(directory)).load()
+
+    def _keyword_index(self, directory: Path) -> KeywordIndex:
+        """Get the BM25 keyword index stored next to a vector store; it is read on first use."""
+        vectorstore_config = self.config_loader.get_vectorstore_config()
+        hybrid_config = self.config_loader.get_retrieval_config().get('hybrid', {})
+        collection_name = vectorstore_config.get('collection_name', DEFAULT_COLLECTION_NAME)
+        return KeywordIndex(
+            directory / f"{collection_name}.bm25.json",
+            **{key: hybrid_config[key] for key in ('k1', 'b') if key in hybrid_config}
         )
 
-        print("Indexing complete!")
+    def _print_embedding_stats(self) -> None:
+        """Print cache and scheduler statistics of the embedding wrappers in use."""
+        embedding = self.embedding
+        while embedding is not None:
+            if isinstance(embedding, CachedEmbeddings):
+                stats = embedding.stats()
+                print(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses")
+            elif isinstance(embedding, ScheduledEmbeddings):
+                stats = embedding.stats()
+                print(f"Embedding scheduler: {stats['requests']} requests, {stats['retries']} retries, "
+                      f"{stats['texts_per_second']:.1f} texts/s, {stats['tokens_per_second']:.0f} tokens/s")
+            embedding = getattr(embedding, 'embedding', None)
 
     def load_vectorstore(self) -> None:
         """Load existing vector store from disk."""
         print("Loading existing vector store...")
-        self.vectorstore = self.vectorstore_factory.create(
-            self.config_loader.get_vectorstore_config(),
-            self.embedding
+        # Read the pointer first, so a snapshot published meanwhile is picked up on the next query
+        token = self.snapshots.pointer_token() if self.snapshots is not None else None
+        directory = self._serving_directory()
+        self._use_vectorstore(
+            self.vectorstore_factory.create(self._vectorstore_config(directory), self.embedding),
+            directory,
+            token
         )
         print("Vector store loaded!")
 
-    def _initialize_rag_chain(self) -> None:
-        """Initialize the RAG chain with retriever and LLM."""
+    def _use_vectorstore(self, vectorstore: Any, directory: Path, token: Optional[Tuple[int, int]] = None) -> None:
+        """Serve queries from a vector store whose files are in a directory."""
+        if token is None and self.snapshots is not None:
+            token = self.snapshots.pointer_token()
+        self.vectorstore = vectorstore
+        self._index_directory = directory
+        self._loaded_version = IndexManifest.version_token(str(directory))
+        self._pointer_token = token
+        self._initialized = False
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+
+    def reload_if_stale(self) -> bool:
+        """
+        Reopen the index if it changed on disk since it was loaded.
+
+        The index is stale when another process rebuilt it in place or
+        published a new snapshot. The new vector store and retriever are
+        built while queries keep using the loaded ones, then swapped in
+        together under the pipeline's lock, so a query in flight finishes
+        on the index it started with. A pipeline with no index loaded yet
+        loads it.
+
+        Returns:
+            True if the index was (re)loaded
+        """
+        token = self.snapshots.pointer_token() if self.snapshots is not None else None
+        directory = self._serving_directory()
+        version = IndexManifest.version_token(str(directory))
+        if self.vectorstore is not None and directory == self._index_directory and version == self._loaded_version:
+            return False
+
+        print("Loading vector store...")
+        vectorstore = self.vectorstore_factory.create(self._vectorstore_config(directory), self.embedding)
+        retriever = self._create_retriever(vectorstore, directory)
+        with self._swap_lock:
+            self.vectorstore = vectorstore
+            self.retriever = retriever
+            self._index_directory = directory
+            self._loaded_version = version
+            self._pointer_token = token
+            self._initialized = True
+        print("Vector store loaded!")
+        return True
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """
+        List the index snapshots on disk.
+
+        Returns:
+            One dictionary per snapshot, oldest first, with its "version",
+            whether it is "current" or still "building", and its "files" count
+
+        Raises:
+            ValueError: If snapshots are not enabled
+        """
+        if self.snapshots is None:
+            raise ValueError("Index snapshots are not enabled (vectorstore.snapshots.enabled)")
+
+        current = self.snapshots.current()
+        building = self.snapshots.building()
+        return [
+            {
+                'version': version,
+                'current': version == current,
+                'building': version == building,
+                'files': len(self._load_manifest(self.snapshots.path(version)).files)
+            }
+            for version in self.snapshots.versions()
+        ]
+
+    def rollback(self, version: Optional[str] = None) -> str:
+        """
+        Serve an earlier index snapshot.
+
+        Running pipelines switch to it on their next query.
+
+        Args:
+            version: Snapshot to serve; defaults to the one before the serving snapshot
+
+        Returns:
+            Name of the snapshot now serving
+
+        Raises:
+            ValueError: If snapshots are not enabled or the snapshot does not exist
+        """
+        if self.snapshots is None:
+            raise ValueError("Index snapshots are not enabled (vectorstore.snapshots.enabled)")
+        return self.snapshots.rollback(version)
+
+    def _refresh_index(self) -> None:
+        """
+        Switch to a newly published snapshot without blocking queries.
+
+        Only the pointer file is checked here. When it changed, the new
+        snapshot is opened in a background thread and swapped in once it is
+        ready; until then queries keep using the loaded one.
+        """
+        if self.snapshots is None or self.vectorstore is None:
+            return
+        token = self.snapshots.pointer_token()
+        if token == self._pointer_token:
+            return
+
+        with self._swap_lock:
+            if token == self._pointer_token or self._swapping:
+                return
+            self._swapping = True
+        threading.Thread(target=self._swap_snapshot, args=(token,), daemon=True).start()
+
+    def _swap_snapshot(self, token: Optional[Tuple[int, int]]) -> None:
+        """Open the serving snapshot and swap it in for the loaded one."""
+        try:
+            directory = self._serving_directory()
+            if directory != self._index_directory:
+                vectorstore = self.vectorstore_factory.create(self._vectorstore_config(directory), self.embedding)
+                retriever = self._create_retriever(vectorstore, directory)
+                # A query holds its own references for its duration
+                with self._swap_lock:
+                    self.vectorstore = vectorstore
+                    self._index_directory = directory
+                    self._loaded_version = IndexManifest.version_token(str(directory))
+                    if self._initialized:
+                        self.retriever = retriever
+                print(f"Switched to index snapshot {directory.name}")
+        except Exception as e:
+            print(f"Warning: Could not switch index snapshot: {e}")
+        finally:
+            # Also set on failure, so a broken snapshot is not reopened by every query
+            self._pointer_token = token
+            self._swapping = False
+
+    def list_shards(self) -> List[Dict[str, Any]]:
+        """
+        List the shards of the served index.
+
+        Returns:
+            One dictionary per shard with its "shard" name, "chunks" count and,
+            once it has been searched, its recent "latency" statistics
+
+        Raises:
+            ValueError: If the vector store is not sharded
+        """
+        if self.vectorstore is None:
+            self.load_vectorstore()
+        if not isinstance(self.vectorstore, ShardedVectorStore):
+            raise ValueError("Vector store sharding is not enabled (vectorstore.sharding.enabled)")
+
+        latencies = self.vectorstore.latency_stats()
+        return [
+            {'shard': name, 'chunks': chunks, 'latency': latencies.get(name)}
+            for name, chunks in self.vectorstore.shard_sizes().items()
+        ]
+
+    def _create_retriever(self, vectorstore: Any, directory: Path) -> Retriever:
+        """Create the retriever for a vector store and the keyword index next to it."""
+        retrieval_config = self.config_loader.get_retrieval_config()
+        keyword_index = None
+        if retrieval_config.get('search_type') == 'hybrid':
+            keyword_index = self._keyword_index(directory)
+            if not keyword_index.exists():
+                print("Warning: No keyword index found; hybrid search uses vector results only. "
+                      "Re-index the documents to build it.")
+                keyword_index = None
+
+        return Retriever(vectorstore, retrieval_config, keyword_index)
+
+    def _initialize(self) -> None:
+        """Create the retriever for the loaded vector store."""
         if self.vectorstore is None:
             raise ValueError("Vector store not initialized. Call index_documents() or load_vectorstore() first.")
 
-        # Create retriever
-        self.retriever = Retriever(
-            self.vectorstore,
-            self.config_loader.get_retrieval_config()
-        )
+        self.retriever = self._create_retriever(self.vectorstore, self._index_directory)
+        self._initialized = True
 
-        # Create RAG prompt template
-        template = """Answer the question based only on the following context:
+    def query(self, question: str, shards: Optional[List[str]] = None) -> QueryResult:
+        """
+        Query the RAG system.
 
-{context}
+        The question is embedded and searched once; the same retrieved
+        chunks feed the prompt and are returned as sources. With the semantic
+        cache enabled, the answer to a near-identical earlier question is
+        returned without retrieval or generation.
 
-Question: {question}
+        Args:
+            question: Question to ask
+            shards: Shards to search when the vector store is sharded; all shards if None
 
-Answer:"""
+        Returns:
+            QueryResult containing the answer, source documents, scores,
+            timings and the trace of the query's stages
+        """
+        start = time.perf_counter()
+        timings = {}
+
+        with span('query') as query_span:
+            cached, scored_docs, query_embedding, index_version = self._retrieve_for_query(question, timings, shards)
+            if cached is not None:
+                return self._cached_result(cached, question, timings, start, query_span)
+
+            # Generate answer
+            generation_start = time.perf_counter()
+            prompt_value = self._build_prompt(question, scored_docs)
+            with span('query.llm') as llm_span:
+                message = self.llm.invoke(prompt_value)
+                answer = self._message_text(message)
+                self._record_token_usage(llm_span, prompt_value, answer, message.usage_metadata)
+            generated = time.perf_counter()
+
+            timings["generation"] = generated - generation_start
+            timings["total"] = generated - start
+            return self._new_result(question, answer, scored_docs, timings, query_span, query_embedding,
+                                    index_version, shards)
+
+    def stream_query(self, question: str, shards: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Query the RAG system, yielding the answer as it is generated.
+
+        Events are dictionaries with a "type" key:
+            - "sources": retrieved "documents" and their "scores", sent first
+            - "token": a piece of the answer in "text"
+            - "done": the complete QueryResult in "result"; its timings
+              include "time_to_first_token"
+
+        Args:
+            question: Question to ask
+            shards: Shards to search when the vector store is sharded; all shards if None
+
+        Returns:
+            Iterator of events
+        """
+        start = time.perf_counter()
+        timings = {}
+
+        # The query span stays open across yields, so it is only made current
+        # around the stages that run here and not while the caller holds control
+        tracer = get_tracer()
+        query_span = tracer.start_span('query', stream=True)
+        try:
+            with tracer.activate(query_span):
+                cached, scored_docs, query_embedding, index_version = self._retrieve_for_query(
+                    question, timings, shards
+                )
+            if cached is not None:
+                yield {"type": "sources", "documents": cached.source_documents, "scores": cached.scores}
+                yield {"type": "token", "text": cached.answer}
+                timings["time_to_first_token"] = time.perf_counter() - start
+                tracer.end_span(query_span)
+                yield {"type": "done", "result": self._cached_result(cached, question, timings, start, query_span)}
+                return
+
+            relevant_docs = [doc for doc, _ in scored_docs]
+            scores = [score for _, score in scored_docs]
+            yield {"type": "sources", "documents": relevant_docs, "scores": scores}
+
+            # Generate answer token by token
+            generation_start = time.perf_counter()
+            with tracer.activate(query_span):
+                prompt_value = self._build_prompt(question, scored_docs)
+            llm_span = query_span.child('query.llm')
+            parts = []
+            usage = None
+            for chunk in self.llm.stream(prompt_value):
+                if chunk.usage_metadata:
+                    usage = chunk.usage_metadata
+                token = self._message_text(chunk)
+                if not token:
+                    continue
+                if not parts:
+                    timings["time_to_first_token"] = time.perf_counter() - start
+                    llm_span.set(time_to_first_token=time.perf_counter() - llm_span.start)
+                parts.append(token)
+                yield {"type": "token", "text": token}
+            answer = "".join(parts)
+            llm_span.finish()
+            self._record_token_usage(llm_span, prompt_value, answer, usage)
+            generated = time.perf_counter()
+
+            timings.setdefault("time_to_first_token", generated - start)
+            timings["generation"] = generated - generation_start
+            timings["total"] = generated - start
+            result = self._new_result(question, answer, scored_docs, timings, query_span, query_embedding,
+                                      index_version, shards)
+            tracer.end_span(query_span)
+
+            yield {"type": "done", "result": result}
+        except GeneratorExit:
+            query_span.set(cancelled=True)
+            raise
+        except BaseException as e:
+            query_span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            tracer.end_span(query_span)
+
+    async def aquery(self, question: str, shards: Optional[List[str]] = None) -> QueryResult:
+        """
+        Asynchronously query the RAG system.
+
+        Uses the async embedding, vector search and LLM calls, so many
+        questions can wait on the network at once. The result has the same
+        shape as query().
+
+        Args:
+            question: Question to ask
+            shards: Shards to search when the vector store is sharded; all shards if None
 
-        prompt = ChatPromptTemplate.from_template(template)
-        # print(prompt)
-
-        # Create RAG chain
-        def format_docs(docs: List[Document]) -> str:
-            #print(f"Context: {docs}")
-            return "\n\n".join(doc.page_content for doc in docs)
-
-        self.rag_chain = (
-                {
-                    "context": lambda x: format_docs(self.retriever.retrieve(x["question"])),
-                    "question": lambda x: x["question"]
-                }
-                | prompt
-                | self.llm
-                | StrOutputParser()
+        Returns:
+            QueryResult containing the answer, source documents, scores,
+            timings and the trace of the query's stages
+        """
+        start = time.perf_counter()
+        timings = {}
+
+        with span('query') as query_span:
+            cached, scored_docs, query_embedding, index_version = await self._aretrieve_for_query(
+                question, timings, shards
+            )
+            if cached is not None:
+                return self._cached_result(cached, question, timings, start, query_span)
+
+            # Generate answer
+            generation_start = time.perf_counter()
+            prompt_value = self._build_prompt(question, scored_docs)
+            with span('query.llm') as llm_span:
+                message = await self.llm.ainvoke(prompt_value)
+                answer = self._message_text(message)
+                self._record_token_usage(llm_span, prompt_value, answer, message.usage_metadata)
+            generated = time.perf_counter()
+
+            timings["generation"] = generated - generation_start
+            timings["total"] = generated - start
+            return self._new_result(question, answer, scored_docs, timings, query_span, query_embedding,
+                                    index_version, shards)
+
+    async def abatch(
+            self,
+            questions: List[str],
+            max_concurrency: Optional[int] = None,
+            return_exceptions: bool = False,
+            shards: Optional[List[str]] = None
+    ) -> List[Any]:
+        """
+        Answer several questions concurrently.
+
+        Args:
+            questions: Questions to ask
+            max_concurrency: Maximum questions in flight; defaults to query.max_concurrency
+            return_exceptions: Return exceptions in place of failed results instead of raising
+            shards: Shards to search when the vector store is sharded; all shards if None
+
+        Returns:
+            List of QueryResult objects (or exceptions) in question order
+        """
+        if max_concurrency is None:
+            max_concurrency = self.config_loader.get_query_config().get('max_concurrency', DEFAULT_MAX_CONCURRENCY)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded_query(question: str) -> QueryResult:
+            async with semaphore:
+                return await self.aquery(question, shards)
+
+        return await asyncio.gather(
+            *(bounded_query(question) for question in questions),
+            return_exceptions=return_exceptions
         )
 
-    def query(self, question: str) -> Dict[str, Any]:
+    def _retrieve_for_query(
+            self,
+            question: str,
+            timings: Dict[str, float],
+            shards: Optional[List[str]] = None
+    ) -> Tuple[Optional[QueryResult], List[Tuple[Document, Optional[float]]], Optional[List[float]], Optional[str]]:
         """
-        Query the RAG system.
+        Run the semantic cache lookup and retrieval steps of a query.
+
+        Args:
+            question: Question to ask
+            timings: Dictionary receiving "cache_lookup" and "retrieval" durations,
+                and the search duration of each shard as "shard.<name>"
+            shards: Shards to search; all shards if None
+
+        Returns:
+            Tuple of (cached result or None, scored documents, query embedding, index version)
+
+        Raises:
+            ValueError: If shards are given but the vector store is not sharded
+        """
+        self._prepare_query(shards)
+
+        query_embedding = None
+        index_version = None
+        if self.semantic_cache is not None:
+            lookup_start = time.perf_counter()
+            with span('query.cache_lookup') as lookup_span:
+                with span('query.embed_query'):
+                    query_embedding = self.embedding.embed_query(question)
+                cached, index_version = self._lookup_cache(query_embedding, shards, lookup_span)
+            timings["cache_lookup"] = time.perf_counter() - lookup_start
+
+            if cached is not None:
+                return cached, [], query_embedding, index_version
+
+        # Retrieve relevant documents
+        retrieval_start = time.perf_counter()
+        with span('query.retrieval', search_type=self.retriever.search_type) as retrieval_span:
+            scored_docs = self.retriever.retrieve_with_scores(question, embedding=query_embedding, shards=shards)
+            retrieval_span.set(documents=len(scored_docs))
+        timings["retrieval"] = time.perf_counter() - retrieval_start
+        self._add_shard_timings(retrieval_span, timings)
+
+        return None, scored_docs, query_embedding, index_version
+
+    async def _aretrieve_for_query(
+            self,
+            question: str,
+            timings: Dict[str, float],
+            shards: Optional[List[str]] = None
+    ) -> Tuple[Optional[QueryResult], List[Tuple[Document, Optional[float]]], Optional[List[float]], Optional[str]]:
+        """
+        Asynchronously run the semantic cache lookup and retrieval steps of a query.
 
         Args:
             question: Question to ask
+            timings: Dictionary receiving "cache_lookup" and "retrieval" durations,
+                and the search duration of each shard as "shard.<name>"
+            shards: Shards to search; all shards if None
 
         Returns:
-            Dictionary containing answer and source documents
+            Tuple of (cached result or None, scored documents, query embedding, index version)
+
+        Raises:
+            ValueError: If shards are given but the vector store is not sharded
         """
-        if self.rag_chain is None:
-            self._initialize_rag_chain()
+        self._prepare_query(shards)
+
+        query_embedding = None
+        index_version = None
+        if self.semantic_cache is not None:
+            lookup_start = time.perf_counter()
+            with span('query.cache_lookup') as lookup_span:
+                with span('query.embed_query'):
+                    query_embedding = await self.embedding.aembed_query(question)
+                cached, index_version = self._lookup_cache(query_embedding, shards, lookup_span)
+            timings["cache_lookup"] = time.perf_counter() - lookup_start
+
+            if cached is not None:
+                return cached, [], query_embedding, index_version
 
         # Retrieve relevant documents
-        relevant_docs = self.retriever.retrieve(question)
+        retrieval_start = time.perf_counter()
+        with span('query.retrieval', search_type=self.retriever.search_type) as retrieval_span:
+            scored_docs = await self.retriever.aretrieve_with_scores(question, embedding=query_embedding, shards=shards)
+            retrieval_span.set(documents=len(scored_docs))
+        timings["retrieval"] = time.perf_counter() - retrieval_start
+        self._add_shard_timings(retrieval_span, timings)
 
-        # Generate answer
-        answer = self.rag_chain.invoke({"question": question})
+        return None, scored_docs, query_embedding, index_version
+
+    def _prepare_query(self, shards: Optional[List[str]]) -> None:
+        """
+        Swap in a newly published snapshot and create the retriever if needed.
+
+        Raises:
+            ValueError: If shards are given but the vector store is not sharded
+        """
+        self._refresh_index()
+        if not self._initialized:
+            self._initialize()
+        if shards is not None and not isinstance(self.retriever.vectorstore, ShardedVectorStore):
+            raise ValueError("Vector store sharding is not enabled (vectorstore.sharding.enabled)")
+
+    def _lookup_cache(
+            self,
+            query_embedding: List[float],
+            shards: Optional[List[str]],
+            lookup_span: Span
+    ) -> Tuple[Optional[QueryResult], Optional[str]]:
+        """
+        Look up a cached answer for a query embedding.
+
+        Returns:
+            Tuple of (cached result or None, index version the answer must come from)
+        """
+        index_version = self.index_version()
+        cached = self.semantic_cache.lookup(query_embedding, index_version, self._cache_scope(shards))
+        lookup_span.set(cache_hit=cached is not None)
+        return cached, index_version
+
+    @staticmethod
+    def _add_shard_timings(retrieval_span: Span, timings: Dict[str, float]) -> None:
+        """Add the search duration of each shard searched during retrieval to the timings."""
+        for _, child in retrieval_span.walk():
+            if child.name == 'vectorstore.shard_search':
+                timings[f"shard.{child.attributes['shard']}"] = child.duration
+
+    def _build_prompt(self, question: str, scored_docs: List[Tuple[Document, Optional[float]]]) -> PromptValue:
+        """
+        Pack the retrieved chunks into a context and format the LLM prompt.
+
+        The trace span records the context tokens before and after packing
+        and the tokens saved by merging overlapping chunks.
+        """
+        with span('query.prompt', documents=len(scored_docs)) as prompt_span:
+            context = self.context_packer.pack(scored_docs)
+            prompt_value = self.prompt.invoke({"question": question, "context": context.text})
+            prompt_span.set(**context.stats())
+        return prompt_value
+
+    @staticmethod
+    def _message_text(message: BaseMessage) -> str:
+        """Get the text of an LLM message or message chunk."""
+        if isinstance(message.content, str):
+            return message.content
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in message.content
+        )
+
+    @staticmethod
+    def _record_token_usage(
+            llm_span: Span,
+            prompt_value: PromptValue,
+            answer: str,
+            usage: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Record the token usage of an LLM call on its span.
+
+        Uses the usage reported by the model when available, otherwise counts
+        the prompt and answer tokens locally and marks them as estimated.
+        """
+        if usage:
+            llm_span.set(input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0))
+        else:
+            llm_span.set(
+                input_tokens=count_tokens(prompt_value.to_string()),
+                output_tokens=count_tokens(answer),
+                tokens_estimated=True
+            )
+
+    @staticmethod
+    def _cached_result(
+            cached: QueryResult,
+            question: str,
+            timings: Dict[str, float],
+            start: float,
+            query_span: Span
+    ) -> QueryResult:
+        """Turn a cached result into the result of the current query."""
+        timings["total"] = time.perf_counter() - start
+        return replace(cached, question=question, timings=timings, cache_hit=True, trace=query_span)
+
+    def _new_result(
+            self,
+            question: str,
+            answer: str,
+            scored_docs: List[Tuple[Document, Optional[float]]],
+            timings: Dict[str, float],
+            query_span: Span,
+            query_embedding: Optional[List[float]],
+            index_version: Optional[str],
+            shards: Optional[List[str]] = None
+    ) -> QueryResult:
+        """Build the result of a generated answer and store it in the semantic cache if enabled."""
+        result = QueryResult(
+            question=question,
+            answer=answer,
+            source_documents=[doc for doc, _ in scored_docs],
+            scores=[score for _, score in scored_docs],
+            timings=timings,
+            trace=query_span
+        )
+        if self.semantic_cache is not None:
+            self.semantic_cache.store(query_embedding, result, index_version, self._cache_scope(shards))
+        return result
+
+    def index_version(self) -> Optional[str]:
+        """
+        Get the version token of the index being served.
+
+        Returns:
+            Token that changes whenever the served index's manifest is saved,
+            or None if it has no manifest
+        """
+        return IndexManifest.version_token(str(self._index_directory or self._serving_directory()))
 
-        return {
-            "question": question,
-            "answer": answer,
-            "source_documents": relevant_docs
-        }
\ No newline at end of file
+    @staticmethod
+    def _cache_scope(shards: Optional[List[str]]) -> Optional[str]:
+        """Get the semantic cache scope of a query; answers from other shards must not be reused."""
+        return ','.join(sorted(set(shards))) if shards is not None else None
@@ -1,12 +1,16 @@
 import os, json, time
 import streamlit as st
-from rag.rag_pipeline import RAGPipeline
+from rag.pipeline_registry import get_shared_pipeline
 from dotenv import load_dotenv
 
 st.set_page_config(page_title="RAG App (Complete)", layout="wide", initial_sidebar_state="expanded")
 
 load_dotenv()
 
+# Warm the process-wide pipeline on the first script run so questions only pay for retrieval and generation
+with st.spinner("Loading vectorstore..."):
+    get_shared_pipeline()
+
 # Sidebar
 with st.sidebar:
     st.title("RAG Config")
@@ -28,18 +32,24 @@ with left:
     ask_btn = st.button("Ask")
 
     if ask_btn and query.strip():
-        pipeline = RAGPipeline()
+        pipeline = get_shared_pipeline()
         #save_query_history(query.strip())
-        with st.spinner("Loading vectorstore..."):
-            # Load existing vector store
-            pipeline.load_vectorstore()
 
-        result = pipeline.query(query)
         answer_area = st.empty()
         meta_area = st.empty()
         combined = ""
-        answer_area.markdown(result['answer'])
-
-        st.download_button("Download JSON", data=json.dumps(result['answer'], indent=2), file_name="chat_response.json", mime="application/json")
+        result = None
+        for event in pipeline.stream_query(query):
+            if event['type'] == 'token':
+                combined += event['text']
+                answer_area.markdown(combined + "▌")
+            elif event['type'] == 'done':
+                result = event['result']
+
+        answer_area.markdown(result.answer)
+        timings = result.timings
+        meta_area.markdown(f"**First token**: {timings['time_to_first_token']:.2f}s  **Total**: {timings['total']:.2f}s")
+
+        st.download_button("Download JSON", data=json.dumps(result.to_dict(), indent=2), file_name="chat_response.json", mime="application/json")
 
 
@@ -6,10 +6,10 @@ from dotenv import load_dotenv
 import tempfile
 from datetime import datetime
 
-from rag.rag_pipeline import RAGPipeline
+from rag.pipeline_registry import get_registry, get_shared_pipeline
 from ui_components import (
     metric_card, info_card, document_card, chat_message,
-    source_document_card, status_badge, feature_card
+    source_document_card, status_badge, feature_card, trace_breakdown
 )
 
 # Load environment variables
@@ -141,15 +141,15 @@ def initialize_session_state():
 
 
 def load_pipeline():
-    """Load or initialize the RAG pipeline."""
-    if st.session_state.pipeline is None:
-        try:
-            st.session_state.pipeline = RAGPipeline()
-            return True
-        except Exception as e:
-            st.error(f"Failed to initialize pipeline: {e}")
-            return False
-    return True
+    """Attach the shared, warm RAG pipeline to this session."""
+    config_path = st.session_state.get('config_path', 'config/config.yaml')
+    try:
+        st.session_state.pipeline = get_shared_pipeline(config_path)
+        st.session_state.vectorstore_loaded = st.session_state.pipeline.vectorstore is not None
+        return True
+    except Exception as e:
+        st.error(f"Failed to initialize pipeline: {e}")
+        return False
 
 
 def sidebar():
@@ -201,6 +201,7 @@ def sidebar():
             )
 
             if st.button("🔄 Reload Config", use_container_width=True):
+                get_registry().invalidate(config_file)
                 st.session_state.pipeline = None
                 st.session_state.vectorstore_loaded = False
                 if load_pipeline():
@@ -507,12 +508,21 @@ def query_tab():
     for message in st.session_state.chat_history:
         chat_message(message['role'], message['content'])
 
+        if message.get('timings'):
+            timings = message['timings']
+            st.caption(f"⚡ First token {timings['time_to_first_token']:.2f}s · Total {timings['total']:.2f}s")
+
+        if message.get('trace'):
+            with st.expander("⏱️ Timing Breakdown", expanded=False):
+                trace_breakdown(message['trace'])
+
         if message['role'] == 'assistant' and st.session_state.show_sources and 'sources' in message:
             with st.expander(f"📄 View {len(message['sources'])} Source Document(s)", expanded=False):
-                for idx, doc in enumerate(message['sources'], 1):
+                scores = message.get('scores') or [None] * len(message['sources'])
+                for doc, score in zip(message['sources'], scores):
                     source = doc.metadata.get('source', 'Unknown')
                     page = doc.metadata.get('page', 'N/A')
-                    source_document_card(source, page, doc.page_content)
+                    source_document_card(source, page, doc.page_content, score)
 
     # Input section
     st.markdown("---")
@@ -540,14 +550,28 @@ def query_tab():
             'content': query
         })
 
+        chat_message('user', query)
+        answer_placeholder = st.empty()
+
         with st.spinner("🤔 Analyzing documents..."):
             try:
-                result = st.session_state.pipeline.query(query)
+                result = None
+                answer = ""
+                for event in st.session_state.pipeline.stream_query(query):
+                    if event['type'] == 'token':
+                        answer += event['text']
+                        with answer_placeholder.container():
+                            chat_message('assistant', answer + "▌")
+                    elif event['type'] == 'done':
+                        result = event['result']
 
                 st.session_state.chat_history.append({
                     'role': 'assistant',
-                    'content': result['answer'],
-                    'sources': result['source_documents']
+                    'content': result.answer,
+                    'sources': result.source_documents,
+                    'scores': result.scores,
+                    'timings': result.timings,
+                    'trace': result.trace
                 })
 
                 st.session_state.total_queries += 1
@@ -583,6 +607,10 @@ def main():
     """Main application."""
     initialize_session_state()
 
+    # Every session shares one warm pipeline per config, built on first use
+    if os.getenv("OPENAI_API_KEY"):
+        load_pipeline()
+
     # Sidebar
     sidebar()
 
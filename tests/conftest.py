@@ -0,0 +1,70 @@
+"""Shared fixtures: offline configurations and synthetic PDFs."""
+from pathlib import Path
+from typing import Any, Dict
+import pytest
+import yaml
+
+from benchmarks.synthetic_pdfs import generate_corpus
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'config.yaml'
+
+
+def merge(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge configuration overrides into a copy of a base configuration, section by section."""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    """
+    Write offline configurations into the test directory.
+
+    The fake models replace the OpenAI clients, and every index and cache
+    file lives under tmp_path. Returns a function taking configuration
+    overrides and an optional file name, and returning the config path.
+    """
+    with open(CONFIG_PATH, 'r') as f:
+        base = yaml.safe_load(f)
+
+    base = merge(base, {
+        'llm': {'type': 'fake', 'latency': 0.0, 'tokens_per_second': 0},
+        'embedding': {
+            'type': 'fake',
+            'dimensions': 64,
+            'cache': {'enabled': False, 'path': str(tmp_path / 'embedding_cache.sqlite')}
+        },
+        'vectorstore': {'type': 'numpy', 'persist_directory': str(tmp_path / 'index')},
+        'document_processing': {'progress_interval': 0, 'checkpoint_interval': 0}
+    })
+
+    def write(overrides: Dict[str, Any] = None, name: str = 'config.yaml') -> str:
+        config_path = tmp_path / name
+        with open(config_path, 'w') as f:
+            yaml.safe_dump(merge(base, overrides or {}), f)
+        return str(config_path)
+
+    return write
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Directory holding three small synthetic policy PDFs."""
+    directory = tmp_path / 'docs'
+    generate_corpus(str(directory), documents=3, pages=2)
+    return directory
+
+
+@pytest.fixture
+def pipeline(write_config, corpus):
+    """Pipeline serving an index of the corpus built with the test configuration."""
+    from rag.rag_pipeline import RAGPipeline
+
+    pipeline = RAGPipeline(write_config())
+    pipeline.index_documents(str(corpus))
+    return pipeline
@@ -0,0 +1,97 @@
+"""Tests for async queries and concurrent batches."""
+import asyncio
+import pytest
+
+from rag.rag_pipeline import RAGPipeline
+
+
+def test_aquery_matches_query(pipeline):
+    answered = pipeline.query("What is the POSH policy?")
+    awaited = asyncio.run(pipeline.aquery("What is the POSH policy?"))
+
+    assert awaited.answer == answered.answer
+    assert [doc.id for doc in awaited.source_documents] == [doc.id for doc in answered.source_documents]
+
+
+def test_abatch_keeps_question_order(pipeline):
+    questions = [f"Question {i} about the leave policy" for i in range(6)]
+
+    results = asyncio.run(pipeline.abatch(questions, max_concurrency=3))
+
+    assert [result.question for result in results] == questions
+
+
+def test_abatch_bounds_questions_in_flight(pipeline, monkeypatch):
+    in_flight = 0
+    peak = 0
+    aquery = pipeline.aquery
+
+    async def tracking_aquery(question, shards=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await aquery(question, shards)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(pipeline, 'aquery', tracking_aquery)
+    asyncio.run(pipeline.abatch([f"Question {i}" for i in range(10)], max_concurrency=4))
+
+    assert peak == 4
+
+
+def test_abatch_can_return_failures_in_place(write_config, corpus):
+    pipeline = RAGPipeline(write_config({'llm': {'error_rate': 1.0}}))
+    pipeline.index_documents(str(corpus))
+
+    results = asyncio.run(pipeline.abatch(["First", "Second"], return_exceptions=True))
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(pipeline.abatch(["First", "Second"]))
+
+
+def test_abatch_embeds_concurrently_through_the_async_api(write_config, corpus, monkeypatch):
+    from components import CachedEmbeddings, ScheduledEmbeddings
+    from components.local_models import HashingEmbeddings
+
+    pipeline = RAGPipeline(write_config({
+        'embedding': {'cache': {'enabled': True}, 'scheduler': {'enabled': True}}
+    }))
+    pipeline.index_documents(str(corpus))
+    assert isinstance(pipeline.embedding, CachedEmbeddings)
+    assert isinstance(pipeline.embedding.embedding, ScheduledEmbeddings)
+
+    in_flight = 0
+    peak = 0
+    aembed_documents = HashingEmbeddings.aembed_documents
+
+    async def tracking_aembed_documents(self, texts):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.02)
+            return await aembed_documents(self, texts)
+        finally:
+            in_flight -= 1
+
+    def blocking_embed(self, *args):
+        raise AssertionError("async queries must not embed on a thread")
+
+    monkeypatch.setattr(HashingEmbeddings, 'aembed_documents', tracking_aembed_documents)
+    monkeypatch.setattr(HashingEmbeddings, 'embed_query', blocking_embed)
+    monkeypatch.setattr(HashingEmbeddings, 'embed_documents', blocking_embed)
+
+    questions = [f"Question {i} about the leave policy" for i in range(8)]
+    results = asyncio.run(pipeline.abatch(questions, max_concurrency=4))
+
+    assert [result.question for result in results] == questions
+    assert peak == 4
+
+    # Repeated questions are answered from the embedding cache
+    hits = pipeline.embedding.stats()['hits']
+    asyncio.run(pipeline.abatch(questions[:2]))
+    assert pipeline.embedding.stats()['hits'] == hits + 2
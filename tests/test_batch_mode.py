@@ -0,0 +1,54 @@
+"""Tests for bulk question mode of main.py query."""
+import json
+
+import main
+
+
+def read_records(path):
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_questions_are_read_from_strings_and_objects(tmp_path):
+    batch = tmp_path / 'questions.jsonl'
+    batch.write_text('"First question"\n\n{"id": "q2", "question": "Second question"}\n')
+
+    assert main.load_batch_questions(str(batch)) == [('1', "First question"), ('q2', "Second question")]
+
+
+def test_answered_ids_drop_errors_duplicates_and_partial_lines(tmp_path):
+    out = tmp_path / 'answers.jsonl'
+    out.write_text(
+        '{"id": "1", "answer": "a"}\n'
+        '{"id": "2", "error": "timeout"}\n'
+        '{"id": "1", "answer": "again"}\n'
+        '{"id": "3", "answer": "c"}\n'
+        '{"id": "4", "ans'
+    )
+
+    assert main.load_answered_ids(str(out)) == {'1', '3'}
+    assert read_records(out) == [{'id': '1', 'answer': 'a'}, {'id': '3', 'answer': 'c'}]
+
+
+def test_failed_questions_are_retried_and_keep_one_record(pipeline, tmp_path, monkeypatch):
+    batch = tmp_path / 'questions.jsonl'
+    batch.write_text(''.join(json.dumps({'id': str(i), 'question': f"Question {i}"}) + '\n' for i in range(4)))
+    out = tmp_path / 'answers.jsonl'
+    aquery = pipeline.aquery
+
+    async def flaky_aquery(question, shards=None):
+        if question == "Question 2":
+            raise RuntimeError("LLM timeout")
+        return await aquery(question, shards)
+
+    monkeypatch.setattr(pipeline, 'aquery', flaky_aquery)
+    main.batch_query(pipeline, str(batch), str(out), concurrency=2)
+    assert sorted(record['id'] for record in read_records(out)) == ['0', '1', '2', '3']
+    assert [record['error'] for record in read_records(out) if 'error' in record] == ["LLM timeout"]
+
+    monkeypatch.undo()
+    main.batch_query(pipeline, str(batch), str(out), concurrency=2)
+
+    records = read_records(out)
+    assert sorted(record['id'] for record in records) == ['0', '1', '2', '3']
+    assert not any('error' in record for record in records)
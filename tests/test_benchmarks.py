@@ -0,0 +1,53 @@
+"""Tests for the benchmark helpers and the end-to-end pipeline benchmark."""
+import argparse
+
+from benchmarks import bench_pipeline
+from benchmarks.synthetic_pdfs import generate_corpus
+from utils import latency_summary, percentile
+
+
+def test_percentile_uses_nearest_rank():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 95) == 5.0
+    assert percentile(values, 0) == 1.0
+    assert percentile([], 50) == 0.0
+
+
+def test_latency_summary():
+    summary = latency_summary([0.1, 0.2, 0.3, 0.4], elapsed=2.0)
+
+    assert summary['count'] == 4
+    assert summary['per_second'] == 2.0
+    assert summary['p50'] == 0.2
+    assert summary['max'] == 0.4
+
+
+def test_compare_reports_relative_changes_of_shared_metrics():
+    current = {'ingest': {'seconds': 3.0, 'label': 'x'}, 'index_bytes': 50, 'new': 1}
+    baseline = {'ingest': {'seconds': 2.0, 'label': 'y'}, 'index_bytes': 100}
+
+    assert bench_pipeline.compare(current, baseline) == {'ingest.seconds': 0.5, 'index_bytes': -0.5}
+
+
+def test_synthetic_corpus_is_deterministic(tmp_path):
+    first = generate_corpus(str(tmp_path / 'a'), documents=2, pages=2, seed=7)
+    second = generate_corpus(str(tmp_path / 'b'), documents=2, pages=2, seed=7)
+
+    assert [path.read_bytes() for path in first] == [path.read_bytes() for path in second]
+
+
+def test_pipeline_benchmark_runs_offline():
+    args = argparse.Namespace(
+        config=bench_pipeline.DEFAULT_CONFIG, documents=2, pages=2, data_dir='', queries=3,
+        vectorstore='numpy', search_type='', online=False, llm_latency=0.0, tokens_per_second=0.0, seed=0
+    )
+
+    result = bench_pipeline.run(args)
+
+    assert result['models'] == 'offline'
+    assert result['corpus']['files'] == 2
+    assert result['retrieval_latency']['count'] == 3
+    assert result['rag_latency']['count'] == 3
+    assert {'retrieval', 'generation', 'total'} <= set(result['rag_stage_means'])
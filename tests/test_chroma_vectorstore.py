@@ -0,0 +1,65 @@
+"""Tests for relevance scores on the Chroma backend."""
+import pytest
+
+from components.local_models import HashingEmbeddings
+from factories import VectorStoreFactory
+from rag.rag_pipeline import RAGPipeline
+
+pytest.importorskip('chromadb')
+
+QUESTION = "How many days of earned leave can employees carry forward?"
+
+
+def chroma_config(tmp_path, **overrides):
+    return {
+        'vectorstore': {'type': 'chroma', 'persist_directory': str(tmp_path / 'chroma'), **overrides},
+        'retrieval': {'top_k': 4}
+    }
+
+
+@pytest.mark.parametrize('search_type', ['similarity', 'mmr'])
+@pytest.mark.parametrize('sharded', [False, True])
+def test_query_scores_are_relevance_in_unit_range(write_config, corpus, tmp_path, search_type, sharded):
+    config = chroma_config(tmp_path, sharding={'enabled': sharded})
+    config['retrieval']['search_type'] = search_type
+    pipeline = RAGPipeline(write_config(config))
+    pipeline.index_documents(str(corpus))
+
+    result = pipeline.query(QUESTION)
+
+    assert result.scores
+    assert all(0 <= score <= 1 for score in result.scores)
+    assert max(result.scores) > 0
+
+
+def test_collections_created_with_l2_distance_score_like_cosine(tmp_path):
+    from langchain_community.vectorstores import Chroma
+
+    embedding = HashingEmbeddings(dimensions=64)
+    texts = ["leave policy", "annual leave days", "travel expenses", "expense policy", "notice period"]
+    legacy = Chroma(persist_directory=str(tmp_path / 'l2'), embedding_function=embedding, collection_name='legacy')
+    legacy.add_texts(texts, ids=texts)
+    cosine = VectorStoreFactory().create(
+        {'type': 'chroma', 'persist_directory': str(tmp_path / 'cosine'), 'collection_name': 'current'}, embedding
+    )
+    cosine.add_texts(texts, ids=texts)
+    reopened = VectorStoreFactory().create(
+        {'type': 'chroma', 'persist_directory': str(tmp_path / 'l2'), 'collection_name': 'legacy'}, embedding
+    )
+
+    vector = embedding.embed_query("leave policy")
+    l2_scores = dict(
+        (doc.page_content, reopened._select_relevance_score_fn()(distance))
+        for doc, distance in reopened.similarity_search_by_vector_with_relevance_scores(vector, k=5)
+    )
+    cosine_scores = dict(
+        (doc.page_content, cosine._select_relevance_score_fn()(distance))
+        for doc, distance in cosine.similarity_search_by_vector_with_relevance_scores(vector, k=5)
+    )
+
+    assert VectorStoreFactory._chroma_distance_space(reopened._collection) == 'l2'
+    assert VectorStoreFactory._chroma_distance_space(cosine._collection) == 'cosine'
+    assert l2_scores.keys() == cosine_scores.keys()
+    for text, score in cosine_scores.items():
+        assert 0 <= score <= 1
+        assert l2_scores[text] == pytest.approx(score, abs=1e-3)
@@ -0,0 +1,113 @@
+"""Tests for near-duplicate chunk detection."""
+from langchain_core.documents import Document
+
+from benchmarks.synthetic_pdfs import write_pdf
+from components import ChunkDeduplicator, IndexManifest
+from rag.rag_pipeline import RAGPipeline
+
+WORDS = [f"term{i}" for i in range(120)]
+SHARED = "Every employee completes the annual security awareness training before the end of March. " * 4
+UNIQUE_A = "Travel expenses are reimbursed within thirty days of submitting the receipts to finance."
+UNIQUE_B = "Parental leave lasts sixteen weeks and can be split into two periods within the first year."
+RATES = (
+    "Mileage allowance. Employees who use a private car on company business are reimbursed {rate} cents "
+    "per kilometre driven. Claims list the date, the start and end address, the purpose of each trip and "
+    "the distance, and are submitted with the monthly travel log. The line manager approves the log before "
+    "the fifth working day of the following month, and finance pays approved claims with the next salary. "
+    "Parking fees and tolls are reimbursed separately against receipts. Fines are never reimbursed. "
+    "Employees who lease a company car cannot claim the allowance for the same trips, and trips between "
+    "home and the usual place of work do not count as business travel."
+)
+
+
+def doc(words, page=0):
+    return Document(page_content=' '.join(words), metadata={'source': 'a.pdf', 'page': page})
+
+
+def test_near_duplicates_are_reported_against_the_first_chunk_kept():
+    deduplicator = ChunkDeduplicator({'threshold': 0.8})
+    edited = list(WORDS)
+    edited[60] = 'changed'
+
+    assert deduplicator.check('first', doc(WORDS, page=1)) is None
+    assert deduplicator.check('second', doc(edited, page=2)) == ('first', {'source': 'a.pdf', 'page': 1})
+    assert deduplicator.check('third', doc(WORDS)) == ('first', {'source': 'a.pdf', 'page': 1})
+    assert deduplicator.checked == 3
+    assert deduplicator.duplicates == 2
+
+
+def test_unrelated_and_empty_chunks_are_kept():
+    deduplicator = ChunkDeduplicator({})
+
+    assert deduplicator.check('first', doc(WORDS)) is None
+    assert deduplicator.check('second', doc([f"other{i}" for i in range(120)])) is None
+    assert deduplicator.check('empty', doc([])) is None
+    assert deduplicator.duplicates == 0
+
+
+def test_signatures_are_deterministic_for_a_seed():
+    text = ' '.join(WORDS)
+
+    assert (ChunkDeduplicator({}).signature(text) == ChunkDeduplicator({}).signature(text)).all()
+    assert ChunkDeduplicator({}).signature("...") is None
+
+
+def test_band_layout_turns_at_or_below_the_threshold():
+    for threshold in (0.5, 0.8, 0.9, 0.95):
+        bands, rows = ChunkDeduplicator._band_layout(threshold, 128)
+
+        assert bands * rows <= 128
+        assert (1 / bands) ** (1 / rows) <= threshold
+
+
+def make_pipeline(write_config, tmp_path):
+    directory = tmp_path / 'dedup_docs'
+    directory.mkdir()
+    write_pdf(directory / 'a.pdf', [SHARED, UNIQUE_A])
+    write_pdf(directory / 'b.pdf', [SHARED, UNIQUE_B])
+    pipeline = RAGPipeline(write_config({'document_processing': {'dedup': {'enabled': True}}}))
+    return pipeline, directory
+
+
+def test_shipped_configuration_keeps_chunks_that_differ_only_in_numbers(write_config, tmp_path):
+    directory = tmp_path / 'rate_docs'
+    directory.mkdir()
+    write_pdf(directory / 'rates_2023.pdf', [RATES.format(rate=30)])
+    write_pdf(directory / 'rates_2024.pdf', [RATES.format(rate=32)])
+    pipeline = RAGPipeline(write_config())
+
+    stats = pipeline.index_documents(str(directory))
+
+    assert stats['duplicates'] == 0
+    assert stats['embedded'] == stats['chunks'] == 2
+
+
+def manifest(pipeline):
+    return IndexManifest(str(pipeline._serving_directory())).load()
+
+
+def test_ingestion_stores_a_repeated_page_once(write_config, tmp_path):
+    pipeline, directory = make_pipeline(write_config, tmp_path)
+
+    stats = pipeline.index_documents(str(directory))
+
+    assert stats['duplicates'] == stats['embeddings_saved'] == 1
+    duplicates = manifest(pipeline).duplicates_for(str(directory / 'b.pdf'))
+    (duplicate,) = duplicates.values()
+    assert duplicate['kept_id'] in manifest(pipeline).chunk_ids_for(str(directory / 'a.pdf'))
+    assert duplicate['page'] == duplicate['kept_page'] == 0
+    assert pipeline.vectorstore.get_by_ids(list(duplicates)) == []
+
+
+def test_changing_the_kept_copy_reindexes_the_file_that_shared_it(write_config, tmp_path):
+    pipeline, directory = make_pipeline(write_config, tmp_path)
+    pipeline.index_documents(str(directory))
+    dropped_ids = list(manifest(pipeline).duplicates_for(str(directory / 'b.pdf')))
+
+    write_pdf(directory / 'a.pdf', [UNIQUE_A])
+    stats = pipeline.index_documents(str(directory), incremental=True)
+
+    # b.pdf is unchanged but is indexed again so its copy of the shared page is stored
+    assert stats['files'] == 2
+    assert manifest(pipeline).duplicates_for(str(directory / 'b.pdf')) == {}
+    assert [stored.id for stored in pipeline.vectorstore.get_by_ids(dropped_ids)] == dropped_ids
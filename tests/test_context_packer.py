@@ -0,0 +1,88 @@
+"""Tests for the token-budgeted context packer."""
+from langchain_core.documents import Document
+
+from components import ContextPacker
+from utils import count_tokens
+
+PAGE = ' '.join(f"word{i}" for i in range(200))
+
+
+def chunk(start, end, page=0, offsets=True, source='a.pdf'):
+    metadata = {'source': source, 'page': page}
+    if offsets:
+        metadata['start_index'] = start
+    return Document(page_content=PAGE[start:end], metadata=metadata)
+
+
+def test_overlapping_chunks_of_a_page_are_sent_once():
+    packer = ContextPacker({'max_tokens': 0})
+
+    packed = packer.pack([(chunk(300, 700), 0.9), (chunk(0, 400), 0.8)])
+
+    assert packed.text == PAGE[0:700]
+    assert packed.merged == 1
+    assert packed.tokens_saved > 0
+
+
+def test_touching_chunks_merge_at_their_page_offsets():
+    page = "First part." + "Second part." + " " + "Third part." + "  " + "Fourth part."
+    pieces = ["First part.", "Second part.", "Third part.", "Fourth part.", "part."]
+    metadata = {'source': 'a.pdf', 'page': 0}
+    chunks = [
+        (Document(page_content=piece, metadata={**metadata, 'start_index': page.rindex(piece)}), 0.5)
+        for piece in pieces
+    ]
+    packer = ContextPacker({'max_tokens': 0})
+
+    packed = packer.pack(chunks)
+
+    # Gaps of 0, 1 and 2 characters, then a chunk inside the last one
+    assert packed.text == page
+    assert packed.merged == 4
+
+
+def test_chunks_without_offsets_merge_on_shared_text():
+    packer = ContextPacker({'max_tokens': 0})
+
+    packed = packer.pack([(chunk(0, 400, offsets=False), 0.9), (chunk(300, 700, offsets=False), 0.5)])
+
+    assert packed.text == PAGE[0:700]
+
+
+def test_chunks_of_other_pages_stay_separate_in_score_order():
+    packer = ContextPacker({'max_tokens': 0})
+
+    packed = packer.pack([(chunk(0, 100, page=1), 0.2), (chunk(0, 100, page=2), 0.7), (chunk(0, 100, page=3), None)])
+
+    assert [doc.metadata['page'] for doc in packed.passages] == [2, 1, 3]
+    assert packed.merged == 0
+
+
+def test_passages_over_the_budget_are_dropped():
+    first, second = chunk(0, 400, page=1), chunk(0, 400, page=2)
+    budget = count_tokens(first.page_content) + 5
+    packer = ContextPacker({'max_tokens': budget})
+
+    packed = packer.pack([(first, 0.9), (second, 0.8)])
+
+    assert packed.passages == [first]
+    assert packed.dropped == 1
+    assert packed.tokens <= budget
+
+
+def test_the_best_passage_is_truncated_to_fit():
+    packer = ContextPacker({'max_tokens': 10})
+
+    packed = packer.pack([(chunk(0, 800), 0.9)])
+
+    assert 0 < packed.tokens <= 10
+    assert PAGE.startswith(packed.text)
+
+
+def test_merging_can_be_disabled():
+    packer = ContextPacker({'max_tokens': 0, 'merge_overlaps': False})
+
+    packed = packer.pack([(chunk(0, 400), 0.9), (chunk(300, 700), 0.8)])
+
+    assert len(packed.passages) == 2
+    assert packed.merged == 0
@@ -0,0 +1,41 @@
+"""Tests for parallel PDF loading."""
+from components import DocumentLoader
+
+
+def pages_by_file(results):
+    """Map each loaded file to its (page, text) pairs."""
+    return {
+        file_path: [(doc.metadata['page'], doc.page_content) for doc in documents]
+        for file_path, documents in results
+    }
+
+
+def test_parallel_loading_matches_sequential(corpus):
+    files = sorted(str(path) for path in corpus.glob('*.pdf'))
+
+    sequential = pages_by_file(DocumentLoader.load_files(files, workers=1))
+    parallel = pages_by_file(DocumentLoader.load_files(files, workers=2))
+
+    assert parallel == sequential
+    assert set(sequential) == set(files)
+    assert all(len(pages) == 2 for pages in sequential.values())
+
+
+def test_a_broken_file_is_skipped(corpus):
+    broken = corpus / 'broken.pdf'
+    broken.write_bytes(b'not a pdf')
+    files = sorted(str(path) for path in corpus.glob('*.pdf'))
+
+    loaded = pages_by_file(DocumentLoader.load_files(files, workers=2))
+
+    assert str(broken) not in loaded
+    assert len(loaded) == len(files) - 1
+
+
+def test_directory_pages_keep_their_order(corpus):
+    documents = list(DocumentLoader.load_directory(str(corpus), workers=2))
+
+    sources = {doc.metadata['source'] for doc in documents}
+    assert len(documents) == 2 * len(sources) == 6
+    for source in sources:
+        assert [doc.metadata['page'] for doc in documents if doc.metadata['source'] == source] == [0, 1]
@@ -0,0 +1,128 @@
+"""Tests for the persistent embedding cache."""
+import asyncio
+import itertools
+import sqlite3
+from types import SimpleNamespace
+from typing import List
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from components import CachedEmbeddings, EmbeddingCache, embedding_cache
+
+
+class CountingEmbeddings(Embeddings):
+    """Stand-in embedder that records the texts it is asked to embed."""
+
+    def __init__(self):
+        self.embedded: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture(autouse=True)
+def ticking_clock(monkeypatch):
+    """Make every timestamp of the cache later than the previous one."""
+    monkeypatch.setattr(embedding_cache, 'time', SimpleNamespace(time=itertools.count(1).__next__))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite'), max_entries=3)
+    yield cache
+    cache.close()
+
+
+def stored_keys(cache):
+    with sqlite3.connect(str(cache.path)) as conn:
+        return {key for key, in conn.execute("SELECT key FROM embeddings")}
+
+
+def access_times(cache):
+    with sqlite3.connect(str(cache.path)) as conn:
+        return dict(conn.execute("SELECT key, last_access FROM embeddings"))
+
+
+def test_cached_embeddings_only_embed_misses_once(cache):
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, cache, 'fake/test')
+
+    first = embeddings.embed_documents(["leave", "travel", "leave"])
+    second = embeddings.embed_documents(["travel", "payroll"])
+
+    assert model.embedded == ["leave", "travel", "payroll"]
+    assert first == [[5.0, 1.0], [6.0, 1.0], [5.0, 1.0]]
+    assert second == [[6.0, 1.0], [7.0, 1.0]]
+    assert cache.stats()['hits'] == 1
+
+
+def test_keys_are_namespaced_by_model(cache):
+    model = CountingEmbeddings()
+    CachedEmbeddings(model, cache, 'fake/a').embed_documents(["leave"])
+    CachedEmbeddings(model, cache, 'fake/b').embed_documents(["leave"])
+
+    assert model.embedded == ["leave", "leave"]
+
+
+def test_vectors_survive_reopening(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = EmbeddingCache(path)
+    cache.put_many({'k': [0.5, 0.25]})
+    cache.close()
+
+    reopened = EmbeddingCache(path)
+    assert reopened.get_many(['k', 'missing']) == {'k': [0.5, 0.25]}
+    reopened.close()
+
+
+def test_lookups_do_not_write_until_flushed(cache):
+    cache.put_many({'a': [1.0], 'b': [2.0]})
+    before = access_times(cache)
+
+    cache.get_many(['a'])
+    assert access_times(cache) == before
+
+    cache.flush()
+    assert access_times(cache)['a'] > before['a']
+
+
+def test_eviction_keeps_recently_read_entries(cache):
+    for key, vector in [('a', [1.0]), ('b', [2.0]), ('c', [3.0])]:
+        cache.put_many({key: vector})
+    cache.get_many(['a'])
+
+    # Pending access times are written before evicting, so 'b' is the least recently used
+    cache.put_many({'d': [4.0]})
+
+    assert stored_keys(cache) == {'a', 'c', 'd'}
+    assert cache.stats()['evictions'] == 1
+
+
+def test_pending_access_times_are_written_in_batches(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite'), touch_batch=2)
+    cache.put_many({'a': [1.0], 'b': [2.0]})
+    before = access_times(cache)
+
+    cache.get_many(['a'])
+    assert access_times(cache) == before
+    cache.get_many(['b'])
+    after = access_times(cache)
+    assert after['a'] > before['a'] and after['b'] > before['b']
+    cache.close()
+
+
+def test_async_embeddings_only_embed_misses(cache):
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, cache, 'fake/test')
+    embeddings.embed_documents(["leave"])
+
+    vectors = asyncio.run(embeddings.aembed_documents(["leave", "travel", "travel"]))
+    query = asyncio.run(embeddings.aembed_query("travel"))
+
+    assert model.embedded == ["leave", "travel"]
+    assert vectors == [[5.0, 1.0], [6.0, 1.0], [6.0, 1.0]]
+    assert query == [6.0, 1.0]
@@ -0,0 +1,200 @@
+"""Tests for the rate-limit-aware embedding scheduler."""
+import asyncio
+import threading
+from typing import List
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from components import embedding_scheduler
+from components.embedding_scheduler import RateLimiter, RateLimitError, ScheduledEmbeddings
+from utils import count_tokens
+
+
+class EveryNthThrottlingEmbeddings(Embeddings):
+    """Stand-in embedder whose every Nth request fails with a 429."""
+
+    def __init__(self, throttle_every: int):
+        self.throttle_every = throttle_every
+        self.calls = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.calls += 1
+            if self.calls % self.throttle_every == 0:
+                self.throttled += 1
+                raise RateLimitError("429 Too Many Requests")
+        # The vector identifies its text, so results can be matched to inputs
+        return [[float(text.split()[-1])] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class FakeClock:
+    """Replaces the time module of the scheduler; sleeping advances the clock instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: List[float] = []
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+class FakeRandom:
+    """Replaces the random module of the scheduler; jitter returns half of its upper bound."""
+
+    def __init__(self):
+        self.bounds = []
+
+    def uniform(self, low: float, high: float) -> float:
+        self.bounds.append((low, high))
+        return (low + high) / 2
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(embedding_scheduler, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def jitter(monkeypatch):
+    jitter = FakeRandom()
+    monkeypatch.setattr(embedding_scheduler, 'random', jitter)
+    return jitter
+
+
+def make_texts(count: int) -> List[str]:
+    return [f"policy paragraph {i}" for i in range(count)]
+
+
+def test_throttled_batches_are_retried_with_jittered_backoff(clock, jitter):
+    model = EveryNthThrottlingEmbeddings(throttle_every=3)
+    scheduler = ScheduledEmbeddings(model, batch_size=2, max_concurrency=1, backoff_base=0.5)
+
+    vectors = scheduler.embed_documents(make_texts(10))
+
+    # Five batches take seven calls: the third and sixth are throttled and retried once
+    assert model.calls == 7
+    assert model.throttled == 2
+    assert scheduler.stats()['retries'] == 2
+    assert jitter.bounds == [(0, 0.5), (0, 0.5)]
+    assert clock.sleeps == [0.25, 0.25]
+    assert vectors == [[float(i)] for i in range(10)]
+
+
+def test_backoff_doubles_up_to_the_cap_and_gives_up_after_max_retries(clock, jitter):
+    model = EveryNthThrottlingEmbeddings(throttle_every=1)
+    scheduler = ScheduledEmbeddings(model, max_retries=4, backoff_base=1.0, backoff_max=5.0)
+
+    with pytest.raises(RateLimitError):
+        scheduler.embed_query("policy paragraph 0")
+
+    assert model.calls == 5
+    assert jitter.bounds == [(0, 1.0), (0, 2.0), (0, 4.0), (0, 5.0)]
+    assert scheduler.stats()['retries'] == 4
+    assert scheduler.stats()['requests'] == 0
+
+
+def test_other_errors_are_not_retried(clock, jitter):
+    class FailingEmbeddings(EveryNthThrottlingEmbeddings):
+        def embed_documents(self, texts):
+            self.calls += 1
+            raise ValueError("bad input")
+
+    model = FailingEmbeddings(throttle_every=1)
+    scheduler = ScheduledEmbeddings(model)
+
+    with pytest.raises(ValueError):
+        scheduler.embed_documents(make_texts(3))
+    assert model.calls == 1
+    assert jitter.bounds == []
+
+
+def test_concurrent_batches_keep_input_order_and_count_stats(clock, jitter):
+    model = EveryNthThrottlingEmbeddings(throttle_every=4)
+    scheduler = ScheduledEmbeddings(model, batch_size=3, max_concurrency=4)
+    texts = make_texts(20)
+
+    vectors = scheduler.embed_documents(texts)
+
+    assert vectors == [[float(i)] for i in range(20)]
+    stats = scheduler.stats()
+    assert stats['requests'] == 7
+    assert stats['texts'] == 20
+    assert stats['tokens'] == sum(count_tokens(text) for text in texts)
+    assert stats['retries'] == model.throttled == model.calls - 7
+
+
+def test_rate_limiter_waits_for_the_request_budget(clock):
+    limiter = RateLimiter(requests_per_minute=2)
+
+    assert limiter.acquire(1) == 0
+    clock.now = 10.0
+    assert limiter.acquire(1) == 0
+    # The third request waits until the first leaves the one-minute window
+    assert limiter.acquire(1) == pytest.approx(50.0)
+    assert clock.now == pytest.approx(60.0)
+
+
+def test_rate_limiter_waits_for_the_token_budget(clock):
+    limiter = RateLimiter(tokens_per_minute=100)
+
+    assert limiter.acquire(60) == 0
+    assert limiter.acquire(40) == 0
+    assert limiter.acquire(30) == pytest.approx(60.0)
+    # A request larger than the whole budget goes through once the window is empty
+    clock.now += 60.0
+    assert limiter.acquire(500) == 0
+
+
+def test_scheduler_records_throttle_wait(clock, jitter):
+    model = EveryNthThrottlingEmbeddings(throttle_every=100)
+    texts = make_texts(4)
+    batch_tokens = count_tokens(texts[0]) + count_tokens(texts[1])
+    scheduler = ScheduledEmbeddings(model, batch_size=2, max_concurrency=1, tokens_per_minute=batch_tokens)
+
+    assert scheduler.embed_documents(texts) == [[float(i)] for i in range(4)]
+    assert scheduler.stats()['throttle_wait_seconds'] == pytest.approx(60.0)
+
+
+def test_async_batches_are_retried_and_keep_input_order(jitter):
+    model = EveryNthThrottlingEmbeddings(throttle_every=3)
+    scheduler = ScheduledEmbeddings(model, batch_size=2, max_concurrency=3, backoff_base=0.001)
+
+    vectors = asyncio.run(scheduler.aembed_documents(make_texts(10)))
+    query = asyncio.run(scheduler.aembed_query("policy paragraph 42"))
+
+    assert vectors == [[float(i)] for i in range(10)]
+    assert query == [42.0]
+    assert scheduler.stats()['requests'] == 6
+    assert scheduler.stats()['retries'] == model.throttled
+
+
+def test_async_rate_limiter_waits_without_blocking(clock, monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(embedding_scheduler.asyncio, 'sleep', fake_sleep)
+    limiter = RateLimiter(requests_per_minute=1)
+
+    assert asyncio.run(limiter.aacquire(1)) == 0
+    assert asyncio.run(limiter.aacquire(1)) == pytest.approx(60.0)
+    assert sleeps == [pytest.approx(60.0)]
+    assert clock.sleeps == []
@@ -0,0 +1,55 @@
+"""Tests for the lazy factory registries."""
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+from factories import EmbeddingFactory, LLMFactory
+
+
+@pytest.fixture(autouse=True)
+def isolated_registries(monkeypatch):
+    """Undo registrations made by a test."""
+    for factory in (LLMFactory, EmbeddingFactory):
+        monkeypatch.setattr(factory, '_registry', dict(factory._registry))
+
+
+def test_string_builders_are_imported_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / 'lazy_provider.py').write_text(
+        "def create_llm(factory, config):\n"
+        "    return ('lazy', config['model_name'])\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'lazy_provider', raising=False)
+
+    LLMFactory.register('Lazy', 'lazy_provider:create_llm')
+    assert 'lazy_provider' not in sys.modules
+    assert 'lazy' in LLMFactory.registered_types()
+
+    assert LLMFactory().create({'type': 'LAZY', 'model_name': 'm'}) == ('lazy', 'm')
+    assert 'lazy_provider' in sys.modules
+
+
+def test_each_factory_has_its_own_registry():
+    LLMFactory.register('only-llm', lambda factory, config: None)
+
+    assert 'only-llm' in LLMFactory.registered_types()
+    assert 'only-llm' not in EmbeddingFactory.registered_types()
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(ValueError, match="Unsupported LLM type: nope"):
+        LLMFactory().create({'type': 'nope'})
+
+
+def test_cli_startup_does_not_import_backends():
+    code = (
+        "import sys, main, factories\n"
+        "print(sorted(m for m in ('langchain_openai', 'chromadb', 'faiss') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip() == '[]'
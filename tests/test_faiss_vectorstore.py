@@ -0,0 +1,94 @@
+"""Tests for the FAISS vector store backend."""
+import numpy as np
+import pytest
+from langchain_core.embeddings import FakeEmbeddings
+
+from components import LocalVectorStore
+from components.faiss_vectorstore import FaissVectorStore
+
+DIMENSIONS = 16
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(1000, DIMENSIONS)).astype(np.float32)
+
+
+def make_store(directory, **options):
+    return FaissVectorStore(FakeEmbeddings(size=DIMENSIONS), str(directory), 'test', **options)
+
+
+def fill(store, vectors):
+    ids = [f"doc{i}" for i in range(len(vectors))]
+    store.add_embeddings([(f"text {i}", vector.tolist()) for i, vector in enumerate(vectors)], ids=ids)
+    return ids
+
+
+def exact_neighbours(vectors, query, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [f"doc{row}" for row in np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:k]]
+
+
+def search_ids(store, query, k):
+    return [doc.id for doc, _ in store.similarity_search_with_score_by_vector(query.tolist(), k)]
+
+
+def test_index_hooks_are_abstract(tmp_path):
+    with pytest.raises(TypeError, match="abstract"):
+        LocalVectorStore(FakeEmbeddings(size=DIMENSIONS), str(tmp_path), 'test')
+
+
+def test_flat_index_is_exact(tmp_path, vectors):
+    store = make_store(tmp_path)
+    fill(store, vectors)
+
+    for query in vectors[:10] + 0.1:
+        assert search_ids(store, query, 5) == exact_neighbours(vectors, query, 5)
+
+
+@pytest.mark.parametrize('index_type', ['ivf', 'hnsw'])
+def test_approximate_indexes_find_most_neighbours(tmp_path, vectors, index_type):
+    store = make_store(tmp_path, index_type=index_type, nlist=8, nprobe=4)
+    fill(store, vectors)
+    # Saving trains the IVF index once there are enough vectors
+    store.save()
+    store = make_store(tmp_path, index_type=index_type, nlist=8, nprobe=4)
+
+    queries = vectors[:20] + 0.1
+    found = sum(
+        len(set(search_ids(store, query, 10)) & set(exact_neighbours(vectors, query, 10)))
+        for query in queries
+    )
+    assert found / (10 * len(queries)) >= 0.8
+
+
+def test_deleted_and_replaced_documents_are_not_returned(tmp_path, vectors):
+    store = make_store(tmp_path)
+    fill(store, vectors[:10])
+
+    store.delete(['doc0'])
+    store.add_embeddings([("replaced", vectors[5].tolist())], ids=['doc1'])
+
+    results = store.similarity_search_with_score_by_vector(vectors[0].tolist(), 10)
+    assert 'doc0' not in [doc.id for doc, _ in results]
+    assert [doc.page_content for doc in store.get_by_ids(['doc1'])] == ["replaced"]
+    assert len(results) == 9
+
+
+def test_saved_index_reopens_memory_mapped_and_accepts_writes(tmp_path, vectors):
+    store = make_store(tmp_path)
+    ids = fill(store, vectors[:100])
+    store.delete(ids[:50])
+    store.save()
+
+    reopened = make_store(tmp_path, mmap=True)
+    assert search_ids(reopened, vectors[60], 1) == ['doc60']
+    assert reopened.get_by_ids(ids[:50]) == []
+
+    reopened.add_embeddings([("new", vectors[0].tolist())], ids=['new'])
+    assert search_ids(reopened, vectors[0], 1) == ['new']
+
+
+def test_unknown_index_type_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported FAISS index type"):
+        make_store(tmp_path, index_type='lsh')
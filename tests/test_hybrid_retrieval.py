@@ -0,0 +1,90 @@
+"""Tests for the BM25 keyword index and hybrid retrieval."""
+import math
+import pytest
+
+from components import KeywordIndex, Retriever
+from components.keyword_index import tokenize
+from components.local_models import HashingEmbeddings
+from components.numpy_vectorstore import NumpyVectorStore
+
+TEXTS = {
+    'leave': "Employees are entitled to 24 days of earned leave per year.",
+    'form16': "The Finance team issues a Form 16 certificate before 15 June.",
+    'travel': "Travel claims must be submitted within 30 days of the trip.",
+    'clause': "Exceptions to clause 4.2.1 need approval from the HR team.",
+    'sick': "Sick leave of more than two days needs a medical certificate.",
+}
+
+
+def bm25(index, query, texts):
+    """Score texts for a query with the textbook BM25 formula."""
+    docs = {chunk_id: tokenize(text) for chunk_id, text in texts.items()}
+    average = sum(len(tokens) for tokens in docs.values()) / len(docs)
+    scores = {}
+    for chunk_id, tokens in docs.items():
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in other for other in docs.values())
+            tf = tokens.count(term)
+            if tf:
+                idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (index.k1 + 1) / (tf + index.k1 * (1 - index.b + index.b * len(tokens) / average))
+        if score > 0:
+            scores[chunk_id] = score
+    return scores
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = KeywordIndex(str(tmp_path / 'test.bm25.json'))
+    index.add(list(TEXTS), list(TEXTS.values()))
+    return index
+
+
+def test_tokens_keep_codes_together():
+    assert tokenize("See clause 4.2.1 and e-mail HR.") == ['see', 'clause', '4.2.1', 'and', 'e-mail', 'hr']
+
+
+def test_scores_follow_bm25(index):
+    query = "leave certificate days"
+
+    results = index.search(query, k=10)
+
+    expected = bm25(index, query, TEXTS)
+    assert [chunk_id for chunk_id, _ in results] == sorted(expected, key=expected.get, reverse=True)
+    assert dict(results) == pytest.approx(expected)
+
+
+def test_deleted_chunks_do_not_count_towards_document_frequency(index, tmp_path):
+    index.delete(['leave', 'sick'])
+    live = {chunk_id: text for chunk_id, text in TEXTS.items() if chunk_id not in ('leave', 'sick')}
+    rebuilt = KeywordIndex(str(tmp_path / 'rebuilt.bm25.json'))
+    rebuilt.add(list(live), list(live.values()))
+
+    for query in ("certificate", "days of leave", "HR team approval"):
+        assert index.search(query, k=10) == pytest.approx(rebuilt.search(query, k=10))
+
+
+def test_saved_index_drops_deleted_chunks(index, tmp_path):
+    index.delete(['travel'])
+    index.add(['clause'], ["Clause 4.2.1 was withdrawn."])
+    index.save()
+
+    reopened = KeywordIndex(str(tmp_path / 'test.bm25.json'))
+    assert len(reopened) == 4
+    assert reopened.search("travel claims", k=10) == []
+    assert [chunk_id for chunk_id, _ in reopened.search("withdrawn", k=10)] == ['clause']
+
+
+def test_hybrid_search_fuses_vector_and_keyword_ranks(index, tmp_path):
+    vectorstore = NumpyVectorStore(HashingEmbeddings(dimensions=256), str(tmp_path), 'test')
+    vectorstore.add_texts(list(TEXTS.values()), ids=list(TEXTS))
+    retriever = Retriever(vectorstore, {'top_k': 3, 'search_type': 'hybrid'}, index)
+
+    results = retriever.retrieve_with_scores("Form 16 certificate")
+
+    assert len(results) == 3
+    # Ranked first by both searches
+    assert results[0][0].id == 'form16'
+    assert results[0][1] == pytest.approx(1.0)
+    assert all(0 < score <= 1 for _, score in results)
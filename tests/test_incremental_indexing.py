@@ -0,0 +1,75 @@
+"""Tests for incremental indexing with the file manifest."""
+from benchmarks.synthetic_pdfs import write_pdf
+from components import DocumentLoader, IndexManifest
+from rag.rag_pipeline import RAGPipeline
+
+
+def recorded_ids(pipeline):
+    """Map each indexed file key to its recorded chunk IDs."""
+    manifest = IndexManifest(str(pipeline._serving_directory())).load()
+    return {key: entry['chunk_ids'] for key, entry in manifest.files.items()}
+
+
+def stored_count(pipeline):
+    """Count the chunks in the serving vector store."""
+    return len(pipeline.vectorstore.similarity_search("policy", k=100000))
+
+
+def test_unchanged_corpus_is_skipped(pipeline, corpus):
+    before = recorded_ids(pipeline)
+
+    stats = pipeline.index_documents(str(corpus), incremental=True)
+
+    assert stats['files'] == 0
+    assert stats['embedded'] == 0
+    assert recorded_ids(pipeline) == before
+
+
+def test_full_reindex_replaces_chunks_instead_of_duplicating(pipeline, corpus):
+    count = stored_count(pipeline)
+    before = recorded_ids(pipeline)
+
+    pipeline.index_documents(str(corpus))
+
+    assert recorded_ids(pipeline) == before
+    assert stored_count(pipeline) == count
+
+
+def test_changed_file_is_reindexed_and_its_old_chunks_deleted(pipeline, corpus):
+    changed = sorted(corpus.glob('*.pdf'))[0]
+    key = IndexManifest.file_key(str(changed))
+    old_ids = recorded_ids(pipeline)[key]
+
+    write_pdf(changed, ["Employees may work remotely two days a week with manager approval."])
+    stats = pipeline.index_documents(str(corpus), incremental=True)
+
+    assert stats['files'] == 1
+    new_ids = recorded_ids(pipeline)[key]
+    assert set(new_ids).isdisjoint(old_ids)
+    assert pipeline.vectorstore.get_by_ids(old_ids) == []
+    assert [doc.id for doc in pipeline.vectorstore.get_by_ids(new_ids)] == new_ids
+
+
+def test_removed_file_is_dropped_from_index_and_manifest(pipeline, corpus):
+    removed = sorted(corpus.glob('*.pdf'))[-1]
+    key = IndexManifest.file_key(str(removed))
+    old_ids = recorded_ids(pipeline)[key]
+    count = stored_count(pipeline)
+
+    removed.unlink()
+    stats = pipeline.index_documents(str(corpus), incremental=True)
+
+    assert stats['deleted'] == len(old_ids)
+    assert key not in recorded_ids(pipeline)
+    assert pipeline.vectorstore.get_by_ids(old_ids) == []
+    assert stored_count(pipeline) == count - len(old_ids)
+
+
+def test_chunk_ids_are_deterministic(write_config, corpus):
+    path = str(sorted(corpus.glob('*.pdf'))[0])
+    documents = RAGPipeline(write_config()).text_splitter.split_documents(DocumentLoader.load_pdf(path))
+
+    ids = IndexManifest.chunk_ids(path, documents)
+
+    assert ids == IndexManifest.chunk_ids(path, documents)
+    assert len(set(ids)) == len(ids)
@@ -0,0 +1,77 @@
+"""Tests for resuming interrupted index runs."""
+import pytest
+
+from components import IndexManifest
+from rag.rag_pipeline import RAGPipeline
+
+
+def manifest_chunk_ids(pipeline):
+    """Map each indexed file to its recorded chunk IDs."""
+    manifest = IndexManifest(str(pipeline._serving_directory())).load()
+    return {key: entry['chunk_ids'] for key, entry in manifest.files.items()}
+
+
+def crash_on_record(monkeypatch, call):
+    """Make the given call of IndexManifest.record raise, as if the run were killed."""
+    record = IndexManifest.record
+    calls = []
+
+    def failing_record(self, *args, **kwargs):
+        calls.append(args[0])
+        if len(calls) == call:
+            raise KeyboardInterrupt
+        return record(self, *args, **kwargs)
+
+    monkeypatch.setattr(IndexManifest, 'record', failing_record)
+
+
+@pytest.mark.parametrize('snapshots', [True, False])
+def test_resumed_full_run_reindexes_files_it_did_not_finish(write_config, corpus, monkeypatch, snapshots):
+    sections = {'vectorstore': {'snapshots': {'enabled': snapshots}}}
+    old_config = write_config({**sections, 'document_processing': {'chunk_size': 1000}}, 'old.yaml')
+    new_config = write_config({**sections, 'document_processing': {'chunk_size': 400}}, 'new.yaml')
+
+    RAGPipeline(old_config).index_documents(str(corpus))
+    old_ids = manifest_chunk_ids(RAGPipeline(old_config))
+
+    # The full rebuild with the new chunk size dies after finishing the first file
+    crash_on_record(monkeypatch, call=2)
+    with pytest.raises(KeyboardInterrupt):
+        RAGPipeline(new_config).index_documents(str(corpus))
+    monkeypatch.undo()
+
+    pipeline = RAGPipeline(new_config)
+    stats = pipeline.index_documents(None, resume=True)
+    assert stats['files'] == 2
+
+    reference_config = write_config({
+        'vectorstore': {'persist_directory': str(corpus.parent / 'reference')},
+        'document_processing': {'chunk_size': 400}
+    }, 'reference.yaml')
+    reference = RAGPipeline(reference_config)
+    reference.index_documents(str(corpus))
+
+    new_ids = manifest_chunk_ids(pipeline)
+    assert new_ids == manifest_chunk_ids(reference)
+    assert all(new_ids[key] != old_ids[key] for key in old_ids)
+
+    stale_ids = [chunk_id for ids in old_ids.values() for chunk_id in ids]
+    assert pipeline.vectorstore.get_by_ids(stale_ids) == []
+    stored_ids = [chunk_id for ids in new_ids.values() for chunk_id in ids]
+    assert len(pipeline.vectorstore.get_by_ids(stored_ids)) == len(stored_ids)
+
+
+def test_resumed_incremental_run_stays_incremental(write_config, corpus, monkeypatch):
+    config = write_config()
+    RAGPipeline(config).index_documents(str(corpus))
+
+    changed = sorted(corpus.glob('*.pdf'))[1]
+    changed.write_bytes(changed.read_bytes().replace(b'Policy', b'Rules', 1))
+
+    crash_on_record(monkeypatch, call=1)
+    with pytest.raises(KeyboardInterrupt):
+        RAGPipeline(config).index_documents(str(corpus), incremental=True)
+    monkeypatch.undo()
+
+    stats = RAGPipeline(config).index_documents(None, resume=True)
+    assert stats['files'] == 1
@@ -0,0 +1,128 @@
+"""Tests for versioned index snapshots and hot swapping."""
+import time
+
+import pytest
+
+from benchmarks.synthetic_pdfs import write_pdf
+from components import IndexManifest
+from components.index_snapshots import SnapshotStore
+from rag.rag_pipeline import RAGPipeline
+
+
+def build(store, content):
+    """Begin a snapshot, write a file into it and publish it."""
+    version, directory = store.begin()
+    (directory / 'index.txt').write_text(content)
+    store.publish(version)
+    return version
+
+
+def test_builds_are_shadow_copies_until_published(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    (tmp_path / 'index.txt').write_text("legacy")
+
+    version, directory = store.begin()
+
+    assert version == 'v000001'
+    assert (directory / 'index.txt').read_text() == "legacy"
+    assert store.building() == version
+    assert store.current() is None
+    assert store.serving_directory() == tmp_path
+
+    store.publish(version)
+
+    assert store.current() == version
+    assert store.building() is None
+    assert store.serving_directory() == directory
+
+
+def test_a_build_starts_from_the_serving_snapshot(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    build(store, "first")
+
+    version, directory = store.begin()
+
+    assert version == 'v000002'
+    assert (directory / 'index.txt').read_text() == "first"
+
+
+def test_an_unfinished_build_is_resumed_or_discarded(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    unfinished, directory = store.begin()
+    (directory / 'partial.txt').write_text("partial")
+
+    assert store.begin(resume=True) == (unfinished, directory)
+    assert (directory / 'partial.txt').exists()
+
+    version, directory = store.begin()
+
+    assert store.versions() == [version]
+    assert not (directory / 'partial.txt').exists()
+
+
+def test_publishing_changes_the_pointer_token(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert store.pointer_token() is None
+
+    build(store, "first")
+    token = store.pointer_token()
+    build(store, "second")
+
+    assert token is not None
+    assert store.pointer_token() != token
+
+
+def test_rollback_serves_an_earlier_snapshot(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    first, second, third = (build(store, content) for content in ("first", "second", "third"))
+
+    assert store.rollback() == second
+    assert store.rollback() == first
+    with pytest.raises(ValueError):
+        store.rollback()
+    assert store.rollback(third) == third
+    with pytest.raises(ValueError):
+        store.rollback('v000099')
+
+
+def test_prune_keeps_the_newest_snapshots_and_the_serving_one(tmp_path):
+    store = SnapshotStore(str(tmp_path), keep=2)
+    first = build(store, "first")
+    build(store, "second")
+    store.rollback(first)
+
+
+    # The rolled-back snapshot is serving, so it survives a tighter limit
+    assert SnapshotStore(str(tmp_path), keep=1).prune() == []
+
+    build(store, "third")
+
+    assert store.versions() == ['v000002', 'v000003']
+
+
+def wait_for_snapshot(pipeline, version, timeout=10.0):
+    """Query until the pipeline has swapped in a snapshot."""
+    deadline = time.monotonic() + timeout
+    while pipeline._index_directory.name != version:
+        assert time.monotonic() < deadline, f"Snapshot {version} was not swapped in"
+        pipeline.query("What is the notice period?")
+        time.sleep(0.05)
+
+
+def test_running_pipeline_swaps_in_a_published_snapshot(pipeline, corpus, write_config):
+    serving = pipeline._index_directory.name
+    pipeline.query("What is the notice period?")
+    write_pdf(corpus / 'sabbatical.pdf', ["Employees may take a three month sabbatical after five years."])
+
+    RAGPipeline(write_config()).index_documents(str(corpus), incremental=True)
+
+    version = pipeline.snapshots.current()
+    assert version != serving
+    new_ids = IndexManifest(str(pipeline.snapshots.path(version))).load().chunk_ids_for(str(corpus / 'sabbatical.pdf'))
+    wait_for_snapshot(pipeline, version)
+    assert [doc.id for doc in pipeline.vectorstore.get_by_ids(new_ids)] == new_ids
+
+    assert pipeline.rollback() == serving
+    wait_for_snapshot(pipeline, serving)
+    assert pipeline.vectorstore.get_by_ids(new_ids) == []
+    assert [entry['current'] for entry in pipeline.list_snapshots()] == [True, False]
@@ -0,0 +1,51 @@
+"""Tests for the streaming ingestion pipeline."""
+import pytest
+
+from components import IndexManifest
+from components.local_models import HashingEmbeddings
+from rag.rag_pipeline import RAGPipeline
+
+
+def recorded_ids(pipeline):
+    """Map each indexed file key to its recorded chunk IDs."""
+    manifest = IndexManifest(str(pipeline._serving_directory())).load()
+    return {key: entry['chunk_ids'] for key, entry in manifest.files.items()}
+
+
+def test_small_batches_build_the_same_index(write_config, corpus, tmp_path, monkeypatch):
+    batch_sizes = []
+    embed_documents = HashingEmbeddings.embed_documents
+
+    def recording_embed_documents(self, texts):
+        batch_sizes.append(len(texts))
+        return embed_documents(self, texts)
+
+    reference = RAGPipeline(write_config())
+    reference.index_documents(str(corpus))
+
+    monkeypatch.setattr(HashingEmbeddings, 'embed_documents', recording_embed_documents)
+    pipeline = RAGPipeline(write_config({
+        'vectorstore': {'persist_directory': str(tmp_path / 'small_batches')},
+        'document_processing': {'batch_size': 3, 'queue_size': 1}
+    }, 'small_batches.yaml'))
+    stats = pipeline.index_documents(str(corpus))
+
+    assert recorded_ids(pipeline) == recorded_ids(reference)
+    assert stats['embedded'] == stats['chunks'] == sum(batch_sizes)
+    assert max(batch_sizes) <= 3
+    assert len(batch_sizes) > 1
+
+
+def test_a_failing_stage_stops_the_run(write_config, corpus, monkeypatch):
+    def failing_embed_documents(self, texts):
+        raise RuntimeError("embedding service down")
+
+    monkeypatch.setattr(HashingEmbeddings, 'embed_documents', failing_embed_documents)
+    pipeline = RAGPipeline(write_config({'document_processing': {'batch_size': 3}}))
+
+    with pytest.raises(RuntimeError, match="embedding service down"):
+        pipeline.index_documents(str(corpus))
+    # Nothing is published, and no file counts as indexed
+    assert pipeline.snapshots.current() is None
+    building = pipeline.snapshots.path(pipeline.snapshots.building())
+    assert IndexManifest(str(building)).load().files == {}
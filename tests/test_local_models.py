@@ -0,0 +1,76 @@
+"""Tests for the offline embedding and chat models."""
+import asyncio
+import numpy as np
+import pytest
+
+from components.embedding_scheduler import RateLimitError, is_rate_limit_error
+from components.local_models import HashingEmbeddings, TemplateChatModel
+from factories import EmbeddingFactory, LLMFactory
+
+PROMPT = """Answer the question based only on the following context:
+
+Employees get 24 days of earned leave.
+
+Unused leave can be carried forward.
+
+Question: How many leave days do I get?
+
+Answer:"""
+
+
+def test_embeddings_are_deterministic_and_normalized():
+    texts = ["earned leave policy", "travel claims"]
+
+    first = HashingEmbeddings(dimensions=64).embed_documents(texts)
+    second = HashingEmbeddings(dimensions=64).embed_documents(texts)
+
+    assert first == second
+    assert np.linalg.norm(first, axis=1) == pytest.approx([1.0, 1.0])
+    assert asyncio.run(HashingEmbeddings(dimensions=64).aembed_documents(texts)) == first
+
+
+def test_texts_sharing_words_are_closer():
+    model = HashingEmbeddings(dimensions=256)
+    query, related, unrelated = (np.array(v) for v in model.embed_documents(
+        ["carry forward earned leave", "earned leave can be carried forward", "hotel invoice for travel"]
+    ))
+
+    assert query @ related > query @ unrelated
+
+
+def test_embedding_errors_look_like_rate_limits():
+    model = HashingEmbeddings(error_rate=1.0)
+
+    with pytest.raises(RateLimitError) as error:
+        model.embed_query("leave")
+    assert is_rate_limit_error(error.value)
+
+
+def test_template_answer_describes_the_context():
+    answer = TemplateChatModel().invoke(PROMPT).content
+
+    assert answer.startswith("Based on 2 passage(s): Employees get 24 days")
+
+
+def test_echo_mode_returns_the_question():
+    assert TemplateChatModel(mode='echo').invoke(PROMPT).content == "How many leave days do I get?"
+
+
+def test_streamed_tokens_make_up_the_answer():
+    model = TemplateChatModel(max_tokens=5)
+
+    tokens = [chunk.content for chunk in model.stream(PROMPT)]
+
+    assert len(tokens) == 5
+    assert ''.join(tokens) == model.invoke(PROMPT).content
+    assert asyncio.run(model.ainvoke(PROMPT)).content == ''.join(tokens)
+
+
+def test_chat_errors_are_injected():
+    with pytest.raises(RuntimeError, match="Injected LLM error"):
+        TemplateChatModel(error_rate=1.0).invoke(PROMPT)
+
+
+def test_factories_create_offline_models_for_the_fake_type():
+    assert isinstance(EmbeddingFactory().create({'type': 'fake', 'dimensions': 32}), HashingEmbeddings)
+    assert isinstance(LLMFactory().create({'type': 'fake', 'mode': 'echo'}), TemplateChatModel)
@@ -0,0 +1,93 @@
+"""Tests for maximal marginal relevance selection."""
+from collections import Counter
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import FakeEmbeddings
+
+from components.mmr import mmr_select, search_with_vectors
+from components.numpy_vectorstore import NumpyVectorStore
+
+DIMENSIONS = 16
+
+
+def reference_mmr(query, vectors, k, lambda_mult):
+    """Textbook MMR that recomputes the similarity to every selected vector at each step."""
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = query / np.linalg.norm(query)
+    # The most relevant candidate is always picked first
+    selected = [int(np.argmax(vectors @ query))]
+    while len(selected) < min(k, len(vectors)):
+        best, best_score = None, -np.inf
+        for i, vector in enumerate(vectors):
+            if i in selected:
+                continue
+            redundancy = max(float(vector @ vectors[j]) for j in selected)
+            score = lambda_mult * float(vector @ query) - (1 - lambda_mult) * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+    return selected
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(3).normal(size=(50, DIMENSIONS))
+
+
+@pytest.mark.parametrize('lambda_mult', [0.0, 0.25, 0.5, 0.9])
+def test_selection_matches_the_reference(vectors, lambda_mult):
+    query = np.random.default_rng(4).normal(size=DIMENSIONS)
+
+    assert mmr_select(query, vectors, 10, lambda_mult) == reference_mmr(query, vectors, 10, lambda_mult)
+
+
+def test_relevance_only_ranks_by_similarity(vectors):
+    query = vectors[7] + 0.1
+
+    selected = mmr_select(query, vectors, 5, lambda_mult=1.0)
+
+    similarities = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)) @ (query / np.linalg.norm(query))
+    assert selected == list(np.argsort(-similarities)[:5])
+
+
+def test_near_duplicates_of_a_pick_are_passed_over():
+    vectors = np.array([[1.0, 0.0, 0.0], [0.99, 0.01, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    query = [1.0, 0.5, 0.0]
+
+    assert mmr_select(query, vectors, 2, lambda_mult=1.0) == [1, 0]
+    assert mmr_select(query, vectors, 2, lambda_mult=0.5) == [1, 2]
+
+
+def test_selection_size_is_bounded_by_the_candidates(vectors):
+    assert len(mmr_select(vectors[0], vectors[:3], 10)) == 3
+    assert mmr_select(vectors[0], vectors, 0) == []
+    assert mmr_select(vectors[0], np.zeros((0, DIMENSIONS)), 4) == []
+
+
+def test_candidates_carry_the_stored_vectors(tmp_path, vectors):
+    store = NumpyVectorStore(FakeEmbeddings(size=DIMENSIONS), str(tmp_path), 'test')
+    ids = store.add_embeddings([(f"text {i}", vector.tolist()) for i, vector in enumerate(vectors)],
+                               ids=[f"doc{i}" for i in range(len(vectors))])
+
+    candidates = search_with_vectors(store, vectors[5].tolist(), 8)
+
+    assert len(candidates) == 8
+    assert candidates.documents[0].id == ids[5]
+    for doc, vector in zip(candidates.documents, candidates.vectors):
+        row = ids.index(doc.id)
+        assert np.allclose(vector / np.linalg.norm(vector), vectors[row] / np.linalg.norm(vectors[row]), atol=1e-5)
+
+
+def test_pipeline_selects_with_one_vector_search(write_config, corpus):
+    from rag.rag_pipeline import RAGPipeline
+
+    pipeline = RAGPipeline(write_config({'retrieval': {'search_type': 'mmr'}}))
+    pipeline.index_documents(str(corpus))
+
+    result = pipeline.query("How many days of earned leave can employees carry forward?")
+
+    names = Counter(span.name for _, span in result.trace.walk())
+    assert names['retriever.mmr_search'] == names['retriever.mmr_select'] == 1
+    assert len(result.source_documents) == pipeline.retriever.top_k
+    assert len({doc.id for doc in result.source_documents}) == len(result.source_documents)
@@ -0,0 +1,89 @@
+"""Tests for the NumPy vector store backend."""
+import json
+import numpy as np
+import pytest
+from langchain_core.embeddings import FakeEmbeddings
+
+from components.numpy_vectorstore import NumpyVectorStore
+
+DIMENSIONS = 16
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(1).normal(size=(300, DIMENSIONS)).astype(np.float32)
+
+
+def make_store(directory, **options):
+    return NumpyVectorStore(FakeEmbeddings(size=DIMENSIONS), str(directory), 'test', **options)
+
+
+def fill(store, vectors):
+    ids = [f"doc{i}" for i in range(len(vectors))]
+    store.add_embeddings([(f"text {i}", vector.tolist()) for i, vector in enumerate(vectors)], ids=ids)
+    return ids
+
+
+def exact_search(vectors, query, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    order = np.argsort(-scores)[:k]
+    return [f"doc{row}" for row in order], scores[order]
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'float16'])
+def test_search_matches_brute_force(tmp_path, vectors, dtype):
+    store = make_store(tmp_path, dtype=dtype)
+    fill(store, vectors)
+
+    for query in vectors[:10] + 0.2:
+        results = store.similarity_search_with_score_by_vector(query.tolist(), 5)
+        expected_ids, expected_scores = exact_search(vectors, query, 5)
+        assert [doc.id for doc, _ in results] == expected_ids
+        tolerance = 1e-2 if dtype == 'float16' else 1e-5
+        np.testing.assert_allclose([score for _, score in results], expected_scores, atol=tolerance)
+
+
+def test_batch_search_matches_single_searches(tmp_path, vectors):
+    store = make_store(tmp_path)
+    fill(store, vectors)
+    queries = (vectors[:4] + 0.2).tolist()
+
+    batch = store.similarity_search_batch_by_vector(queries, 3)
+
+    assert [[doc.id for doc, _ in hits] for hits in batch] == [
+        [doc.id for doc, _ in store.similarity_search_with_score_by_vector(query, 3)] for query in queries
+    ]
+
+
+def test_save_compacts_deleted_rows_and_reopens_memory_mapped(tmp_path, vectors):
+    store = make_store(tmp_path, compact_ratio=0.25)
+    ids = fill(store, vectors[:100])
+    store.delete(ids[:40])
+    store.save()
+
+    with open(tmp_path / 'test.docs.json') as f:
+        assert json.load(f)['rows'] == 60
+    reopened = make_store(tmp_path, mmap=True)
+    assert isinstance(reopened._matrix, np.memmap)
+    assert [doc.id for doc in reopened.similarity_search_by_vector(vectors[70].tolist(), 1)] == ['doc70']
+    assert reopened.get_by_ids(ids[:40]) == []
+
+    reopened.add_embeddings([("new", vectors[0].tolist())], ids=['new'])
+    assert [doc.id for doc in reopened.similarity_search_by_vector(vectors[0].tolist(), 1)] == ['new']
+
+
+def test_fewer_deletes_than_the_ratio_keep_tombstones(tmp_path, vectors):
+    store = make_store(tmp_path, compact_ratio=0.5)
+    ids = fill(store, vectors[:10])
+    store.delete(ids[:2])
+    store.save()
+
+    with open(tmp_path / 'test.docs.json') as f:
+        assert json.load(f)['rows'] == 10
+    assert len(make_store(tmp_path).similarity_search_by_vector(vectors[0].tolist(), 10)) == 8
+
+
+def test_unknown_dtype_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported NumPy vector dtype"):
+        make_store(tmp_path, dtype='int8')
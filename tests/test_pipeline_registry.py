@@ -0,0 +1,74 @@
+"""Tests for the shared warm pipeline registry."""
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+from rag import PipelineRegistry
+from rag.rag_pipeline import RAGPipeline
+
+
+def test_callers_share_one_warm_pipeline(write_config, corpus):
+    config = write_config()
+    RAGPipeline(config).index_documents(str(corpus))
+    registry = PipelineRegistry()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pipelines = list(executor.map(lambda _: registry.get(config), range(8)))
+
+    assert all(pipeline is pipelines[0] for pipeline in pipelines)
+    assert pipelines[0].retriever is not None
+
+
+@pytest.mark.parametrize('snapshots', [False, True])
+def test_a_rebuilt_index_is_swapped_in_as_a_whole(write_config, corpus, snapshots):
+    config = write_config({'vectorstore': {'snapshots': {'enabled': snapshots}}})
+    RAGPipeline(config).index_documents(str(corpus))
+    registry = PipelineRegistry()
+    pipeline = registry.get(config)
+    vectorstore, retriever = pipeline.vectorstore, pipeline.retriever
+    version = pipeline.index_version()
+
+    assert registry.get(config) is pipeline
+    assert pipeline.retriever is retriever
+
+    RAGPipeline(config).index_documents(str(corpus))
+
+    assert registry.get(config) is pipeline
+    assert pipeline.vectorstore is not vectorstore
+    assert pipeline.retriever is not retriever
+    assert pipeline.retriever.vectorstore is pipeline.vectorstore
+    assert pipeline.index_version() != version
+    # The replaced retriever still answers queries that started before the swap
+    assert retriever.retrieve_with_scores("notice period")
+    assert not pipeline.reload_if_stale()
+
+
+def test_queries_keep_working_while_the_index_is_reloaded(write_config, corpus):
+    config = write_config({'vectorstore': {'snapshots': {'enabled': False}}})
+    RAGPipeline(config).index_documents(str(corpus))
+    registry = PipelineRegistry()
+    pipeline = registry.get(config)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(pipeline.query, f"Question {i} about leave") for i in range(20)]
+        for _ in range(3):
+            RAGPipeline(config).index_documents(str(corpus))
+            registry.get(config)
+        results = [future.result() for future in futures]
+
+    assert all(result.source_documents for result in results)
+
+
+def test_a_changed_configuration_builds_a_new_pipeline(write_config, corpus):
+    config = write_config()
+    RAGPipeline(config).index_documents(str(corpus))
+    registry = PipelineRegistry()
+    pipeline = registry.get(config)
+
+    write_config({'retrieval': {'top_k': 2}})
+
+    rebuilt = registry.get(config)
+    assert rebuilt is not pipeline
+    assert rebuilt.retriever.top_k == 2
+
+    registry.invalidate(config)
+    assert registry.get(config) is not rebuilt
@@ -0,0 +1,41 @@
+"""Tests for single-retrieval query execution."""
+import json
+from collections import Counter
+
+from rag import QueryResult
+
+
+def span_names(result):
+    """Count the spans of a query trace by name."""
+    return Counter(span.name for _, span in result.trace.walk())
+
+
+def test_query_embeds_and_searches_once(pipeline):
+    result = pipeline.query("How many days of earned leave can employees carry forward?")
+
+    names = span_names(result)
+    assert names['query.retrieval'] == 1
+    assert names['retriever.vector_search'] == 1
+    assert names['retriever.embed_query'] + names['query.embed_query'] == 1
+    assert names['query.llm'] == 1
+
+
+def test_query_returns_the_retrieved_chunks_as_sources(pipeline):
+    result = pipeline.query("Who approves travel expenses?")
+
+    assert isinstance(result, QueryResult)
+    assert result.answer
+    assert 0 < len(result.source_documents) <= pipeline.retriever.top_k
+    assert len(result.scores) == len(result.source_documents)
+    assert all(0 <= score <= 1 for score in result.scores)
+    assert {'retrieval', 'generation', 'total'} <= set(result.timings)
+    assert not result.cache_hit
+
+
+def test_query_result_is_json_serializable(pipeline):
+    result = pipeline.query("What is the notice period?")
+
+    data = json.loads(json.dumps(result.to_dict()))
+    assert data['question'] == "What is the notice period?"
+    assert len(data['sources']) == len(result.source_documents)
+    assert data['trace']['name'] == 'query'
@@ -0,0 +1,85 @@
+"""Tests for the semantic answer cache."""
+from types import SimpleNamespace
+import pytest
+
+from components import SemanticCache, semantic_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's clock with one the test moves by hand."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(semantic_cache, 'time', SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def test_near_identical_questions_hit(clock):
+    cache = SemanticCache(similarity_threshold=0.95)
+    cache.store([1.0, 0.0], 'answer')
+
+    assert cache.lookup([1.0, 0.1]) == 'answer'
+    assert cache.lookup([0.6, 0.8]) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_the_most_similar_entry_wins(clock):
+    cache = SemanticCache(similarity_threshold=0.5)
+    cache.store([1.0, 0.0], 'first')
+    cache.store([0.8, 0.6], 'second')
+
+    assert cache.lookup([0.7, 0.7]) == 'second'
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = SemanticCache(ttl_seconds=60)
+    cache.store([1.0, 0.0], 'answer')
+
+    clock.now += 59
+    assert cache.lookup([1.0, 0.0]) == 'answer'
+    clock.now += 2
+    assert cache.lookup([1.0, 0.0]) is None
+
+
+def test_least_recently_used_entry_is_replaced_when_full(clock):
+    cache = SemanticCache(max_entries=2)
+    cache.store([1.0, 0.0, 0.0], 'a')
+    clock.now += 1
+    cache.store([0.0, 1.0, 0.0], 'b')
+    clock.now += 1
+    cache.lookup([1.0, 0.0, 0.0])
+    clock.now += 1
+
+    cache.store([0.0, 0.0, 1.0], 'c')
+
+    assert len(cache) == 2
+    assert cache.lookup([1.0, 0.0, 0.0]) == 'a'
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.lookup([0.0, 0.0, 1.0]) == 'c'
+
+
+def test_a_new_index_version_clears_the_cache(clock):
+    cache = SemanticCache()
+    cache.store([1.0, 0.0], 'answer', index_version='v1')
+
+    assert cache.lookup([1.0, 0.0], index_version='v1') == 'answer'
+    assert cache.lookup([1.0, 0.0], index_version='v2') is None
+    assert len(cache) == 0
+
+
+def test_pipeline_reuses_the_answer_of_a_repeated_question(write_config, corpus):
+    from rag.rag_pipeline import RAGPipeline
+
+    pipeline = RAGPipeline(write_config({'semantic_cache': {'enabled': True}}))
+    pipeline.index_documents(str(corpus))
+
+    first = pipeline.query("How do I claim travel expenses?")
+    second = pipeline.query("How do I claim travel expenses?")
+
+    assert not first.cache_hit
+    assert second.cache_hit
+    assert second.answer == first.answer
+    assert 'retrieval' not in second.timings
+
+    # Re-indexing changes the index version, so the answer is generated again
+    pipeline.index_documents(str(corpus))
+    assert not pipeline.query("How do I claim travel expenses?").cache_hit
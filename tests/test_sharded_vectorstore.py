@@ -0,0 +1,141 @@
+"""Tests for the sharded vector store and shard-scoped queries."""
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic_pdfs import write_pdf
+from components import SemanticCache
+from components.local_models import HashingEmbeddings
+from components.numpy_vectorstore import NumpyVectorStore
+from components.sharded_vectorstore import ShardedVectorStore, shard_name
+from rag.rag_pipeline import RAGPipeline
+
+QUESTION = "How many days of leave can be carried over?"
+
+
+def make_store(directory, **options):
+    embedding = HashingEmbeddings(dimensions=64)
+    return ShardedVectorStore(
+        lambda name: NumpyVectorStore(embedding, str(directory / name), name),
+        embedding,
+        str(directory),
+        **options
+    )
+
+
+def source_shards(docs):
+    return {Path(doc.metadata['source']).parent.name for doc in docs}
+
+
+def test_shard_names_are_sanitized():
+    assert shard_name("Human Resources/") == 'human-resources'
+    assert shard_name("__") == ''
+
+
+def test_chunks_are_routed_by_folder_and_tagged(tmp_path):
+    store = make_store(tmp_path)
+
+    store.add_texts(
+        ["leave policy", "expense policy", "loose note"],
+        [{'source': 'docs/HR/a.pdf'}, {'source': 'docs/Finance/b.pdf'}, {}],
+        ids=['a', 'b', 'c']
+    )
+
+    assert store.shard_names == ['finance', 'general', 'hr']
+    assert store.shard_sizes() == {'finance': 1, 'general': 1, 'hr': 1}
+    assert [doc.metadata['shard'] for doc in store.get_by_ids(['a', 'b', 'c'])] == ['hr', 'finance', 'general']
+
+
+def test_chunks_are_routed_by_metadata(tmp_path):
+    store = make_store(tmp_path, route_by='metadata', metadata_key='department')
+
+    store.add_texts(["leave policy"], [{'department': 'HR'}], ids=['a'])
+
+    assert store.shard_names == ['hr']
+
+
+def test_search_is_scoped_to_the_requested_shards(tmp_path):
+    store = make_store(tmp_path)
+    texts = [f"policy paragraph {i}" for i in range(6)]
+    folders = ['hr', 'finance', 'legal'] * 2
+    store.add_texts(texts, [{'source': f"docs/{folder}/a.pdf"} for folder in folders], ids=texts)
+
+    everywhere = store.similarity_search("policy paragraph", k=6)
+    scoped = store.similarity_search("policy paragraph", k=6, shards=['HR', 'legal'])
+
+    assert {doc.metadata['shard'] for doc in everywhere} == {'hr', 'finance', 'legal'}
+    assert {doc.metadata['shard'] for doc in scoped} == {'hr', 'legal'}
+    assert len(scoped) == 4
+    assert set(store.latency_stats()) == {'hr', 'finance', 'legal'}
+    with pytest.raises(ValueError):
+        store.similarity_search("policy", shards=['sales'])
+
+
+def test_shard_list_survives_reopening(tmp_path):
+    store = make_store(tmp_path)
+    store.add_texts(["leave policy"], [{'source': 'docs/HR/a.pdf'}], ids=['a'])
+    store.save()
+
+    reopened = make_store(tmp_path)
+
+    assert reopened.shard_names == ['hr']
+    assert [doc.id for doc in reopened.get_by_ids(['a'])] == ['a']
+
+
+@pytest.fixture
+def sharded_pipeline(write_config, tmp_path):
+    """Pipeline with the hr and finance folders indexed into their own shards."""
+    def make(overrides=None):
+        config = {'vectorstore': {'sharding': {'enabled': True}}}
+        for section, values in (overrides or {}).items():
+            config.setdefault(section, {}).update(values)
+        pipeline = RAGPipeline(write_config(config))
+        for folder, topic in (('hr', 'leave'), ('finance', 'expense')):
+            directory = tmp_path / 'departments' / folder
+            directory.mkdir(parents=True)
+            for i in range(2):
+                write_pdf(directory / f"{topic}{i}.pdf", [
+                    f"The {topic} policy section {i} says days of {topic} are carried over each year."
+                ])
+            pipeline.index_documents(str(directory), incremental=True)
+        return pipeline
+
+    return make
+
+
+def test_pipeline_lists_shards_and_scopes_queries(sharded_pipeline):
+    pipeline = sharded_pipeline()
+
+    assert [(entry['shard'], entry['chunks']) for entry in pipeline.list_shards()] == [('finance', 2), ('hr', 2)]
+    assert source_shards(pipeline.query(QUESTION).source_documents) == {'hr', 'finance'}
+    assert source_shards(pipeline.query(QUESTION, shards=['hr']).source_documents) == {'hr'}
+
+
+def test_hybrid_keyword_hits_outside_the_scope_are_dropped(sharded_pipeline):
+    pipeline = sharded_pipeline({'retrieval': {'search_type': 'hybrid'}})
+
+    result = pipeline.query("expense policy", shards=['hr'])
+
+    assert result.source_documents
+    assert source_shards(result.source_documents) == {'hr'}
+
+
+def test_cached_answers_are_only_reused_within_their_scope(sharded_pipeline):
+    pipeline = sharded_pipeline({'semantic_cache': {'enabled': True}})
+
+    assert not pipeline.query(QUESTION, shards=['hr']).cache_hit
+    assert not pipeline.query(QUESTION, shards=['finance']).cache_hit
+    assert not pipeline.query(QUESTION).cache_hit
+    # Switching scope keeps the other scopes' answers
+    assert pipeline.query(QUESTION, shards=['hr']).cache_hit
+    assert pipeline.query(QUESTION, shards=['finance']).cache_hit
+    assert pipeline.query(QUESTION).cache_hit
+
+
+def test_semantic_cache_matches_scopes_exactly():
+    cache = SemanticCache()
+    cache.store([1.0, 0.0], 'hr answer', scope='hr')
+
+    assert cache.lookup([1.0, 0.0], scope='hr') == 'hr answer'
+    assert cache.lookup([1.0, 0.0], scope='finance,hr') is None
+    assert cache.lookup([1.0, 0.0]) is None
@@ -0,0 +1,31 @@
+"""Tests for streaming answers."""
+from rag.rag_pipeline import RAGPipeline
+
+
+def test_stream_query_sends_sources_then_tokens_then_the_result(write_config, corpus):
+    pipeline = RAGPipeline(write_config({'llm': {'tokens_per_second': 10000}}))
+    pipeline.index_documents(str(corpus))
+
+    events = list(pipeline.stream_query("What is the leave policy?"))
+
+    types = [event['type'] for event in events]
+    assert types[0] == 'sources'
+    assert types[-1] == 'done'
+    assert set(types[1:-1]) == {'token'}
+    assert len(types) > 3
+
+    result = events[-1]['result']
+    assert ''.join(event['text'] for event in events[1:-1]) == result.answer
+    assert events[0]['documents'] == result.source_documents
+    assert 0 < result.timings['time_to_first_token'] <= result.timings['total']
+
+
+def test_streamed_answer_matches_query(write_config, corpus):
+    pipeline = RAGPipeline(write_config())
+    pipeline.index_documents(str(corpus))
+
+    streamed = list(pipeline.stream_query("Who approves remote work?"))[-1]['result']
+    answered = pipeline.query("Who approves remote work?")
+
+    assert streamed.answer == answered.answer
+    assert [doc.id for doc in streamed.source_documents] == [doc.id for doc in answered.source_documents]
@@ -0,0 +1,101 @@
+"""Tests for the token-based text splitter."""
+from bisect import bisect_left
+
+import pytest
+from langchain_core.documents import Document
+
+from components import TextSplitter
+from components.text_splitter import TokenSplitter
+from utils import count_tokens, token_offsets
+from utils import token_counter
+
+SENTENCE = "Employees accrue {} days of paid leave per year and may carry five days over. "
+PAGE = "\n\n".join(''.join(SENTENCE.format(i + j) for j in range(6)) for i in range(8))
+
+
+def tokens_between(offsets, start, end):
+    """Count the tokens of the full text that start inside [start, end)."""
+    return bisect_left(offsets, end) - bisect_left(offsets, start)
+
+
+@pytest.fixture
+def estimated_tokens(monkeypatch):
+    """Use the four-characters-per-token estimate instead of tiktoken."""
+    monkeypatch.setattr(token_counter, '_encoding', None)
+    monkeypatch.setattr(token_counter, '_encoding_loaded', True)
+
+
+def test_token_offsets_are_ascending_starts_within_the_text():
+    offsets = token_offsets(PAGE)
+
+    assert offsets[0] == 0
+    assert offsets == sorted(set(offsets))
+    assert offsets[-1] < len(PAGE)
+    assert token_offsets("") == []
+
+
+def test_estimated_offsets_match_the_estimated_count(estimated_tokens):
+    assert token_offsets("abcdefgh") == [0, 4]
+    assert count_tokens("abcdefgh") == 2
+
+
+def test_tiktoken_offsets_match_its_count_for_non_ascii_text():
+    if token_counter._get_encoding() is None:
+        pytest.skip("tiktoken encoding unavailable")
+    text = "Überstunden werden zu 150 % vergütet – siehe § 4. " * 3
+
+    assert len(token_offsets(text)) == count_tokens(text)
+    assert len(token_offsets(PAGE)) == count_tokens(PAGE)
+
+
+def test_chunks_are_page_slices_within_the_token_budget():
+    splitter = TokenSplitter(chunk_tokens=60, chunk_overlap_tokens=10)
+    offsets = token_offsets(PAGE)
+
+    spans = list(splitter.spans(PAGE))
+
+    assert len(spans) > 1
+    for start, end in spans:
+        assert PAGE[start:end] == PAGE[start:end].strip()
+        assert tokens_between(offsets, start, end) <= 60
+    # Consecutive chunks overlap and together cover the page
+    for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+        assert start < previous_end
+    assert spans[0][0] == 0 and spans[-1][1] == len(PAGE.rstrip())
+
+
+def test_chunks_end_at_sentence_boundaries():
+    splitter = TokenSplitter(chunk_tokens=60, chunk_overlap_tokens=10)
+
+    for start, end in list(splitter.spans(PAGE))[:-1]:
+        assert PAGE[start:end].endswith('.')
+
+
+def test_chunks_start_at_word_boundaries(estimated_tokens):
+    text = ' '.join(f"word{i}" for i in range(200))
+    splitter = TokenSplitter(chunk_tokens=25, chunk_overlap_tokens=5)
+
+    for start, _ in splitter.spans(text):
+        assert start == 0 or text[start - 1] == ' '
+
+
+def test_overlap_must_be_smaller_than_the_chunk():
+    with pytest.raises(ValueError):
+        TokenSplitter(chunk_tokens=50, chunk_overlap_tokens=50)
+
+
+@pytest.mark.parametrize('splitter', ['token', 'recursive'])
+def test_chunks_carry_their_page_offsets(splitter):
+    text_splitter = TextSplitter({
+        'splitter': splitter, 'chunk_tokens': 60, 'chunk_overlap_tokens': 10,
+        'chunk_size': 300, 'chunk_overlap': 50
+    })
+    page = Document(page_content=PAGE, metadata={'source': 'a.pdf', 'page': 3})
+
+    chunks = text_splitter.split_documents([page])
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        start = chunk.metadata['start_index']
+        assert PAGE[start:start + len(chunk.page_content)] == chunk.page_content
+        assert chunk.metadata['page'] == 3
@@ -0,0 +1,141 @@
+"""Tests for pipeline tracing."""
+import asyncio
+import io
+import json
+import threading
+import pytest
+
+from utils import JsonlExporter, TextExporter, Tracer, format_trace, get_tracer
+from utils.tracing import count, current_span
+
+
+@pytest.fixture
+def tracer():
+    return Tracer()
+
+
+def collect(tracer):
+    traces = []
+    tracer.add_hook(traces.append)
+    return traces
+
+
+def test_spans_nest_and_only_roots_are_exported(tracer):
+    traces = collect(tracer)
+
+    with tracer.span('query', question='q') as root:
+        with tracer.span('query.retrieval') as retrieval:
+            retrieval.set(documents=4)
+        with tracer.span('query.llm'):
+            pass
+
+    assert traces == [root]
+    assert [child.name for child in root.children] == ['query.retrieval', 'query.llm']
+    assert root.find('query.retrieval').attributes == {'documents': 4}
+    assert all(child.end is not None for child in root.children)
+
+
+def test_errors_are_recorded_on_the_span(tracer):
+    traces = collect(tracer)
+
+    with pytest.raises(ValueError):
+        with tracer.span('index'):
+            raise ValueError("bad file")
+
+    assert traces[0].attributes['error'] == "ValueError: bad file"
+
+
+def test_a_failing_hook_does_not_stop_the_others(tracer, capsys):
+    traces = collect(tracer)
+
+    def broken(span):
+        raise RuntimeError("exporter down")
+
+    tracer.add_hook(broken)
+    tracer.add_hook(traces.append)
+    with tracer.span('query'):
+        pass
+
+    assert len(traces) == 2
+    assert "exporter down" in capsys.readouterr().err
+
+
+def test_recorded_stages_and_counters_attach_to_the_current_span():
+    with get_tracer().span('index') as root:
+        get_tracer().record('loader.load_pdf', 0.5, pages=3)
+        count('cache_hits', 2)
+        count('cache_hits')
+
+    recorded = root.find('loader.load_pdf')
+    assert recorded.duration == pytest.approx(0.5)
+    assert recorded.attributes == {'pages': 3}
+    assert root.attributes['cache_hits'] == 3
+
+
+def test_threads_and_tasks_have_their_own_current_span(tracer):
+    seen = {}
+
+    def worker(name):
+        with tracer.span(name):
+            seen[name] = current_span().name
+
+    with tracer.span('main'):
+        thread = threading.Thread(target=worker, args=('thread',))
+        thread.start()
+        thread.join()
+        assert current_span().name == 'main'
+
+    async def task(name):
+        with tracer.span(name):
+            await asyncio.sleep(0)
+            seen[name] = current_span().name
+
+    async def run_tasks():
+        await asyncio.gather(task('a'), task('b'))
+
+    asyncio.run(run_tasks())
+    assert seen == {'thread': 'thread', 'a': 'a', 'b': 'b'}
+
+
+def test_format_trace_merges_repeated_siblings(tracer):
+    with tracer.span('index') as root:
+        for _ in range(3):
+            with tracer.span('embedding.embed_documents', texts=10):
+                pass
+
+    text = format_trace(root)
+
+    assert "embedding.embed_documents x3" in text
+    assert "texts=30" in text
+
+
+def test_exporters_write_each_trace(tracer, tmp_path):
+    stream = io.StringIO()
+    tracer.add_hook(JsonlExporter(str(tmp_path / 'traces.jsonl')))
+    tracer.add_hook(TextExporter(stream))
+
+    for name in ('first', 'second'):
+        with tracer.span(name):
+            pass
+
+    with open(tmp_path / 'traces.jsonl') as f:
+        assert [json.loads(line)['name'] for line in f] == ['first', 'second']
+    assert "first" in stream.getvalue() and "second" in stream.getvalue()
+
+
+def test_index_and_query_traces_cover_the_stages(pipeline, corpus):
+    traces = []
+    hook = traces.append
+    get_tracer().add_hook(hook)
+    try:
+        pipeline.index_documents(str(corpus))
+        pipeline.query("What is the leave policy?")
+    finally:
+        get_tracer().remove_hook(hook)
+
+    index_trace, query_trace = traces
+    index_names = {span.name for _, span in index_trace.walk()}
+    assert {'loader.load_pdf', 'embedding.embed_documents'} <= index_names
+    assert index_trace.attributes['files'] == 3
+    query_names = {span.name for _, span in query_trace.walk()}
+    assert {'query.retrieval', 'retriever.vector_search', 'query.llm'} <= query_names
@@ -197,6 +197,21 @@ def source_document_card(source: str, page: int, content: str, relevance_score:
     """, unsafe_allow_html=True)
 
 
+def trace_breakdown(trace):
+    """Display the per-stage timing breakdown of a query trace."""
+    total = trace.duration or 1e-12
+    rows = [
+        {
+            "Stage": "\u2003" * depth + span.name,
+            "Time (ms)": round(span.duration * 1000, 1),
+            "Share": f"{span.duration / total:.0%}",
+            "Details": ", ".join(f"{key}={value}" for key, value in span.attributes.items())
+        }
+        for depth, span in trace.walk()
+    ]
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+
+
 def status_badge(status: str, message: str = ""):
     """Display a status badge."""
     config = {
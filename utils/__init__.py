@@ -1,5 +1,11 @@
 """Utility modules."""
 
 from .config_loader import ConfigLoader
+from .token_counter import count_tokens, token_offsets
+from .metrics import percentile, latency_summary
+from .tracing import Span, Tracer, JsonlExporter, TextExporter, get_tracer, format_trace
 
-__all__ = ['ConfigLoader']
+__all__ = [
+    'ConfigLoader', 'count_tokens', 'token_offsets', 'percentile', 'latency_summary',
+    'Span', 'Tracer', 'JsonlExporter', 'TextExporter', 'get_tracer', 'format_trace'
+]
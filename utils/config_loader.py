@@ -66,4 +66,12 @@ class ConfigLoader:
 
     def get_retrieval_config(self) -> Dict[str, Any]:
         """Get retrieval configuration."""
-        return self.config.get('retrieval', {})
\ No newline at end of file
+        return self.config.get('retrieval', {})
+
+    def get_query_config(self) -> Dict[str, Any]:
+        """Get query execution configuration."""
+        return self.config.get('query', {})
+
+    def get_semantic_cache_config(self) -> Dict[str, Any]:
+        """Get semantic cache configuration."""
+        return self.config.get('semantic_cache', {})
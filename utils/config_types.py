@@ -4,14 +4,19 @@ class LLMType(str, Enum):
     OPENAI = "openai"
     GOOGLE = "google"
     HUGGINGFACE = "huggingface"
+    FAKE = "fake"
+    LOCAL = "local"
 
 class EmbeddingModelType(str, Enum):
     OPENAI = "openai"
     OPENAI_LARGE = "openai-large"
     HUGGINGFACE = "huggingface"
+    FAKE = "fake"
+    LOCAL = "local"
 
 class VectorDBType(str, Enum):
     FAISS = "faiss"
     PINECONE = "pinecone"
     MILVUS = "milvus"
-    CHROMA = "chroma"
\ No newline at end of file
+    CHROMA = "chroma"
+    NUMPY = "numpy"
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Token counting utility."""
+from itertools import accumulate
+from typing import Any, List
+
+DEFAULT_ENCODING = 'cl100k_base'
+CHARS_PER_TOKEN = 4
+
+_encoding: Any = None
+_encoding_loaded = False
+
+
+def _get_encoding() -> Any:
+    """Load the tiktoken encoding once, or None if it is unavailable."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a text.
+
+    Uses tiktoken when it is installed and its encoding can be loaded,
+    otherwise estimates four characters per token.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Number of tokens
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def token_offsets(text: str) -> List[int]:
+    """
+    Find the character offset at which each token of a text starts.
+
+    Uses tiktoken when it is available, otherwise assumes a token every
+    four characters like the estimate of count_tokens().
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Ascending start offsets, one per token
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return list(range(0, len(text), CHARS_PER_TOKEN))
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if not tokens:
+        return []
+    if text.isascii():
+        # One byte per character, so offsets are the running byte lengths
+        return [0, *accumulate(len(token) for token in encoding.decode_tokens_bytes(tokens[:-1]))]
+    _, offsets = encoding.decode_with_offsets(tokens)
+    return offsets
@@ -0,0 +1,331 @@
+"""Lightweight tracing of pipeline stages."""
+import contextvars
+import datetime
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+Hook = Callable[['Span'], None]
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """
+    A timed stage of work with attributes and child spans.
+
+    Attributes hold counts, token usage, cache hits and other details of
+    the stage. A span without a parent is the root of a trace.
+    """
+
+    __slots__ = ('name', 'attributes', 'children', 'parent', 'start', 'end', 'started_at')
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional['Span'] = None):
+        """
+        Start a span.
+
+        Args:
+            name: Stage name, such as "retriever.vector_search"
+            attributes: Initial attributes
+            parent: Enclosing span, or None for a root span
+        """
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.children: List[Span] = []
+        self.parent = parent
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end, or to now while the span is open."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attributes: Any) -> None:
+        """Set attributes, replacing existing values."""
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """Add to a numeric attribute, starting from zero."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def child(self, name: str, **attributes: Any) -> 'Span':
+        """Start a child span."""
+        span = Span(name, attributes, self)
+        self.children.append(span)
+        return span
+
+    def finish(self) -> None:
+        """End the span; later calls keep the first end time."""
+        if self.end is None:
+            self.end = time.perf_counter()
+
+    def find(self, name: str) -> Optional['Span']:
+        """Find the first span with a name in this span's subtree."""
+        if self.name == name:
+            return self
+        for child in self.children:
+            found = child.find(name)
+            if found is not None:
+                return found
+        return None
+
+    def walk(self, depth: int = 0) -> Iterator[Tuple[int, 'Span']]:
+        """Iterate over the subtree depth-first as (depth, span) pairs."""
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the span and its children into a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary with name, start time, duration, attributes and children
+        """
+        return {
+            'name': self.name,
+            'started_at': datetime.datetime.fromtimestamp(self.started_at, datetime.timezone.utc).isoformat(),
+            'duration': self.duration,
+            'attributes': dict(self.attributes),
+            'children': [child.to_dict() for child in self.children]
+        }
+
+
+class Tracer:
+    """
+    Creates spans and passes each finished trace to the registered hooks.
+
+    The current span is tracked per thread and per asyncio task, so spans
+    opened inside a stage nest under it without being passed around.
+    """
+
+    def __init__(self):
+        """Initialize a tracer without hooks."""
+        self._hooks: List[Hook] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Hook) -> None:
+        """
+        Register a callable that receives every finished root span.
+
+        Args:
+            hook: Callable taking the root Span of a trace
+        """
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook: Hook) -> None:
+        """Unregister a hook; unknown hooks are ignored."""
+        with self._lock:
+            self._hooks = [h for h in self._hooks if h is not hook]
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        """
+        Start a span under the current span without making it current.
+
+        Use activate() to nest spans under it and end_span() to finish it.
+        This suits spans that stay open across yields, such as streaming.
+
+        Args:
+            name: Stage name
+            **attributes: Initial attributes
+
+        Returns:
+            The started Span
+        """
+        parent = _current_span.get()
+        if parent is not None:
+            return parent.child(name, **attributes)
+        return Span(name, attributes)
+
+    def end_span(self, span: Span) -> None:
+        """Finish a span and export it if it is the root of a trace; ending it again does nothing."""
+        if span.end is not None:
+            return
+        span.finish()
+        if span.parent is None:
+            self._export(span)
+
+    @contextmanager
+    def activate(self, span: Span) -> Iterator[Span]:
+        """Make a span current for the duration of the block."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        Time a block as a span nested under the current span.
+
+        An exception escaping the block is recorded in the "error" attribute.
+
+        Args:
+            name: Stage name
+            **attributes: Initial attributes
+
+        Returns:
+            Context manager yielding the Span
+        """
+        span = self.start_span(name, **attributes)
+        try:
+            with self.activate(span):
+                yield span
+        except BaseException as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self.end_span(span)
+
+    def record(self, name: str, duration: float, **attributes: Any) -> Optional[Span]:
+        """
+        Add an already finished stage under the current span.
+
+        Used for work timed elsewhere, such as in a worker process.
+
+        Args:
+            name: Stage name
+            duration: Seconds the stage took
+            **attributes: Attributes
+
+        Returns:
+            The recorded Span, or None if there is no current span
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        span = parent.child(name, **attributes)
+        span.end = span.start
+        span.start -= duration
+        span.started_at -= duration
+        return span
+
+    def _export(self, span: Span) -> None:
+        """Pass a finished trace to every hook; a failing hook does not affect the others."""
+        for hook in self._hooks:
+            try:
+                hook(span)
+            except Exception as e:
+                print(f"Warning: Trace hook {hook!r} failed: {e}", file=sys.stderr)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer."""
+    return _tracer
+
+
+def span(name: str, **attributes: Any):
+    """Time a block as a span of the process-wide tracer; see Tracer.span()."""
+    return _tracer.span(name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    """Get the innermost open span of the current thread or task."""
+    return _current_span.get()
+
+
+def count(key: str, amount: float = 1) -> None:
+    """Add to a numeric attribute of the current span, if there is one."""
+    span = _current_span.get()
+    if span is not None:
+        span.add(key, amount)
+
+
+def format_trace(span: Span) -> str:
+    """
+    Render a trace as an indented text breakdown.
+
+    Sibling spans with the same name are merged into one line with their
+    count, total duration and summed numeric attributes, so a run with
+    thousands of batches stays readable.
+
+    Args:
+        span: Root span of the trace
+
+    Returns:
+        Multi-line text summary
+    """
+    total = span.duration or 1e-12
+    lines: List[str] = []
+
+    def render(spans: List[Span], depth: int) -> None:
+        groups: Dict[str, List[Span]] = {}
+        for s in spans:
+            groups.setdefault(s.name, []).append(s)
+
+        for name, group in groups.items():
+            duration = sum(s.duration for s in group)
+            attributes: Dict[str, Any] = {}
+            for s in group:
+                for key, value in s.attributes.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool) and len(group) > 1:
+                        attributes[key] = attributes.get(key, 0) + value
+                    else:
+                        attributes[key] = value
+
+            label = f"{name} x{len(group)}" if len(group) > 1 else name
+            details = ", ".join(f"{key}={_format_value(value)}" for key, value in attributes.items())
+            lines.append(
+                f"{'  ' * depth}{label:<{40 - 2 * depth}} {duration * 1000:10.1f} ms {duration / total:6.1%}"
+                + (f"  {details}" if details else "")
+            )
+            render([child for s in group for child in s.children], depth + 1)
+
+    render([span], 0)
+    return "\n".join(lines)
+
+
+def _format_value(value: Any) -> str:
+    """Format an attribute value for the text summary."""
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+class JsonlExporter:
+    """Trace hook that appends each trace to a JSON Lines file."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the exporter.
+
+        Args:
+            path: File receiving one JSON trace per line
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def __call__(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+
+class TextExporter:
+    """Trace hook that writes the text breakdown of each trace to a stream."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        """
+        Initialize the exporter.
+
+        Args:
+            stream: Output stream; defaults to stderr
+        """
+        self.stream = stream
+
+    def __call__(self, span: Span) -> None:
+        stream = self.stream or sys.stderr
+        print(format_trace(span), file=stream, flush=True)